@@ -1 +1 @@
-from . import *
+from . import *
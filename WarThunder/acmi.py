@@ -1,212 +1,1061 @@
-'''
-Module to make Tacview compatible ACMI files - see https://www.tacview.net/documentation/acmi/en/
-'''
-
-
-import os
-from random import randint
-import datetime as dt
-
-
-MAX_NUM_OBJS     = 0xFFFFFFFFFFFFFFFE
-header_mandatory = ('FileType={filetype}\n' 
-                    'FileVersion={acmiver}\n'
-                    '0,ReferenceTime={reftime}Z\n')
-
-
-class ACMI(object):
-    '''
-    Class used to create and maintain a given ACMI file used by the
-    downloadable program Tacview
-    '''
-        
-    def __init__(self, num_objs: int = 1):
-        '''
-        Initialize class object and create a member dict named "obj_ids" to
-        hold unique/valid HEX ID values for each object to be displayed
-        
-        Args:
-            num_objs:
-                Number of objects to simulaneously display in Tacview
-        '''
-        
-        self.obj_ids = {}
-        
-        if num_objs > MAX_NUM_OBJS:
-            raise Exception('Too many objects specified - cannot be more than {}'.format(MAX_NUM_OBJS))
-        
-        for obj_num in range(num_objs):
-            self.add_object()
-        
-    def add_object(self) -> int:
-        '''
-        Append a new and unique hex object ID to the self.obj_ids dict
-        
-        Returns:
-                Hex ID for new object
-        '''
-        
-        id_ = str(hex(randint(1, MAX_NUM_OBJS + 2))[2:]).upper()
-        
-        # Ensure each ID is unique
-        while id_ in self.obj_ids.values():
-            id_ = str(hex(randint(1, MAX_NUM_OBJS + 2))[2:]).upper()
-        
-        try:
-            obj_num = str(int(max(self.obj_ids.keys())) + 1)
-        except ValueError:
-            obj_num = '0'
-        
-        self.obj_ids[str(obj_num)] = id_
-        
-        return id_
-        
-    def create(self, file_name: str, file_type: str = 'text/acmi/tacview', acmi_ver: str = '2.1'):
-        '''
-        Create an ACMI file with a basic header
-        
-        Args:
-            file_name:
-                Full filepath or filename of ACMI file to create
-            file_type:
-                See default
-            acmi_ver:
-                See default
-        '''
-        
-        self.file_name      = file_name
-        self.reference_time = self.get_timestamp()
-        
-        if not self.file_name.endswith('.acmi'):
-            self.file_name += '.acmi'
-        
-        dir_name = os.path.dirname(file_name)
-        
-        if dir_name and not os.path.exists(dir_name):
-            os.makedirs(dir_name)
-        
-        with open(self.file_name, 'w') as log:
-            log.write(header_mandatory.format(filetype=file_type,
-                                              acmiver=acmi_ver,
-                                              reftime=self.get_timestamp().isoformat()))
-    
-    def get_timestamp(self) -> dt.datetime:
-        '''
-        Find the true time to provide accurate sample timestamps
-        
-        Returns:
-                Current UTC time
-        '''
-        
-        return dt.datetime.utcnow()
-
-    def insert_user_header(self, header_content: dict) -> bool:
-        '''
-        Insert special header parameters
-        (NOTE - DO THIS BEFORE INSERTING ANY ENTRIES)**************************
-        
-        Args:
-            header_content:
-                Header property names and values
-        
-        Returns:
-            Success:
-                Whether or not the operation was successful
-        '''
-        
-        if not type(header_content) == dict:
-            raise TypeError('"header_content" must be of type dict, not {}'.format(type(header_content)))
-        
-        header = self.format_user_header(header_content)
-        
-        try:
-            with open(self.file_name, 'a') as log:
-                log.write(header)
-            return True
-        
-        except FileNotFoundError:
-            print('ERROR - ACMI file not found')
-            return False
-    
-    def format_user_header(self, header_content: dict) -> str:
-        '''
-        Create an ACMI file header with user defined fields/values (does not
-        include mandatory header fields)
-        
-        Args:
-            header_content:
-                Header property names and values
-        
-        Returns:
-                Formatted header string
-        '''
-        
-        if not type(header_content) == dict:
-            raise TypeError('"header_content" must be of type dict, not {}'.format(type(header_content)))
-        
-        header_list = ['0,{}={}'.format(key, header_content[key]) for key in header_content.keys()]
-        return '\n'.join(header_list) + '\n'
-    
-    def insert_entry(self, obj_num: int, data: dict, timestamp: bool = True) -> bool:
-        '''
-        Log a single entry of telemetry in the ACMI file for a given object
-        
-        Args:
-            obj_num:
-                Object number as represented in the ID-lookup dictionary
-                self.obj_ids
-            data:
-                Object information to be included in the new entry
-        
-        Returns:
-            Success:
-                Whether or not the operation was successful
-        '''
-        
-        if not type(data) == dict:
-            raise TypeError('"data" must be of type dict, not {}'.format(type(data)))
-        
-        entry = self.format_entry(obj_num, data, timestamp)
-        
-        try:
-            with open(self.file_name, 'a') as log:
-                log.write(entry)
-            return True
-        
-        except FileNotFoundError:
-            print('ERROR - ACMI file not found')
-            return False
-    
-    def format_entry(self, obj_num: int, data: dict, timestamp: bool = True):
-        '''
-        Create a single entry of telemetry for a given object
-        
-        Args:
-            obj_num:
-                Object number as represented in the ID-lookup dictionary
-                self.obj_ids
-            data:
-                Object information to be included in the new entry
-        
-        Returns:
-                Formatted entry string
-        '''
-        
-        if not type(data) == dict:
-            raise TypeError('"data" must be of type dict, not {}'.format(type(data)))
-        
-        if timestamp:
-            current_time = self.get_timestamp()
-            diff_sec     = (current_time - self.reference_time).total_seconds()
-            entry = '#{:0.2f}\n{},'.format(diff_sec, self.obj_ids[str(obj_num)])
-        else:
-            entry = '{},'.format(self.obj_ids[str(obj_num)])
-        
-        entry += ','.join('{}={}'.format(name, data[name]).replace(',', '\,') for name in data.keys())
-        entry += '\n'
-        
-        return entry
-    
-    
-    
-    
+'''
+Module to make Tacview compatible ACMI files - see https://www.tacview.net/documentation/acmi/en/
+'''
+
+
+import io
+import os
+import re
+import json
+import atexit
+import weakref
+import zipfile
+from time import monotonic
+from bisect import bisect_right
+from collections import deque
+import datetime as dt
+
+
+MAX_NUM_OBJS     = 0xFFFFFFFFFFFFFFFE
+FLUSH_SIZE       = 64 * 1024 # characters
+FLUSH_INTERVAL   = 1.0       # seconds
+COMPRESS_LEVEL   = 6
+ZIP_EXTENSION    = '.zip.acmi'
+TXT_EXTENSION    = '.txt.acmi'
+INDEX_EXTENSION  = '.index.json'
+INDEX_MAX_FRAMES = 4096 # max number of time frames kept in an ACMIReader index
+UNESCAPED_COMMA  = re.compile(r'(?<!\\),')
+header_mandatory = ('FileType={filetype}\n' 
+                    'FileVersion={acmiver}\n'
+                    '0,ReferenceTime={reftime}Z\n')
+open_acmis       = weakref.WeakSet()
+
+
+def close_all():
+    '''
+    Flush and close every ACMI file that is still open for buffered writing
+    (registered to run automatically at interpreter exit, including after
+    an unhandled exception or KeyboardInterrupt)
+    '''
+    
+    for acmi in list(open_acmis):
+        acmi.close()
+
+atexit.register(close_all)
+
+def parse_entry(line: str) -> tuple:
+    '''
+    Parse a single (complete) ACMI object line
+    
+    Args:
+        line:
+            Object update line (i.e. "1,T=0.1|0.2|300,Name=F-16C") or
+            removal line (i.e. "-1")
+    
+    Returns:
+            Tuple of the object's hex ID and a dictionary of its properties
+            (None if the line removes the object)
+    '''
+    
+    if line.startswith('-'):
+        return line[1:], None
+    
+    fields = UNESCAPED_COMMA.split(line)
+    props  = {}
+    
+    for field in fields[1:]:
+        name, _, value = field.partition('=')
+        props[name]    = value.replace('\\,', ',')
+    
+    return fields[0], props
+
+def value_matches(new, old, tolerance: float = 0) -> bool:
+    '''
+    Check whether a property value is unchanged (within tolerance for
+    numeric values/strings)
+    
+    Args:
+        new:
+            New property value
+        old:
+            Last written property value
+        tolerance:
+            Largest numeric difference still considered unchanged
+    
+    Returns:
+            Whether or not the value is unchanged
+    '''
+    
+    if new == old:
+        return True
+    
+    if tolerance:
+        try:
+            return abs(float(new) - float(old)) <= tolerance
+        except (TypeError, ValueError):
+            return False
+    
+    return False
+
+
+class ACMI(object):
+    '''
+    Class used to create and maintain a given ACMI file used by the
+    downloadable program Tacview
+    '''
+        
+    def __init__(self, num_objs: int = 1, delta: bool = False, tolerances: dict = None):
+        '''
+        Initialize class object and create a member dict named "obj_ids" to
+        hold unique/valid HEX ID values for each object to be displayed
+        
+        Args:
+            num_objs:
+                Number of objects to simulaneously display in Tacview
+            delta:
+                Whether or not to only write properties (and coordinate
+                components of "T") that changed since the object's last
+                written update - Tacview keeps the previous value of anything
+                omitted
+            tolerances:
+                Optional dictionary of property name to numeric tolerance. With
+                delta=True, a numeric property (or "T" component) is only
+                written again once it differs from its last written value by
+                more than its tolerance
+        '''
+        
+        self.obj_ids        = {}
+        self.next_id        = 1       # next never used hex ID (0 is the global object)
+        self.next_obj_num   = 0       # next never used object number
+        self.free_ids       = deque() # released hex IDs, reused oldest first
+        self.removed_ids    = []      # hex IDs of removed objects whose "-ID" line is not written yet
+        self.delta          = delta
+        self.tolerances     = dict(tolerances) if tolerances else {}
+        self.obj_states     = {}
+        self.file_name      = None
+        self.log            = None
+        self.archive        = None
+        self.closed         = False # whether close() was called since create()
+        self.buffer         = []
+        self.buffer_size    = 0
+        self.flush_size     = FLUSH_SIZE
+        self.flush_interval = FLUSH_INTERVAL
+        self.last_flush     = monotonic()
+        
+        self.reference_time  = None
+        self.reference_clock = None
+        
+        if num_objs > MAX_NUM_OBJS:
+            raise Exception('Too many objects specified - cannot be more than {}'.format(MAX_NUM_OBJS))
+        
+        for obj_num in range(num_objs):
+            self.add_object()
+        
+    def add_object(self, obj_num: int = None) -> str:
+        '''
+        Append a new and unique hex object ID to the self.obj_ids dict. IDs
+        of removed objects are reused (oldest first) before new ones are
+        handed out, so adding/removing objects takes constant time no matter
+        how many objects are tracked. An ID is only reused once the frame
+        removing its previous object was written (see insert_frame()), so
+        Tacview never mistakes a new object for the old one
+        
+        Args:
+            obj_num:
+                Object number to register the ID under (the next unused
+                number if not given)
+        
+        Returns:
+                Hex ID for new object
+        '''
+        
+        if obj_num is None:
+            obj_num = self.next_obj_num
+        
+        obj_num = str(obj_num)
+        
+        if obj_num in self.obj_ids:
+            raise Exception('Object number {} is already in use'.format(obj_num))
+        
+        if self.free_ids:
+            id_ = self.free_ids.popleft()
+        elif self.next_id <= MAX_NUM_OBJS:
+            id_ = '{:X}'.format(self.next_id)
+            self.next_id += 1
+        else:
+            raise Exception('Too many objects specified - cannot be more than {}'.format(MAX_NUM_OBJS))
+        
+        if obj_num.isdigit():
+            self.next_obj_num = max(self.next_obj_num, int(obj_num) + 1)
+        
+        self.obj_ids[obj_num] = id_
+        
+        return id_
+    
+    def remove_object(self, obj_num: int) -> str:
+        '''
+        Remove an object from the self.obj_ids dict. Its "-ID" line is
+        written with the next frame (see insert_frame()) and only then is its
+        hex ID released for reuse by add_object()
+        
+        Args:
+            obj_num:
+                Object number as represented in the ID-lookup dictionary
+                self.obj_ids
+        
+        Returns:
+                Hex ID the object had
+        '''
+        
+        id_ = self.obj_ids.pop(str(obj_num))
+        
+        self.removed_ids.append(id_)
+        self.reset_state(obj_num)
+        
+        return id_
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def create(self,
+               file_name:      str,
+               file_type:      str   = 'text/acmi/tacview',
+               acmi_ver:       str   = '2.1',
+               buffered:       bool  = False,
+               flush_size:     int   = FLUSH_SIZE,
+               flush_interval: float = FLUSH_INTERVAL,
+               compress:       bool  = False,
+               compress_level: int   = COMPRESS_LEVEL):
+        '''
+        Create an ACMI file with a basic header
+        
+        By default every header/entry insertion opens the file, appends to it
+        and closes it again. With buffered=True the file is instead kept open
+        and entries are collected in memory and written out together once
+        flush_size characters are pending or flush_interval seconds have
+        passed since the last write. Entries are only ever written as complete
+        lines, so the file stays well-formed even if the program dies. Call
+        close() (or use the ACMI object as a context manager) when done -
+        buffered files still open at interpreter exit are closed
+        automatically
+        
+        With compress=True (or a file name ending in ".zip.acmi") the file is
+        written as a zipped ACMI file that Tacview opens directly. The data is
+        compressed as a stream while it is written (always buffered), so
+        memory use does not grow with the recording. The archive is only
+        complete once close() has been called
+        
+        Args:
+            file_name:
+                Full filepath or filename of ACMI file to create
+            file_type:
+                See default
+            acmi_ver:
+                See default
+            buffered:
+                Whether or not to keep the file open and buffer entries
+            flush_size:
+                Number of buffered characters that triggers a write
+            flush_interval:
+                Maximum time in seconds entries stay in the buffer
+            compress:
+                Whether or not to write a zipped ACMI file
+            compress_level:
+                Compression level from 0 (fastest) to 9 (smallest)
+        '''
+        
+        self.close()
+        
+        self.file_name       = file_name
+        self.closed          = False
+        self.reference_time  = self.get_timestamp()
+        self.reference_clock = monotonic()
+        
+        if not self.file_name.endswith('.acmi'):
+            self.file_name += '.acmi'
+        
+        if self.file_name.endswith(ZIP_EXTENSION):
+            compress = True
+        elif compress:
+            self.file_name = self.file_name[:-len('.acmi')] + ZIP_EXTENSION
+        
+        dir_name = os.path.dirname(file_name)
+        
+        if dir_name and not os.path.exists(dir_name):
+            os.makedirs(dir_name)
+        
+        header = header_mandatory.format(filetype=file_type,
+                                         acmiver=acmi_ver,
+                                         reftime=self.get_timestamp().isoformat())
+        
+        if compress:
+            member_name  = os.path.basename(self.file_name)[:-len(ZIP_EXTENSION)] + TXT_EXTENSION
+            self.archive = zipfile.ZipFile(self.file_name,
+                                           'w',
+                                           compression=zipfile.ZIP_DEFLATED,
+                                           compresslevel=compress_level)
+            self.log     = io.TextIOWrapper(self.archive.open(member_name, 'w', force_zip64=True),
+                                            encoding='utf-8')
+            self.log.write(header)
+        else:
+            with open(self.file_name, 'w') as log:
+                log.write(header)
+        
+        if buffered or compress:
+            self.flush_size     = flush_size
+            self.flush_interval = flush_interval
+            self.last_flush     = monotonic()
+            
+            if self.log is None:
+                self.log = open(self.file_name, 'a')
+            
+            open_acmis.add(self)
+    
+    def write(self, text: str) -> bool:
+        '''
+        Append text (one or more complete lines) to the ACMI file - either
+        directly or through the write buffer (see create())
+        
+        Args:
+            text:
+                Text to append
+        
+        Returns:
+            Success:
+                Whether or not the operation was successful
+        '''
+        
+        if self.closed:
+            print('ERROR - ACMI file already closed')
+            return False
+        
+        if self.log is None:
+            try:
+                with open(self.file_name, 'a') as log:
+                    log.write(text)
+                return True
+            
+            except (FileNotFoundError, TypeError):
+                print('ERROR - ACMI file not found')
+                return False
+        
+        self.buffer.append(text)
+        self.buffer_size += len(text)
+        
+        if (self.buffer_size >= self.flush_size) or ((monotonic() - self.last_flush) >= self.flush_interval):
+            self.flush()
+        
+        return True
+    
+    def flush(self):
+        '''
+        Write all buffered entries to the ACMI file
+        '''
+        
+        if self.log is not None:
+            if self.buffer:
+                self.log.write(''.join(self.buffer))
+                self.log.flush()
+            
+            self.buffer      = []
+            self.buffer_size = 0
+            self.last_flush  = monotonic()
+    
+    def close(self):
+        '''
+        Flush all buffered entries and close the ACMI file (if it was created
+        with buffered=True or compress=True). Compressed files are finalised
+        here. Nothing can be written to the file afterwards (until create()
+        is called again)
+        '''
+        
+        if self.file_name is not None:
+            self.closed = True
+        
+        if self.log is not None:
+            self.flush()
+            self.log.close()
+            self.log = None
+            
+            if self.archive is not None:
+                self.archive.close()
+                self.archive = None
+            
+            open_acmis.discard(self)
+    
+    def get_timestamp(self) -> dt.datetime:
+        '''
+        Find the true time to provide accurate sample timestamps
+        
+        Returns:
+                Current UTC time
+        '''
+        
+        return dt.datetime.utcnow()
+    
+    def get_elapsed(self) -> float:
+        '''
+        Find the time since the ACMI file was created using the monotonic
+        clock (much cheaper than get_timestamp() and unaffected by system
+        clock changes)
+        
+        Returns:
+                Seconds since the file's reference time
+        '''
+        
+        return monotonic() - self.reference_clock
+    
+    def find_offset(self, timestamp=None) -> float:
+        '''
+        Convert a frame timestamp to seconds since the file's reference time
+        
+        Args:
+            timestamp:
+                Either a float/int number of seconds since the reference time
+                (i.e. from the caller's own monotonic clock), a datetime.datetime
+                (UTC) or None for the current time (see get_elapsed())
+        
+        Returns:
+                Seconds since the file's reference time
+        '''
+        
+        if timestamp is None:
+            return self.get_elapsed()
+        
+        if isinstance(timestamp, dt.datetime):
+            return (timestamp - self.reference_time).total_seconds()
+        
+        return float(timestamp)
+
+    def insert_user_header(self, header_content: dict) -> bool:
+        '''
+        Insert special header parameters
+        (NOTE - DO THIS BEFORE INSERTING ANY ENTRIES)**************************
+        
+        Args:
+            header_content:
+                Header property names and values
+        
+        Returns:
+            Success:
+                Whether or not the operation was successful
+        '''
+        
+        if not type(header_content) == dict:
+            raise TypeError('"header_content" must be of type dict, not {}'.format(type(header_content)))
+        
+        header = self.format_user_header(header_content)
+        
+        return self.write(header)
+    
+    def format_user_header(self, header_content: dict) -> str:
+        '''
+        Create an ACMI file header with user defined fields/values (does not
+        include mandatory header fields)
+        
+        Args:
+            header_content:
+                Header property names and values
+        
+        Returns:
+                Formatted header string
+        '''
+        
+        if not type(header_content) == dict:
+            raise TypeError('"header_content" must be of type dict, not {}'.format(type(header_content)))
+        
+        header_list = ['0,{}={}'.format(key, str(header_content[key]).replace(',', '\\,')) for key in header_content.keys()]
+        return '\n'.join(header_list) + '\n'
+    
+    def insert_entry(self, obj_num: int, data: dict, timestamp: bool = True) -> bool:
+        '''
+        Log a single entry of telemetry in the ACMI file for a given object
+        
+        Args:
+            obj_num:
+                Object number as represented in the ID-lookup dictionary
+                self.obj_ids
+            data:
+                Object information to be included in the new entry
+        
+        Returns:
+            Success:
+                Whether or not the operation was successful
+        '''
+        
+        if not type(data) == dict:
+            raise TypeError('"data" must be of type dict, not {}'.format(type(data)))
+        
+        entry = self.format_entry(obj_num, data, timestamp)
+        
+        return self.write(entry)
+    
+    def format_entry(self, obj_num: int, data: dict, timestamp: bool = True):
+        '''
+        Create a single entry of telemetry for a given object
+        
+        Args:
+            obj_num:
+                Object number as represented in the ID-lookup dictionary
+                self.obj_ids
+            data:
+                Object information to be included in the new entry
+        
+        Returns:
+                Formatted entry string
+        '''
+        
+        if not type(data) == dict:
+            raise TypeError('"data" must be of type dict, not {}'.format(type(data)))
+        
+        if timestamp:
+            current_time = self.get_timestamp()
+            diff_sec     = (current_time - self.reference_time).total_seconds()
+            entry = '#{:0.2f}\n'.format(diff_sec)
+        else:
+            entry = ''
+        
+        entry += self.format_properties(obj_num, data)
+        
+        return entry
+    
+    def format_properties(self, obj_num: int, data: dict) -> str:
+        '''
+        Create the object update line (without time marker) for a given object
+        
+        Args:
+            obj_num:
+                Object number as represented in the ID-lookup dictionary
+                self.obj_ids
+            data:
+                Object information to be included in the line
+        
+        Returns:
+                Formatted object update line
+        '''
+        
+        if self.delta:
+            data = self.find_changes(obj_num, data)
+            
+            if not data:
+                return ''
+        
+        line  = '{},'.format(self.obj_ids[str(obj_num)])
+        line += ','.join('{}={}'.format(name, data[name]).replace(',', '\\,') for name in data.keys())
+        line += '\n'
+        
+        return line
+    
+    def set_tolerance(self, name: str, tolerance: float):
+        '''
+        Set the numeric tolerance used for delta encoding of a property
+        
+        Args:
+            name:
+                Property name (i.e. "T" or "IAS")
+            tolerance:
+                Largest change that is not written out
+        '''
+        
+        self.tolerances[name] = tolerance
+    
+    def reset_state(self, obj_num: int = None):
+        '''
+        Forget the last written properties of an object (or of all objects)
+        so that its next update is written out in full
+        
+        Args:
+            obj_num:
+                Object number as represented in the ID-lookup dictionary
+                self.obj_ids (None for all objects)
+        '''
+        
+        if obj_num is None:
+            self.obj_states = {}
+        else:
+            self.obj_states.pop(str(obj_num), None)
+    
+    def find_changes(self, obj_num: int, data: dict) -> dict:
+        '''
+        Filter an object's properties down to the ones that changed since its
+        last written update (see delta and tolerances in __init__()). The
+        object's state is updated with everything that is returned
+        
+        Properties with "|" separated components (i.e. "T") are compared
+        component by component - unchanged components are left blank, which
+        Tacview reads as "same as before"
+        
+        Args:
+            obj_num:
+                Object number as represented in the ID-lookup dictionary
+                self.obj_ids
+            data:
+                Object information to be included in the new entry
+        
+        Returns:
+                Properties that need to be written
+        '''
+        
+        state   = self.obj_states.setdefault(str(obj_num), {})
+        changes = {}
+        
+        for name, value in data.items():
+            tolerance = self.tolerances.get(name, 0)
+            
+            if isinstance(value, str) and ('|' in value):
+                components = value.split('|')
+                last       = state.get(name)
+                
+                if (last is None) or (len(last) != len(components)):
+                    state[name]   = components
+                    changes[name] = value
+                    continue
+                
+                changed = ['' if value_matches(new, old, tolerance) else new for new, old in zip(components, last)]
+                
+                if any(changed):
+                    state[name]   = [new if new else old for new, old in zip(changed, last)]
+                    changes[name] = '|'.join(changed)
+                
+            elif (name not in state) or not value_matches(value, state[name], tolerance):
+                state[name]   = value
+                changes[name] = value
+        
+        return changes
+    
+    def insert_frame(self, timestamp, frame: dict, removed: list = None) -> bool:
+        '''
+        Log one frame of telemetry for many objects at once: a single time
+        marker followed by an update line for every object in the frame
+        
+        Args:
+            timestamp:
+                Time of the frame - seconds since the file's reference time
+                (i.e. from the caller's own monotonic clock), a
+                datetime.datetime (UTC) or None for the current time
+            frame:
+                Dictionary of object information to include, keyed by object
+                number as represented in the ID-lookup dictionary self.obj_ids
+            removed:
+                Optional list of object numbers that disappeared at this time.
+                They are removed from the Tacview recording (as are objects
+                removed through remove_object() since the last frame) and their
+                IDs released once the frame was written
+        
+        Returns:
+            Success:
+                Whether or not the operation was successful
+        '''
+        
+        if not type(frame) == dict:
+            raise TypeError('"frame" must be of type dict, not {}'.format(type(frame)))
+        
+        entry = self.format_frame(timestamp, frame, removed)
+        
+        if removed:
+            for obj_num in removed:
+                self.remove_object(obj_num)
+        
+        if not self.write(entry):
+            return False
+        
+        self.free_ids.extend(self.removed_ids)
+        self.removed_ids = []
+        
+        return True
+    
+    def format_frame(self, timestamp, frame: dict, removed: list = None) -> str:
+        '''
+        Create one frame of telemetry for many objects - see insert_frame()
+        
+        Args:
+            timestamp:
+                Time of the frame - seconds since the file's reference time,
+                a datetime.datetime (UTC) or None for the current time
+            frame:
+                Dictionary of object information to include, keyed by object
+                number as represented in the ID-lookup dictionary self.obj_ids
+            removed:
+                Optional list of object numbers to remove from the recording
+                at this time (objects already removed through remove_object()
+                are included automatically)
+        
+        Returns:
+                Formatted frame string
+        '''
+        
+        lines = ['#{:0.2f}\n'.format(self.find_offset(timestamp))]
+        
+        for obj_num, data in frame.items():
+            if not type(data) == dict:
+                raise TypeError('"data" must be of type dict, not {}'.format(type(data)))
+            
+            lines.append(self.format_properties(obj_num, data))
+        
+        if removed:
+            for obj_num in removed:
+                lines.append('-{}\n'.format(self.obj_ids[str(obj_num)]))
+        
+        for id_ in self.removed_ids:
+            lines.append('-{}\n'.format(id_))
+        
+        return ''.join(lines)
+    
+    
+    
+    
+
+
+class ACMIReader(object):
+    '''
+    Class used to read back (zipped or plain text) ACMI files lazily, one
+    line at a time, so that memory use does not grow with the recording.
+    A sidecar index (file_name + INDEX_EXTENSION) is built on the first seek
+    and reused afterwards. It holds the offsets of at most INDEX_MAX_FRAMES
+    evenly strided time frames plus the time span of each object, so that
+    seeking to a time or pulling one object's track only scans a short
+    stretch of the file while the index stays the same size no matter how
+    long the recording is. Example -
+        
+        with ACMIReader('match.zip.acmi') as reader:
+            for time, obj_id, props in reader.entries(start=60, end=120):
+                print(time, obj_id, props)
+            
+            for time, props in reader.track('1'):
+                print(time, props.get('T'))
+    '''
+    
+    def __init__(self, file_name: str, save_index: bool = True):
+        '''
+        Args:
+            file_name:
+                Full filepath or filename of ACMI file to read
+            save_index:
+                Whether or not to save the index next to the ACMI file so that
+                it can be reused by later readers
+        '''
+        
+        self.file_name    = file_name
+        self.index_name   = file_name + INDEX_EXTENSION
+        self.save_index   = save_index
+        self.archive      = None
+        self.member_name  = None
+        self.header       = {}   # i.e. FileType and FileVersion
+        self.global_props = {}   # properties of the global object (0) set in the header
+        self.data_offset  = 0    # offset of the first time frame
+        self.times        = []   # time of each indexed frame (seconds since ReferenceTime)
+        self.time_offsets = []   # offset of each indexed frame's time marker
+        self.obj_spans    = {}   # times of each object's first and last line keyed by hex ID
+        self.indexed      = False
+        
+        self.reference_time = None
+        
+        self.open()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def open(self):
+        '''
+        Open the ACMI file (if zipped) and read its header
+        '''
+        
+        if zipfile.is_zipfile(self.file_name):
+            self.archive     = zipfile.ZipFile(self.file_name)
+            self.member_name = self.archive.namelist()[0]
+        
+        self.read_header()
+    
+    def close(self):
+        '''
+        Close the ACMI file
+        '''
+        
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+    
+    def open_stream(self):
+        '''
+        Open a new binary stream of the ACMI file's (uncompressed) contents.
+        Offsets used throughout this class are byte offsets into this stream
+        
+        Returns:
+                Binary file-like object
+        '''
+        
+        if self.archive is not None:
+            return self.archive.open(self.member_name)
+        
+        return open(self.file_name, 'rb')
+    
+    def iter_lines(self, stream, offset: int = 0):
+        '''
+        Iterate through the complete lines of the ACMI file starting at the
+        given offset. Lines ending in a backslash are joined with the next
+        line (multi-line property values)
+        
+        Args:
+            stream:
+                Stream returned by open_stream()
+            offset:
+                Byte offset of the first line to read
+        
+        Yields:
+                Tuple of each line's offset and text (without line ending)
+        '''
+        
+        stream.seek(offset)
+        
+        start = offset
+        parts = []
+        
+        for raw in stream:
+            if not parts:
+                start = offset
+            
+            offset += len(raw)
+            line    = raw.decode('utf-8').rstrip('\r\n')
+            
+            if start == 0:
+                line = line.lstrip('\ufeff')
+            
+            if line.endswith('\\') and not line.endswith('\\\\'):
+                parts.append(line[:-1])
+                continue
+            
+            parts.append(line)
+            
+            yield start, '\n'.join(parts)
+            
+            parts = []
+        
+        if parts:
+            yield start, '\n'.join(parts)
+    
+    def read_header(self):
+        '''
+        Read the file header (everything before the first time frame) into
+        self.header, self.global_props and self.reference_time
+        '''
+        
+        with self.open_stream() as stream:
+            for offset, line in self.iter_lines(stream):
+                if line.startswith('#'):
+                    self.data_offset = offset
+                    break
+                
+                if line.startswith('0,'):
+                    self.global_props.update(parse_entry(line)[1])
+                elif '=' in line:
+                    name, _, value = line.partition('=')
+                    self.header[name] = value
+            else:
+                self.data_offset = stream.tell()
+        
+        try:
+            self.reference_time = dt.datetime.fromisoformat(self.global_props['ReferenceTime'].rstrip('Z'))
+        except (KeyError, ValueError):
+            self.reference_time = None
+    
+    def load_index(self):
+        '''
+        Load the sidecar index if it is still valid for the ACMI file,
+        otherwise build it (and save it if save_index is set)
+        '''
+        
+        if self.indexed:
+            return
+        
+        stat = os.stat(self.file_name)
+        
+        try:
+            with open(self.index_name, 'r') as index_file:
+                index = json.load(index_file)
+            
+            if (index['size'] == stat.st_size) and (index['mtime'] == stat.st_mtime):
+                self.times        = index['times']
+                self.time_offsets = index['time_offsets']
+                self.obj_spans    = index['obj_spans']
+                self.indexed      = True
+                return
+        
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        self.build_index()
+        
+        if self.save_index:
+            try:
+                with open(self.index_name, 'w') as index_file:
+                    json.dump({'size':         stat.st_size,
+                               'mtime':        stat.st_mtime,
+                               'times':        self.times,
+                               'time_offsets': self.time_offsets,
+                               'obj_spans':    self.obj_spans},
+                              index_file,
+                              separators=(',', ':'))
+            
+            except OSError:
+                print('ERROR - could not save ACMI index {}'.format(self.index_name))
+    
+    def build_index(self):
+        '''
+        Scan the whole ACMI file once and record the offsets of evenly
+        strided time frames (the stride doubles whenever more than
+        INDEX_MAX_FRAMES frames would be kept) and the time span of every
+        object
+        '''
+        
+        times        = []
+        time_offsets = []
+        obj_spans    = {}
+        stride       = 1
+        num_frames   = 0
+        time         = 0
+        
+        with self.open_stream() as stream:
+            for offset, line in self.iter_lines(stream, self.data_offset):
+                if line.startswith('#'):
+                    time = float(line[1:])
+                    
+                    if not num_frames % stride:
+                        times.append(time)
+                        time_offsets.append(offset)
+                        
+                        if len(times) > INDEX_MAX_FRAMES:
+                            times        = times[::2]
+                            time_offsets = time_offsets[::2]
+                            stride      *= 2
+                    
+                    num_frames += 1
+                
+                elif line and not line.startswith('//'):
+                    obj_id = line.split(',', 1)[0].lstrip('-')
+                    span   = obj_spans.get(obj_id)
+                    
+                    if span is None:
+                        obj_spans[obj_id] = [time, time]
+                    else:
+                        span[1] = time
+        
+        self.times        = times
+        self.time_offsets = time_offsets
+        self.obj_spans    = obj_spans
+        self.indexed      = True
+    
+    def seek(self, timestamp: float) -> tuple:
+        '''
+        Find the last indexed frame at or before the given time
+        
+        Args:
+            timestamp:
+                Seconds since the file's reference time
+        
+        Returns:
+                Tuple of the frame's time and byte offset (time 0 at the first
+                frame's offset if timestamp is before the first indexed frame)
+        '''
+        
+        self.load_index()
+        
+        i = bisect_right(self.times, timestamp) - 1
+        
+        if i < 0:
+            return 0, self.data_offset
+        
+        return self.times[i], self.time_offsets[i]
+    
+    def entries(self, start: float = None, end: float = None):
+        '''
+        Iterate through the object lines of the ACMI file, starting at the
+        frame in effect at time "start" (found through the index)
+        
+        Args:
+            start:
+                Optional time in seconds since the file's reference time to
+                start at (None starts at the first frame)
+            end:
+                Optional time in seconds after which to stop
+        
+        Yields:
+                Tuple of the time, object hex ID and dictionary of properties
+                (None if the object was removed) of each object line
+        '''
+        
+        if start is None:
+            time, offset = 0, self.data_offset
+        else:
+            time, offset = self.seek(start)
+        
+        # The indexed frame can be earlier than the frame in effect at
+        # "start" - hold back each frame's lines until the next time marker
+        # shows whether the frame is still in effect
+        pending = [] if start is not None else None
+        
+        with self.open_stream() as stream:
+            for offset, line in self.iter_lines(stream, offset):
+                if line.startswith('#'):
+                    time = float(line[1:])
+                    
+                    if pending is not None:
+                        if time <= start:
+                            pending = []
+                            continue
+                        
+                        yield from pending
+                        pending = None
+                    
+                    if (end is not None) and (time > end):
+                        return
+                
+                elif line and not line.startswith('//'):
+                    if pending is not None:
+                        pending.append((time, *parse_entry(line)))
+                    else:
+                        yield (time, *parse_entry(line))
+        
+        if pending:
+            yield from pending
+    
+    def track(self, obj_id: str, start: float = None, end: float = None):
+        '''
+        Iterate through every update of a single object, only scanning the
+        part of the file between the object's first and last line (found
+        through the index)
+        
+        Args:
+            obj_id:
+                Hex ID of the object as written in the ACMI file
+            start:
+                Optional time in seconds since the file's reference time to
+                start at
+            end:
+                Optional time in seconds after which to stop
+        
+        Yields:
+                Tuple of the time and dictionary of properties (None if the
+                object was removed) of each of the object's updates
+        '''
+        
+        self.load_index()
+        
+        span = self.obj_spans.get(obj_id)
+        
+        if span is None:
+            return
+        
+        first, last = span
+        
+        if (end is None) or (end > last):
+            end = last
+        
+        for time, entry_id, props in self.entries(first if (start is None) or (start < first) else start, end):
+            if (entry_id == obj_id) and ((start is None) or (time >= start)):
+                yield time, props
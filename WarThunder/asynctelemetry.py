@@ -0,0 +1,506 @@
+'''
+Module to query and access telemetry and map data during War Thunder matches
+from within an asyncio event loop (requires aiohttp)
+'''
+
+
+import asyncio
+import aiohttp
+from time import monotonic
+from json.decoder import JSONDecodeError
+from WarThunder import mapinfo, telemetry
+from WarThunder.connection import POOL_SIZE
+from WarThunder.mapinfo import URL_MAP_IMG, URL_MAP_INFO, URL_MAP_OBJ
+from WarThunder.telemetry import IP_ADDRESS, URL_INDICATORS, URL_STATE, URL_COMMENTS, URL_EVENTS
+from WarThunder.telemetry import TELEM_GROUP, MAP_GROUP, CHAT_GROUP
+
+
+def create_async_session(pool_size: int = POOL_SIZE) -> aiohttp.ClientSession:
+    '''
+    Create an aiohttp session that keeps its connections to the localhost
+    server alive and reuses them between requests (must be called from
+    within a running event loop)
+    
+    Args:
+        pool_size:
+            Maximum number of connections kept open to the localhost server
+    
+    Returns:
+            Session with a pooled connector
+    '''
+    
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=pool_size))
+
+async def get_json(session: aiohttp.ClientSession, url: str, timeout: float = None):
+    '''
+    Query the given localhost page and parse its JSON contents
+    
+    Args:
+        session:
+            Session used to query the localhost server
+        url:
+            Page to query
+        timeout:
+            Timeout in seconds for the request (None waits indefinitely)
+    
+    Returns:
+            Parsed JSON of the page
+    '''
+    
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        return await response.json(content_type=None)
+
+
+class AsyncMapInfo(mapinfo.MapInfo):
+    '''
+    asyncio counterpart of mapinfo.MapInfo - map files are downloaded with
+    awaitable requests, all other processing and queries are unchanged
+    '''
+    
+    def create_session(self):
+        '''
+        aiohttp sessions can only be created from within a running event
+        loop, so the session is opened on the first request instead (see
+        open())
+        '''
+        
+        return None
+    
+    async def open(self):
+        '''
+        Open the session used to query the localhost server (if not already
+        open)
+        '''
+        
+        if self.session is None:
+            self.session = create_async_session()
+    
+    async def close(self):
+        '''
+        Close all pooled connections to the localhost server
+        '''
+        
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    async def download_files(self) -> bool:
+        '''
+        Sample information about the map and the "seen" objects in the match
+        from the localhost. All needed map files are requested at the same
+        time - see mapinfo.MapInfo.download_files() for more info
+        
+        Returns:
+                Whether or not the map data was successfully retrieved
+        '''
+        
+        await self.open()
+        
+        self.map_valid = False
+        
+        requests = [self.fetch_info(), self.fetch_obj()]
+        
+        if self.map_digest is None:
+            requests.append(self.fetch_map_img())
+        
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        
+        try:
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            
+            info, obj = results[:2]
+            map_img   = results[2] if len(results) > 2 else None
+            
+            if (map_img is None) and self.map_changed(info):
+                map_img = await self.fetch_map_img()
+            
+            self.load_files(map_img, info, obj)
+        
+        except asyncio.TimeoutError:
+            print('ERROR: Timeout')
+        
+        except aiohttp.ClientConnectionError:
+            print('ERROR: could not download map.jpg')
+            self.map_generation = None # the game may have restarted
+        
+        except (OSError, JSONDecodeError, aiohttp.ClientResponseError):
+            print('Waiting to join a match')
+            self.map_generation = None
+            await asyncio.sleep(1)
+        
+        self.parse_meta()
+        
+        return self.map_valid
+    
+    async def fetch_map_img(self) -> bytes:
+        '''
+        Download the raw JPEG bytes of the current map
+        
+        Returns:
+                Contents of http://localhost:8111/map.img
+        '''
+        
+        # Like requests' timeout, limit each connect/read instead of the whole
+        # (comparatively large) download
+        timeout = aiohttp.ClientTimeout(sock_connect=self.timeout, sock_read=self.timeout)
+        
+        async with self.session.get(URL_MAP_IMG, timeout=timeout) as response:
+            return await response.read()
+    
+    async def fetch_info(self) -> dict:
+        '''
+        Download the current map's metadata
+        
+        Returns:
+                Parsed JSON of http://localhost:8111/map_info.json
+        '''
+        
+        return await get_json(self.session, URL_MAP_INFO, self.timeout)
+    
+    async def fetch_obj(self) -> list:
+        '''
+        Download the list of objects currently shown on the map
+        
+        Returns:
+                Parsed JSON of http://localhost:8111/map_obj.json
+        '''
+        
+        return await get_json(self.session, URL_MAP_OBJ, self.timeout)
+    
+    def submit_files(self, executor):
+        '''
+        Not supported - the map files are requested from the event loop by
+        download_files()
+        '''
+        
+        raise TypeError('AsyncMapInfo requests the map files from the event loop - await download_files() instead')
+
+
+class AsyncTelemInterface(telemetry.TelemInterface):
+    '''
+    asyncio counterpart of telemetry.TelemInterface. Every sample requests
+    all localhost pages at the same time from the running event loop (no
+    threads involved). Example -
+        
+        async with AsyncTelemInterface() as telem:
+            async for sample in telem.stream(hz=20):
+                print(sample.basic_telemetry)
+    '''
+    
+    def __init__(self,
+                 session:     aiohttp.ClientSession = None,
+                 pool_size:   int                   = POOL_SIZE,
+                 timeout:     float                 = None,
+                 map_timeout: float                 = mapinfo.REQUEST_TIMEOUT,
+                 telem_hz:    float                 = None,
+                 map_hz:      float                 = None,
+                 chat_hz:     float                 = None):
+        '''
+        Args:
+            session:
+                aiohttp.ClientSession used to query the localhost server. It
+                is shared with self.map_info. A new pooled session is opened
+                on the first request if not given
+            pool_size:
+                Maximum number of connections kept open to the localhost
+                server (only used if session is not given)
+            timeout:
+                Timeout in seconds for the telemetry, comment and event
+                requests (None waits indefinitely)
+            map_timeout:
+                Timeout in seconds for the map requests
+            telem_hz:
+                Maximum rate (in Hz) at which get_telemetry() requests
+                /indicators and /state (None requests them on every call)
+            map_hz:
+                Maximum rate (in Hz) at which get_telemetry() requests the map
+                image, info and objects (None requests them on every call)
+            chat_hz:
+                Maximum rate (in Hz) at which get_telemetry() requests the
+                comments and events (None requests them on every call)
+        '''
+        
+        super(AsyncTelemInterface, self).__init__(session=session,
+                                                  pool_size=pool_size,
+                                                  timeout=timeout,
+                                                  map_timeout=map_timeout,
+                                                  telem_hz=telem_hz,
+                                                  map_hz=map_hz,
+                                                  chat_hz=chat_hz)
+    
+    async def __aenter__(self):
+        await self.open()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+    
+    def create_session(self):
+        '''
+        aiohttp sessions can only be created from within a running event
+        loop, so the session is opened on the first request instead (see
+        open())
+        '''
+        
+        return None
+    
+    def create_map_info(self, timeout: float) -> AsyncMapInfo:
+        '''
+        Create the AsyncMapInfo object used to sample map data
+        
+        Args:
+            timeout:
+                Timeout in seconds for the map requests
+        
+        Returns:
+                New AsyncMapInfo object
+        '''
+        
+        return AsyncMapInfo(self.session, timeout)
+    
+    async def open(self):
+        '''
+        Open the session used to query the localhost server (if not already
+        open) and share it with self.map_info
+        '''
+        
+        if self.session is None:
+            self.session = create_async_session(self.pool_size)
+        
+        self.map_info.session = self.session
+    
+    async def close(self):
+        '''
+        Close all pooled connections to the localhost server
+        '''
+        
+        if self.map_future is not None:
+            self.map_future.cancel()
+            await asyncio.gather(self.map_future, return_exceptions=True)
+            self.map_future = None
+        
+        if self.session is not None:
+            await self.session.close()
+            self.session          = None
+            self.map_info.session = None
+    
+    def fetch_concurrent(self, *args, **kwargs):
+        '''
+        Not supported - get_telemetry() already requests all pages at the
+        same time
+        '''
+        
+        raise TypeError('AsyncTelemInterface requests all pages at the same time - await get_telemetry() instead')
+    
+    def start_sampler(self, *args, **kwargs):
+        '''
+        Not supported - iterate over stream() from the event loop instead
+        '''
+        
+        raise TypeError('AsyncTelemInterface samples from the event loop - use "async for sample in stream()" instead')
+    
+    def run_sampler(self, *args, **kwargs):
+        '''
+        Not supported - iterate over stream() from the event loop instead
+        '''
+        
+        raise TypeError('AsyncTelemInterface samples from the event loop - use "async for sample in stream()" instead')
+    
+    async def refresh_map(self):
+        '''
+        Download and process the map data (run as a background task unless
+        waited for - see get_telemetry())
+        '''
+        
+        self.map_ready = await self.map_info.download_files()
+    
+    async def finish_map(self):
+        '''
+        Wait for the background map refresh (if any) so that the map can be
+        refreshed as part of the sample
+        '''
+        
+        if self.map_future is not None:
+            future, self.map_future = self.map_future, None
+            await future # raise any error of the finished refresh
+    
+    def submit_map(self):
+        '''
+        Start refreshing the map data as a background task unless the
+        previous refresh is still running. Never waits for the map data
+        '''
+        
+        if self.map_future is not None:
+            if not self.map_future.done():
+                # try again on the next call instead of waiting
+                self.last_refresh[MAP_GROUP] = None
+                return
+            
+            future, self.map_future = self.map_future, None
+            future.result() # raise any error of the finished refresh
+        
+        self.map_future = asyncio.ensure_future(self.refresh_map())
+    
+    async def get_comments(self) -> list:
+        '''
+        Query http://localhost:8111/gamechat?lastId=-1 to get a list of all
+        comments (in JSON format) made in the current match
+        
+        Returns:
+                List of comments
+        '''
+        
+        await self.open()
+        
+        new_comments = await get_json(self.session,
+                                      URL_COMMENTS.format(IP_ADDRESS, self.last_comment_ID),
+                                      self.timeout)
+        return self.update_comments(new_comments)
+    
+    async def get_events(self) -> dict:
+        '''
+        Query http://localhost:8111/hudmsg?lastEvt=-1&lastDmg=-1 to get
+        information on all events (i.e. when someone is damaged or destroyed)
+        in the current match
+        
+        Returns:
+                Events log dictionary
+        '''
+        
+        await self.open()
+        
+        new_events = await get_json(self.session,
+                                    URL_EVENTS.format(IP_ADDRESS, self.last_event_ID),
+                                    self.timeout)
+        return self.update_events(new_events)
+    
+    async def get_telemetry(self, comments: bool = False, events: bool = False, wait_map: bool = None) -> bool:
+        '''
+        Sample the map, http://localhost:8111/indicators,
+        http://localhost:8111/state and (optionally) the comments and events
+        pages at the same time and build self.full_telemetry and
+        self.basic_telemetry - see telemetry.TelemInterface.get_telemetry()
+        for more info. Unless waiting for the map data, the map is refreshed
+        by a background task and the sample uses the latest map data that
+        finished processing
+        
+        Args:
+            comments:
+                Whether or not to query for match comment data
+            events:
+                Whether or not to query for match event data
+            wait_map:
+                Whether or not to wait for the map data to be refreshed
+                (None waits until valid map data was loaded once)
+        
+        Returns:
+                Whether or not player is in a match
+        '''
+        
+        await self.open()
+        
+        if wait_map is None:
+            wait_map = not self.map_ready
+        
+        now           = monotonic()
+        refresh_telem = self.refresh_due(TELEM_GROUP, now)
+        refresh_map   = self.refresh_due(MAP_GROUP, now)
+        refresh_chat  = self.refresh_due(CHAT_GROUP, now)
+        
+        if not (refresh_telem or refresh_map or refresh_chat):
+            return self.connected
+        
+        try:
+            if refresh_map and not wait_map:
+                self.submit_map()
+            elif refresh_map:
+                await self.finish_map()
+            
+            requests = []
+            
+            if refresh_telem:
+                requests.append(get_json(self.session, URL_INDICATORS, self.timeout))
+                requests.append(get_json(self.session, URL_STATE, self.timeout))
+            
+            if refresh_map and wait_map:
+                requests.append(self.refresh_map())
+            
+            if comments and refresh_chat:
+                requests.append(self.get_comments())
+            elif not comments:
+                self.comments = []
+            
+            if events and refresh_chat:
+                requests.append(self.get_events())
+            elif not events:
+                self.events = {}
+            
+            # Let every request finish before touching any results so that a
+            # failed request can't leave others still running in the background
+            results = await asyncio.gather(*requests, return_exceptions=True)
+            
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            
+            if refresh_telem:
+                self.indicators = results[0]
+                self.state      = results[1]
+            
+            self.parse_telemetry(refresh_telem)
+        
+        except Exception as e:
+            self.last_refresh    = dict.fromkeys(self.last_refresh)
+            self.full_telemetry  = {}
+            self.basic_telemetry = {}
+            self.connected       = False
+            
+            if isinstance(e, aiohttp.ClientConnectionError):
+                self.status = telemetry.WT_NOT_RUNNING
+            else:
+                import traceback
+                traceback.print_exc()
+                self.status = telemetry.OTHER_ERROR
+        
+        self.publish_sample()
+        
+        return self.connected
+    
+    async def stream(self, hz: float = 10, comments: bool = False, events: bool = False):
+        '''
+        Asynchronous iterator that samples telemetry at a fixed rate and
+        yields the published snapshot of every sample (the same
+        telemetry.TelemSample the synchronous sampler publishes as
+        self.sample). The map is refreshed by a background task so that slow
+        map downloads never delay a sample. If a sample takes longer than the
+        sample period, the next one starts right away
+        
+        Args:
+            hz:
+                Target sample rate in samples per second
+            comments:
+                Whether or not to query for match comment data
+            events:
+                Whether or not to query for match event data
+        
+        Yields:
+                Latest self.sample
+        '''
+        
+        loop      = asyncio.get_running_loop()
+        period    = 1 / hz
+        next_time = loop.time()
+        
+        while True:
+            await self.get_telemetry(comments, events, wait_map=False)
+            yield self.sample
+            
+            next_time += period
+            delay      = next_time - loop.time()
+            
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                next_time = loop.time()
@@ -0,0 +1,445 @@
+'''
+Module to benchmark the hot paths of the telemetry and map parsing pipeline
+against synthetic payloads (or a recording made with replay.RecordingSession)
+without War Thunder running. Run with -
+    
+    python -m WarThunder.benchmark --save baseline.json
+    python -m WarThunder.benchmark --compare baseline.json
+'''
+
+
+import io
+import os
+import sys
+import json
+import random
+import itertools
+import contextlib
+import argparse
+import tempfile
+import tracemalloc
+import imagehash
+from time import perf_counter
+from PIL import Image
+from WarThunder import acmi, mapinfo, replay, telemetry
+
+
+NUM_RUNS    = 200
+NUM_WARMUP  = 5
+OBJ_COUNTS  = [10, 100, 1000]
+PERCENTILES = [50, 90, 99]
+TOLERANCE   = 0.2 # fraction slower than the baseline median flagged as a regression
+SEED        = 8111
+ICONS       = ['HeavyTank', 'MediumTank', 'LightTank', 'TankDestroyer', 'SPAA',
+               'Wheeled', 'Tracked', 'Airdefence', 'Bomber', 'Assault', 'Fighter',
+               'Ship', 'TorpedoBoat', 'capture_zone', 'respawn_base_tank']
+COLORS      = ['#f40C00', '#185AFF', '#ff0D00', '#174DFF']
+INFO        = {'grid_steps':     [8192.0, 8192.0],
+               'grid_zero':      [-28672.0, 28672.0],
+               'map_generation': 1,
+               'map_max':        [32768.0, 32768.0],
+               'map_min':        [-32768.0, -32768.0]}
+INDICATORS  = {'valid':             True,
+               'type':              'p-51d_20',
+               'aviahorizon_pitch': 3.0,
+               'aviahorizon_roll':  -1.0,
+               'compass':           120.0,
+               'altitude_hour':     3000.0}
+STATE       = {'valid':     True,
+               'TAS, km/h': 400,
+               'flaps, %':  0,
+               'gear, %':   0}
+
+
+def synthetic_map_objs(num_objs: int, seed: int = SEED) -> list:
+    '''
+    Create a map_obj.json payload with an airfield, the player and the given
+    number of other randomly placed objects
+    
+    Args:
+        num_objs:
+            Number of objects besides the airfield and player
+        seed:
+            Seed of the random placement (same seed, same payload)
+    
+    Returns:
+            List of map object entries
+    '''
+    
+    rand = random.Random(seed)
+    objs = [{'type': 'airfield', 'color': '#185AFF', 'blink': 0, 'icon': 'none',
+             'sx': 0.338597, 'sy': 0.720108, 'ex': 0.357913, 'ey': 0.692523},
+            {'type': 'aircraft', 'color': '#fa3200', 'blink': 0, 'icon': 'Player',
+             'x': 0.5, 'y': 0.5, 'dx': -0.64, 'dy': 0.76}]
+    
+    for _ in range(num_objs):
+        objs.append({'type':  'ground_model',
+                     'color': rand.choice(COLORS),
+                     'blink': rand.choice([0, 0, 0, 1]),
+                     'icon':  rand.choice(ICONS),
+                     'x':     rand.random(),
+                     'y':     rand.random(),
+                     'dx':    rand.uniform(-1, 1),
+                     'dy':    rand.uniform(-1, 1)})
+    
+    return objs
+
+def move_map_objs(objs: list, dist: float) -> list:
+    '''
+    Move every moving object of a map_obj.json payload along its heading
+    
+    Args:
+        objs:
+            List of map object entries
+        dist:
+            Distance to move each object by (fraction of the map's size)
+    
+    Returns:
+            New list of map object entries
+    '''
+    
+    moved = []
+    
+    for obj in objs:
+        obj = dict(obj)
+        
+        if 'dx' in obj:
+            obj['x'] += obj['dx'] * dist
+            obj['y'] += obj['dy'] * dist
+        
+        moved.append(obj)
+    
+    return moved
+
+def synthetic_map_img() -> bytes:
+    '''
+    Find JPEG bytes of a map to benchmark with - the sample map shipped with
+    the package if there is one, otherwise a blank image
+    
+    Returns:
+            JPEG bytes
+    '''
+    
+    try:
+        with open(mapinfo.MAP_PATH, 'rb') as map_file:
+            return map_file.read()
+    
+    except OSError:
+        buffer = io.BytesIO()
+        Image.new('RGB', (1024, 1024), (40, 90, 40)).save(buffer, 'JPEG')
+        return buffer.getvalue()
+
+
+class SyntheticSession(object):
+    '''
+    Session-like object that answers every localhost request with the same
+    synthetic payload (see replay.ReplaySession for recorded payloads)
+    '''
+    
+    def __init__(self, num_objs: int = 100):
+        '''
+        Args:
+            num_objs:
+                Number of objects in the map_obj.json payload
+        '''
+        
+        self.payloads = {'/map.img':       synthetic_map_img(),
+                         '/map_info.json': json.dumps(INFO).encode(),
+                         '/map_obj.json':  json.dumps(synthetic_map_objs(num_objs)).encode(),
+                         '/indicators':    json.dumps(INDICATORS).encode(),
+                         '/state':         json.dumps(STATE).encode(),
+                         '/gamechat':      b'[]',
+                         '/hudmsg':        b'{"events": [], "damage": []}'}
+    
+    def get(self, url: str, **kwargs) -> replay.ReplayResponse:
+        return replay.ReplayResponse(url, 200, self.payloads[replay.find_path(url)])
+    
+    def close(self):
+        pass
+
+
+def parse_next(map_info: mapinfo.MapInfo, payloads):
+    '''
+    Process the next map_obj.json payload
+    
+    Args:
+        map_info:
+            MapInfo object to process the payload with
+        payloads:
+            Iterator of map_obj.json payloads
+    '''
+    
+    map_info.obj = next(payloads)
+    map_info.parse_meta()
+
+def percentile(values: list, pct: float) -> float:
+    '''
+    Find the given (nearest rank) percentile of a sorted list
+    
+    Args:
+        values:
+            Sorted list of values
+        pct:
+            Percentile between 0 and 100
+    
+    Returns:
+            Percentile value
+    '''
+    
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values) + 0.5)) - 1))
+    
+    return values[index]
+
+def measure(func, runs: int = NUM_RUNS, warmup: int = NUM_WARMUP) -> dict:
+    '''
+    Time repeated calls of a function and trace the memory one call allocates
+    
+    Args:
+        func:
+            Function to call without arguments
+        runs:
+            Number of timed calls
+        warmup:
+            Number of untimed calls made first
+    
+    Returns:
+            Dictionary of results - latency percentiles and mean in
+            microseconds, throughput in operations per second and the peak
+            number of bytes allocated by one call
+    '''
+    
+    for _ in range(warmup):
+        func()
+    
+    times = []
+    
+    for _ in range(runs):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    times.sort()
+    total = sum(times)
+    results = {'runs':    runs,
+               'mean_us': total / runs * 1e6}
+    
+    for pct in PERCENTILES:
+        results['p{}_us'.format(pct)] = percentile(times, pct) * 1e6
+    
+    results['ops_per_s']  = runs / total if total else float('inf')
+    results['peak_bytes'] = peak - baseline
+    
+    return results
+
+def run_queries(map_info: mapinfo.MapInfo) -> list:
+    '''
+    Call every category query of a MapInfo object once (like an overlay
+    drawing a frame would)
+    
+    Args:
+        map_info:
+            MapInfo object to query
+    
+    Returns:
+            List of the query results
+    '''
+    
+    return [map_info.airfields(), map_info.bombing_points(), map_info.tanks(),
+            map_info.wheeled_AIs(), map_info.tracked_AIs(), map_info.AAAs(),
+            map_info.planes(), map_info.ships(), map_info.tank_respawns(),
+            map_info.plane_respawns(), map_info.capture_zones(), map_info.defend_points()]
+
+@contextlib.contextmanager
+def benchmarks(recording: str = None):
+    '''
+    Set up every benchmark - use as a context manager so the ACMI log and its
+    temporary directory are cleaned up after the run
+    
+    Args:
+        recording:
+            Optional recording (see replay.RecordingSession) to drive the
+            get_telemetry benchmark with instead of synthetic payloads
+    
+    Yields:
+            Functions to time keyed by benchmark name
+    '''
+    
+    if recording:
+        session = replay.ReplaySession(recording, realtime=False, loop=True)
+    else:
+        session = SyntheticSession()
+    
+    telem = telemetry.TelemInterface(session=session)
+    funcs = {'TelemInterface.get_telemetry': telem.get_telemetry}
+    
+    for num_objs in OBJ_COUNTS:
+        map_info = mapinfo.MapInfo(session=SyntheticSession(num_objs))
+        map_info.download_files()
+        funcs['MapInfo.parse_meta[{}]'.format(num_objs)] = map_info.parse_meta
+        funcs['MapInfo queries[{}]'.format(num_objs)]    = lambda map_info=map_info: run_queries(map_info)
+        funcs['MapInfo.objs_within[{}]'.format(num_objs)] = lambda map_info=map_info: map_info.objs_within(map_info.player_lat,
+                                                                                                          map_info.player_lon,
+                                                                                                          5)
+        
+        incremental = mapinfo.MapInfo(session=SyntheticSession(num_objs), incremental=True)
+        incremental.download_files()
+        funcs['MapInfo.parse_meta[{} incremental]'.format(num_objs)] = incremental.parse_meta
+        
+        # Every sample moves the objects, so nothing can be copied wholesale
+        moving = mapinfo.MapInfo(session=SyntheticSession(num_objs), incremental=True)
+        moving.download_files()
+        payloads = itertools.cycle([move_map_objs(moving.obj, 0.001), moving.obj])
+        funcs['MapInfo.parse_meta[{} incremental, moving]'.format(num_objs)] = lambda map_info=moving, payloads=payloads: parse_next(map_info, payloads)
+    
+    map_jpg = synthetic_map_img()
+    funcs['get_grid_info'] = lambda: mapinfo.get_grid_info(map_jpg)
+    
+    map_hash = int(str(imagehash.average_hash(mapinfo.open_map_img(map_jpg, mapinfo.HASH_DECODE_SIZE))), 16)
+    funcs['MapCatalogue.find'] = lambda: mapinfo.MAP_CATALOGUE.find(map_hash)
+    
+    entry = synthetic_map_objs(1)[-1]
+    obj   = mapinfo.map_obj()
+    funcs['map_obj.update'] = lambda: obj.update(entry, 65, 51.16, 36.90)
+    
+    runway = synthetic_map_objs(0)[0]
+    funcs['map_obj.update[airfield]'] = lambda: obj.update(runway, 65, 51.16, 36.90)
+    
+    funcs['find_obj_coords'] = lambda: mapinfo.find_obj_coords(0.3, 0.7, 65, 51.16, 36.90)
+    funcs['coord_coord']     = lambda: mapinfo.coord_coord(51.16, 36.90, 25, 135)
+    funcs['coord_dist']      = lambda: mapinfo.coord_dist(51.16, 36.90, 50.9, 37.2)
+    funcs['coord_bearing']   = lambda: mapinfo.coord_bearing(51.16, 36.90, 50.9, 37.2)
+    
+    rand = random.Random(SEED)
+    lat  = [rand.uniform(50.9, 51.2) for _ in range(100)]
+    lon  = [rand.uniform(36.9, 37.4) for _ in range(100)]
+    funcs['coord_dist_array[100]']     = lambda: mapinfo.coord_dist_array(lat[0], lon[0], lat, lon)
+    funcs['coord_dist_matrix[100]']    = lambda: mapinfo.coord_dist_matrix(lat, lon)
+    funcs['coord_bearing_matrix[100]'] = lambda: mapinfo.coord_bearing_matrix(lat, lon)
+    
+    log  = acmi.ACMI(num_objs=100)
+    data = {'T':    '36.9021|51.1612|3000.5|-1.0|3.0|120.0',
+            'Name': 'P-51D-20', 'Color': 'Blue', 'IAS': 111.1}
+    funcs['ACMI.format_entry'] = lambda: log.format_entry(0, data)
+    funcs['ACMI.insert_entry'] = lambda: log.insert_entry(0, data)
+    
+    frame = {obj_num: data for obj_num in range(100)}
+    funcs['ACMI.format_frame[100]'] = lambda: log.format_frame(None, frame)
+    
+    with tempfile.TemporaryDirectory() as log_dir:
+        log.create(os.path.join(log_dir, 'benchmark'), buffered=True)
+        
+        try:
+            yield funcs
+        finally:
+            log.close()
+
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE) -> list:
+    '''
+    Compare results to a saved baseline
+    
+    Args:
+        results:
+            Benchmark results keyed by name
+        baseline:
+            Saved benchmark results keyed by name
+        tolerance:
+            Fraction the median can be slower than the baseline's before the
+            benchmark is reported as a regression
+    
+    Returns:
+            Names of the regressed benchmarks
+    '''
+    
+    regressions = []
+    
+    for name, result in results.items():
+        if name in baseline:
+            result['change'] = result['p50_us'] / baseline[name]['p50_us'] - 1
+            
+            if result['change'] > tolerance:
+                regressions.append(name)
+    
+    return regressions
+
+def report(results: dict, regressions: list = []):
+    '''
+    Print a table of benchmark results
+    
+    Args:
+        results:
+            Benchmark results keyed by name
+        regressions:
+            Names of the regressed benchmarks
+    '''
+    
+    columns = ['p{}_us'.format(pct) for pct in PERCENTILES]
+    print('{:<30}'.format('benchmark') + ''.join('{:>12}'.format(column) for column in columns)
+          + '{:>12}{:>12}{:>10}'.format('ops/s', 'peak KiB', 'change'))
+    
+    for name, result in results.items():
+        line  = '{:<30}'.format(name)
+        line += ''.join('{:>12.1f}'.format(result[column]) for column in columns)
+        line += '{:>12.0f}{:>12.1f}'.format(result['ops_per_s'], result['peak_bytes'] / 1024)
+        
+        if 'change' in result:
+            line += '{:>+9.0%}'.format(result['change'])
+            
+            if name in regressions:
+                line += ' REGRESSION'
+        
+        print(line)
+
+def main(argv: list = None) -> int:
+    '''
+    Run the benchmarks from the command line
+    
+    Args:
+        argv:
+            Command line arguments (sys.argv[1:] if not given)
+    
+    Returns:
+            Exit code - 1 if any benchmark regressed compared to the baseline
+    '''
+    
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--runs',     type=int, default=NUM_RUNS, help='number of timed calls per benchmark')
+    parser.add_argument('-k', '--filter',   default='', help='only run benchmarks whose name contains this text')
+    parser.add_argument('--recording',      help='replay.RecordingSession recording to drive get_telemetry with')
+    parser.add_argument('--save',           help='save the results as a baseline JSON file')
+    parser.add_argument('--compare',        help='compare the results to a baseline JSON file')
+    parser.add_argument('--tolerance',      type=float, default=TOLERANCE, help='median slowdown flagged as a regression')
+    args = parser.parse_args(argv)
+    
+    results = {}
+    
+    with benchmarks(args.recording) as funcs:
+        for name, func in funcs.items():
+            if args.filter in name:
+                results[name] = measure(func, args.runs)
+    
+    regressions = []
+    
+    if args.compare:
+        with open(args.compare, 'r') as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+    
+    report(results, regressions)
+    
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump({name: {key: value for key, value in result.items() if key != 'change'}
+                       for name, result in results.items()},
+                      baseline_file,
+                      indent=4)
+    
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
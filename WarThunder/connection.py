@@ -0,0 +1,39 @@
+'''
+Module to create pooled HTTP sessions used to query War Thunder's localhost server
+'''
+
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+POOL_SIZE   = 10
+MAX_RETRIES = 0
+
+
+def create_session(pool_size: int = POOL_SIZE, max_retries: int = MAX_RETRIES) -> requests.Session:
+    '''
+    Create a requests session that keeps its connections to the localhost
+    server alive and reuses them between requests instead of opening a new
+    TCP connection for every page that is sampled
+    
+    Args:
+        pool_size:
+            Maximum number of connections kept open to the localhost server
+            (should be at least the number of threads using the session at
+            the same time)
+        max_retries:
+            Number of times a failed connection attempt is retried
+    
+    Returns:
+            Session with a pooled HTTP adapter mounted
+    '''
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1,
+                          pool_maxsize=pool_size,
+                          max_retries=max_retries)
+    
+    session.mount('http://', adapter)
+    
+    return session
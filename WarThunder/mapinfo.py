@@ -1,795 +1,2820 @@
-'''
-Module to query and access map and non-player object/vehicle data during War Thunder matches
-'''
-
-
-import os
-import socket
-import imagehash
-from time import sleep
-from requests import get
-from PIL import Image, ImageDraw
-from json.decoder import JSONDecodeError
-from simplejson.errors import JSONDecodeError as simpleJSONDecodeError
-from urllib.error import URLError
-from urllib.request import urlretrieve
-from requests.exceptions import ReadTimeout, ConnectTimeout
-from math import radians, degrees, sqrt, sin, asin, cos, atan2
-from WarThunder.maps import maps
-
-
-LOCAL_PATH   = os.path.dirname(os.path.realpath(__file__))
-MAP_PATH     = os.path.join(LOCAL_PATH, 'map.jpg')
-IP_ADDRESS   = socket.gethostbyname(socket.gethostname())
-URL_MAP_IMG  = 'http://{}:8111/map.img'.format(IP_ADDRESS)
-URL_MAP_OBJ  = 'http://{}:8111/map_obj.json'.format(IP_ADDRESS)
-URL_MAP_INFO = 'http://{}:8111/map_info.json'.format(IP_ADDRESS)
-ENEMY_HEX_COLORS = ['#f40C00', '#ff0D00', '#ff0000']
-MAX_HAMMING_DIST = 3
-EARTH_RADIUS_KM  = 6378.137
-REQUEST_TIMEOUT  = 0.1
-
-
-def hypotenuse(a: float, b: float) -> float:
-    '''
-    Find the length of the hypotenuse side of a right triangle
-    
-    Args:
-        a:
-            One side of the right triange
-        b:
-            Other side of the right triange
-    
-    Returns:
-            Length of the hypotenuse
-    '''
-    
-    return sqrt((a ** 2) + (b ** 2))
-
-def coord_bearing(lat_1: float, lon_1: float, lat_2: float, lon_2: float) -> float:
-    '''
-    Find the bearing (in degrees) between two lat/lon coordinates (dd)
-    
-    Args:
-        lat_1:
-            First point's latitude (dd)
-        lon_1:
-            First point's longitude (dd)
-        lat_2:
-            Second point's latitude (dd)
-        lon_2:
-            Second point's longitude (dd)
-    
-    Returns:
-            Bearing in degrees between point 1 and 2
-    '''
-    
-    deltaLon_r = radians(lon_2 - lon_1)
-    lat_1_r = radians(lat_1)
-    lat_2_r = radians(lat_2)
-
-    x = cos(lat_2_r) * sin(deltaLon_r)
-    y = cos(lat_1_r) * sin(lat_2_r) - sin(lat_1_r) * cos(lat_2_r) * cos(deltaLon_r)
-
-    return (degrees(atan2(x, y)) + 360) % 360
-
-def coord_dist(lat_1: float, lon_1: float, lat_2: float, lon_2: float) -> float:
-    '''
-    Find the total distance (in km) between two lat/lon coordinates (dd)
-    
-    Args:
-        lat_1:
-            First point's latitude (dd)
-        lon_1:
-            First point's longitude (dd)
-        lat_2:
-            Second point's latitude (dd)
-        lon_2:
-            Second point's longitude (dd)
-    
-    Returns:
-            Distance in km between point 1 and 2
-    '''
-    
-    lat_1_rad = radians(lat_1)
-    lon_1_rad = radians(lon_1)
-    lat_2_rad = radians(lat_2)
-    lon_2_rad = radians(lon_2)
-    
-    d_lat = lat_2_rad - lat_1_rad
-    d_lon = lon_2_rad - lon_1_rad
-    
-    a = (sin(d_lat / 2) ** 2) + cos(lat_1_rad) * cos(lat_2_rad) * (sin(d_lon / 2) ** 2)
-    
-    return 2 * EARTH_RADIUS_KM * atan2(sqrt(a), sqrt(1 - a))
-
-def coord_coord(lat: float, lon: float, dist: float, bearing: float) -> list:
-    '''
-    Finds the lat/lon coordinates "dist" km away from the given "lat" and "lon"
-    coordinate along the given compass "bearing"
-    
-    Args:
-        lat:
-            First point's latitude (dd)
-        lon:
-            First point's longitude (dd)
-        dist:
-            Distance in km the second point should be from the first point
-        bearing:
-            Bearing in degrees from the first point to the second
-    
-    Returns:
-            Latitude and longitude in DD of the second point
-    '''
-    
-    brng  = radians(bearing)
-    lat_1 = radians(lat)
-    lon_1 = radians(lon)
-    
-    lat_2 = asin(sin(lat_1) * cos(dist / EARTH_RADIUS_KM) + cos(lat_1) * sin(dist / EARTH_RADIUS_KM) * cos(brng))
-    lon_2 = lon_1 + atan2(sin(brng) * sin(dist / EARTH_RADIUS_KM) * cos(lat_1), cos(dist / EARTH_RADIUS_KM) - sin(lat_1) * sin(lat_2))
-    
-    return [degrees(lat_2), degrees(lon_2)]
-
-def get_grid_info(map_img: Image) -> dict:
-    '''
-    Compare map from browser interface to pre-calculated map hash to provide
-    location info.
-    
-    Args:
-        map_img:
-            PIL.Image object of the current map's JPEG
-    
-    Returns:
-            Dictionary with map metadata. Example - 
-                {'name': 'Kursk',
-                 'ULHC_lat': 51.16278580067218,
-                 'ULHC_lon': 36.906235369488115,
-                 'size_km' : 65},
-    '''
-    
-    hash_ = str(imagehash.average_hash(map_img))
-    hamming_dists = []
-    
-    for map_hash in maps.keys():
-        hamming_dists.append((len([index for index in range(len(hash_)) if not hash_[index] == map_hash[index]]), map_hash))
-        
-        
-    match = min(hamming_dists)
-    
-    if match[0] <= MAX_HAMMING_DIST:
-        return maps[match[1]]
-    
-    return {'name': 'UNKNOWN',
-            'ULHC_lat': 0.0,
-            'ULHC_lon': 0.0,
-            'size_km' : 65}
-
-def find_obj_coords(x: float, y: float, map_size: float, ULHC_lat: float, ULHC_lon: float) -> list:
-    '''
-    Convert the provided object's x/y coordinate to lat/lon
-    
-    Args:
-        x:
-            The distance of the object from the upper left hand corner of the
-            map in the horizontal direction. x=0 means the object is on the
-            left border of the map and x=1 means the object is on the right
-            border
-        y:
-            The distance of the object from the upper left hand corner of the
-            map in the vertical direction. y=0 means the object is on the top
-            border of the map and y=1 means the object is on the bottom border
-        map_size:
-            The length/width of the map in km (all maps are square)
-        ULHC_lat:
-            The true world estimated latidude of the map's upper left hand
-            corner point
-        ULHC_lon:
-            The true world estimated longitude of the map's upper left hand
-            corner point
-    
-    Returns:
-            Estimated latitude and longitude of the object's position
-    '''
-    
-    dist_x  = x * map_size
-    dist_y  = y * map_size
-    dist    = hypotenuse(dist_x, dist_y)
-    bearing = degrees(atan2(y, x)) + 90
-    
-    if bearing < 0:
-        bearing += 360
-    
-    return coord_coord(ULHC_lat, ULHC_lon, dist, bearing)
-
-
-class map_obj(object):
-    def __init__(self, map_obj_entry: dict = {}, map_size: float = 65, ULHC_lat: float = 0, ULHC_lon: float = 0):
-        '''
-        Args:
-            map_obj_entry:
-                A single object/vehicle entry from the JSON scraped from
-                http://localhost:8111/map_obj.json
-            map_size:
-                The length/width of the map in km (all maps are square)
-            ULHC_lat:
-                The true world estimated latidude of the map's upper left hand
-                corner point
-            ULHC_lon:
-                The true world estimated longitude of the map's upper left hand
-                corner point
-        '''
-        
-        self.type      = ''
-        self.icon      = ''
-        self.hex_color = ''
-        self.friendly  = True
-        
-        self.position       = [0, 0] # NOT for airfield
-        self.position_delta = [0, 0] 
-        self.south_end      = [0, 0] # ONLY for airfield
-        self.east_end       = [0, 0] # ONLY for airfield
-        
-        self.position_ll   = [0, 0] # NOT for airfield
-        self.south_end_ll  = [0, 0] # ONLY for airfield
-        self.east_end_ll   = [0, 0] # ONLY for airfield
-        self.runway_dir    = 0      # ONLY for airfield
-        self.airfield      = False
-        self.heavy_tank    = False
-        self.medium_tank   = False
-        self.light_tank    = False
-        self.spg           = False
-        self.spaa          = False
-        self.wheeled       = False # AI only
-        self.tracked       = False # AI only
-        self.aaa           = False
-        self.bomber        = False # Also helicopter (thanks Gayjin, very cool)
-        self.heavy_fighter = False
-        self.fighter       = False
-        self.ship          = False
-        self.torpedo_boat  = False
-        self.tank_respawn  = False
-        self.bomber_respawn  = False
-        self.fighter_respawn = False
-        self.capture_zone  = False
-        self.defend_point  = False
-        self.bombing_point = False
-        
-        self.hdg = 0
-        
-        if map_obj_entry:
-            self.update(map_obj_entry, map_size, ULHC_lat, ULHC_lon)
-    
-    def update(self, map_obj_entry: dict, map_size: float, ULHC_lat: float, ULHC_lon: float):
-        '''
-        Description:
-        ------------
-        Update object attributes based on the provided map context. Such attributes
-        include:
-            
-            self.type
-            self.icon
-            self.hex_color
-            self.position       (x-y coordinate)
-            self.position_ll    (estimated latitude and longitude)
-            self.position_delta (x-y difference)
-            self.hdg
-            self.south_end    (x-y coordinate)
-            self.south_end_ll (estimated latitude and longitude)
-            self.east_end     (x-y coordinate)
-            self.east_end_ll  (estimated latitude and longitude)
-            self.runway_dir
-            
-        plus other attributes that denote the object's vehicle type (i.e. ship
-        or fighter)
-        
-        Args:
-            map_obj_entry:
-                A single object/vehicle entry from the JSON scraped from
-                http://localhost:8111/map_obj.json
-            map_size:
-                The length/width of the map in km (all maps are square)
-            ULHC_lat:
-                The true world estimated latidude of the map's upper left hand
-                corner point
-            ULHC_lon:
-                The true world estimated longitude of the map's upper left hand
-                corner point
-        '''
-        
-        self.type      = map_obj_entry['type']
-        self.icon      = map_obj_entry['icon']
-        self.hex_color = map_obj_entry['color']
-        
-        if (self.hex_color in ENEMY_HEX_COLORS) or map_obj_entry['blink']:
-            self.friendly = False
-        else:
-            self.friendly = True
-               
-        if self.type.lower() == 'airfield':
-            self.airfield = True
-        else:
-            self.airfield = False
-            
-        if self.icon.lower() == 'bombing_point':
-            self.bombing_point = True
-            self.friendly      = False
-        else:
-            self.bombing_point = False
-        
-        if self.icon.lower() == 'heavytank':
-            self.heavy_tank = True
-        else:
-            self.heavy_tank = False
-        
-        if self.icon.lower() == 'mediumtank':
-            self.medium_tank = True
-        else:
-            self.medium_tank = False
-                
-        if self.icon.lower() == 'lighttank':
-            self.light_tank = True
-        else:
-            self.light_tank = False
-        
-        if self.icon.lower() == 'tankdestroyer':
-            self.spg = True
-        else:
-            self.spg = False
-        
-        if self.icon.lower() == 'spaa':
-            self.spaa = True
-        else:
-            self.spaa = False
-        
-        if self.icon.lower() == 'wheeled':
-            self.wheeled = True
-        else:
-            self.wheeled = False
-            
-        if self.icon.lower() == 'tracked':
-            self.tracked = True
-        else:
-            self.tracked = False
-        
-        if self.icon.lower() == 'airdefence':
-            self.aaa = True
-        else:
-            self.aaa = False
-        
-        if self.icon.lower() == 'bomber':
-            self.bomber = True
-        else:
-            self.bomber = False
-        
-        if self.icon.lower() == 'assault':
-            self.heavy_fighter = True
-        else:
-            self.heavy_fighter = False
-        
-        if self.icon.lower() == 'fighter':
-            self.fighter = True
-        else:
-            self.fighter = False
-        
-        if self.icon.lower() == 'ship':
-            self.ship = True
-        else:
-            self.ship = False
-        
-        if self.icon.lower() == 'torpedoboat':
-            self.torpedo_boat = True
-        else:
-            self.torpedo_boat = False
-        
-        if self.icon.lower() == 'respawn_base_tank':
-            self.tank_respawn = True
-        else:
-            self.tank_respawn = False
-        
-        if self.icon.lower() == 'respawn_base_bomber':
-            self.bomber_respawn = True
-        else:
-            self.bomber_respawn = False
-        
-        if self.icon.lower() == 'respawn_base_fighter':
-            self.fighter_respawn = True
-        else:
-            self.fighter_respawn = False
-        
-        if self.icon.lower() == 'capture_zone':
-            self.capture_zone = True
-        else:
-            self.capture_zone = False
-        
-        if self.icon.lower() == 'defending_point':
-            self.defend_point = True
-            self.friendly     = True
-        else:
-            self.defend_point = False
-        
-        try:
-            self.position = [map_obj_entry['x'], map_obj_entry['y']]
-        except KeyError:
-            self.position = [0, 0]
-        
-        try:
-            self.position_delta = [map_obj_entry['dx'], map_obj_entry['dy']]
-            
-            self.hdg = degrees(atan2(*self.position_delta)) + 90
-                    
-            if self.hdg < 0:
-                self.hdg += 360
-        except KeyError:
-            self.position_delta = [0, 0]
-            self.hdg = 0
-        
-        try:
-            self.south_end = [map_obj_entry['sx'], map_obj_entry['sy']]
-            self.east_end  = [map_obj_entry['ex'], map_obj_entry['ey']]
-            
-            self.south_end_ll = find_obj_coords(*self.south_end,
-                                                map_size,
-                                                ULHC_lat,
-                                                ULHC_lon)
-            self.east_end_ll = find_obj_coords(*self.east_end,
-                                               map_size,
-                                               ULHC_lat,
-                                               ULHC_lon)
-            self.runway_dir = coord_bearing(*self.south_end_ll,
-                                            *self.east_end_ll)
-        except KeyError:
-            self.south_end = [0, 0]
-            self.east_end  = [0, 0]
-            
-            self.south_end_ll = [0, 0]
-            self.east_end_ll  = [0, 0]
-            
-            self.runway_dir = 0
-        
-        self.position_ll = find_obj_coords(*self.position,
-                                           map_size,
-                                           ULHC_lat,
-                                           ULHC_lon)
-
-
-class MapInfo(object):
-    def __init__(self):
-        self.map_valid = False
-        self.map_objs  = []
-    
-    def download_files(self) -> bool:
-        '''
-        Sample information about the map and the "seen" objects in the match
-        from the localhost
-        
-        Example self.info - 
-        {'grid_steps': [8192.0, 8192.0],
-         'grid_zero': [-28672.0, 28672.0],
-         'map_generation': 12,
-         'map_max': [32768.0, 32768.0],
-         'map_min': [-32768.0, -32768.0]}
-        
-        Example self.obj - 
-        [{'type': 'airfield',
-          'color': '#185AFF',
-          'color[]': [24, 90, 255],
-          'blink': 0,
-          'icon': 'none',
-          'icon_bg': 'none',
-          'sx': 0.338597,
-          'sy': 0.720108,
-          'ex': 0.357913,
-          'ey': 0.692523},
-         {'type': 'aircraft',
-          'color': '#fa3200',
-          'color[]': [250, 50, 0],
-          'blink': 0,
-          'icon': 'Fighter',
-          'icon_bg': 'none',
-          'x': 0.48744,
-          'y': 0.542793,
-          'dx': -0.640827,
-          'dy': 0.767686},
-         ...]
-        
-        Returns:
-                Whether or not the map data was successfully retrieved
-        '''
-        
-        self.map_valid = False
-        
-        try:
-            urlretrieve(URL_MAP_IMG, MAP_PATH)
-            self.info = get(URL_MAP_INFO, timeout=REQUEST_TIMEOUT).json()
-            self.obj  = get(URL_MAP_OBJ,  timeout=REQUEST_TIMEOUT).json()
-            self.parse_meta()
-            
-            self.map_img  = Image.open(MAP_PATH)
-            self.map_draw = ImageDraw.Draw(self.map_img)
-            
-            self.grid_info = get_grid_info(self.map_img)
-            
-            self.map_valid = True
-                
-        except URLError:
-            print('ERROR: could not download map.jpg')
-    
-        except (OSError, JSONDecodeError, simpleJSONDecodeError):
-            print('Waiting to join a match')
-            sleep(1)
-            
-        except ReadTimeout:
-            print('ERROR: ReadTimeout')
-            
-        except ConnectTimeout:
-            print('ERROR: ConnectTimeout')
-            
-        return self.map_valid
-    
-    def parse_meta(self):
-        '''
-        Calculate values that might be useful for extra processing. Also build
-        a list of War Thunder objects (self.map_objs) present in the match to
-        keep track of
-        '''
-        
-        self.map_objs = []
-        self.player_found = False
-        
-        if self.map_valid:
-            for obj in self.obj:
-                self.map_objs.append(map_obj(obj,
-                                             self.grid_info['size_km'],
-                                             self.grid_info['ULHC_lat'],
-                                             self.grid_info['ULHC_lon']))
-                
-                if obj['icon'] == 'Player':
-                    self.player_found = True
-                    
-                    self.player_lat = self.map_objs[-1].position_ll[0]
-                    self.player_lon = self.map_objs[-1].position_ll[1]
-                    self.player_x   = self.map_objs[-1].position[0]
-                    self.player_y   = self.map_objs[-1].position[1]
-    
-    def airfields(self) -> list:
-        '''
-        Return a list of map_objs that includes all airfields currently in the match
-        
-        Returns:
-                List of map_objs of found airfields
-        '''
-        
-        return [obj for obj in self.map_objs if obj.airfield]
-    
-    def bombing_points(self) -> list:
-        '''
-        Return a list of map_objs that includes all bomb points currently in the match
-        
-        Returns:
-                List of map_objs of found bombing points 
-        '''
-        
-        return [obj for obj in self.map_objs if obj.bombing_point]
-    
-    def heavy_tanks(self) -> list:
-        '''
-        Return a list of map_objs that includes all heavy tanks currently in the match
-        
-        Returns:
-                List of map_objs of found heavy tanks
-        '''
-        
-        return [obj for obj in self.map_objs if obj.heavy_tank]
-    
-    def medium_tanks(self) -> list:
-        '''
-        Return a list of map_objs that includes all medium tanks currently in the match
-        
-        Returns:
-                List of map_objs of found medium tanks
-        '''
-        
-        return [obj for obj in self.map_objs if obj.medium_tank]
-    
-    def light_tanks(self) -> list:
-        '''
-        Return a list of map_objs that includes all light tanks currently in the match
-        
-        Returns:
-                List of map_objs of found light tanks
-        '''
-        
-        return [obj for obj in self.map_objs if obj.light_tank]
-    
-    def SPGs(self) -> list:
-        '''
-        Return a list of map_objs that includes all spgs currently in the match
-        
-        Returns:
-                List of map_objs of found spgs
-        '''
-        
-        return [obj for obj in self.map_objs if obj.spg]
-    
-    def SPAAs(self) -> list:
-        '''
-        Return a list of map_objs that includes all spaas currently in the match
-        
-        Returns:
-                List of map_objs of found spaas
-        '''
-        
-        return [obj for obj in self.map_objs if obj.spaa]
-    
-    def tanks(self) -> list:
-        '''
-        Return a list of map_objs that includes all tanks currently in the match
-        
-        Returns:
-                List of map_objs of found tanks
-        '''
-        
-        output = []
-        
-        output.extend(self.heavy_tanks())
-        output.extend(self.medium_tanks())
-        output.extend(self.light_tanks())
-        output.extend(self.SPGs())
-        output.extend(self.SPAAs())
-        
-        return output
-    
-    def wheeled_AIs(self) -> list:
-        '''
-        Return a list of map_objs that includes all wheeled AIs currently in the match
-        
-        Returns:
-                List of map_objs of found wheeled AIs
-        '''
-        
-        return [obj for obj in self.map_objs if obj.wheeled]
-    
-    def tracked_AIs(self) -> list:
-        '''
-        Return a list of map_objs that includes all tracked AIs currently in the match
-        
-        Returns:
-                List of map_objs of found tracked AIs
-        '''
-        
-        return [obj for obj in self.map_objs if obj.tracked]
-    
-    def AAAs(self) -> list:
-        '''
-        Return a list of map_objs that includes all AAAs currently in the match
-        
-        Returns:
-                List of map_objs of found AAAs
-        '''
-        
-        return [obj for obj in self.map_objs if obj.aaa]
-    
-    def bombers(self) -> list:
-        '''
-        Return a list of map_objs that includes all bombers (and helicopters) currently in the match
-        
-        Returns:
-                List of map_objs of found bombers/helicopters
-        '''
-        
-        return [obj for obj in self.map_objs if obj.bomber]
-    
-    def heavy_fighters(self) -> list:
-        '''
-        Return a list of map_objs that includes all heavy fighters currently in the match
-        
-        Returns:
-                List of map_objs of found heavy fighters
-        '''
-        
-        return [obj for obj in self.map_objs if obj.heavy_fighter]
-    
-    def fighters(self) -> list:
-        '''
-        Return a list of map_objs that includes all fighters currently in the match
-        
-        Returns:
-                List of map_objs of found fighters
-        '''
-        
-        return [obj for obj in self.map_objs if obj.fighter]
-    
-    def ships(self) -> list:
-        '''
-        Return a list of map_objs that includes all shis currently in the match
-        
-        Returns:
-                List of map_objs of found ships
-        '''
-        
-        return [obj for obj in self.map_objs if obj.ship or obj.torpedo_boat]
-    
-    def planes(self) -> list:
-        '''
-        Return a list of map_objs that includes all planes currently in the match
-        
-        Returns:
-                List of map_objs of found planes
-        '''
-        
-        output = []
-        
-        output.extend(self.bombers())
-        output.extend(self.heavy_fighters())
-        output.extend(self.fighters())
-        
-        return output
-    
-    def tank_respawns(self) -> list:
-        '''
-        Return a list of map_objs that includes all tank respawns currently in the match
-        
-        Returns:
-                List of map_objs of found tank respawns
-        '''
-        
-        return [obj for obj in self.map_objs if obj.tank_respawn]
-    
-    def bomber_respawns(self) -> list:
-        '''
-        Return a list of map_objs that includes all bomber respawns currently in the match
-        
-        Returns:
-                List of map_objs of found bomber respawns
-        '''
-        
-        return [obj for obj in self.map_objs if obj.bomber_respawn]
-    
-    def fighter_respawns(self) -> list:
-        '''
-        Return a list of map_objs that includes all fighter respawns currently in the match
-        
-        Returns:
-                List of map_objs of found fighter respawns
-        '''
-        
-        return [obj for obj in self.map_objs if obj.fighter_respawn]
-    
-    def plane_respawns(self) -> list:
-        '''
-        Return a list of map_objs that includes all plane respawns currently in the match
-        
-        Returns:
-                List of map_objs of found plane respawns
-        '''
-        
-        output = []
-        
-        output.extend(self.bomber_respawns())
-        output.extend(self.fighter_respawns())
-        
-        return output
-    
-    def capture_zones(self) -> list:
-        '''
-        Return a list of map_objs that includes all capture zones currently in the match
-        
-        Returns:
-                List of map_objs of found capture zones
-        '''
-        
-        return [obj for obj in self.map_objs if obj.capture_zone]
-    
-    def defend_points(self) -> list:
-        '''
-        Return a list of map_objs that includes all defend points currently in the match
-        
-        Returns:
-                List of map_objs of found defend points
-        '''
-        
-        return [obj for obj in self.map_objs if obj.defend_point]
-    
-    
-
+'''
+Module to query and access map and non-player object/vehicle data during War Thunder matches
+'''
+
+
+import io
+import os
+import json
+import socket
+import hashlib
+import imagehash
+import numpy as np
+from time import sleep
+from PIL import Image, ImageDraw
+from json.decoder import JSONDecodeError
+from simplejson.errors import JSONDecodeError as simpleJSONDecodeError
+from requests.exceptions import ReadTimeout, ConnectTimeout, ConnectionError
+from math import radians, degrees, sqrt, sin, asin, cos, atan2, hypot, floor, ceil
+from WarThunder.maps import maps
+from WarThunder.connection import create_session
+
+
+LOCAL_PATH   = os.path.dirname(os.path.realpath(__file__))
+MAP_PATH     = os.path.join(LOCAL_PATH, 'map.jpg')
+IP_ADDRESS   = socket.gethostbyname(socket.gethostname())
+URL_MAP_IMG  = 'http://{}:8111/map.img'.format(IP_ADDRESS)
+URL_MAP_OBJ  = 'http://{}:8111/map_obj.json'.format(IP_ADDRESS)
+URL_MAP_INFO = 'http://{}:8111/map_info.json'.format(IP_ADDRESS)
+ENEMY_HEX_COLORS = ['#f40C00', '#ff0D00', '#ff0000']
+MAX_HAMMING_BITS = 8    # max number of differing bits between a map's hash and its catalogue entry
+MAX_HAMMING_DIST = 3    # deprecated - old threshold in differing hex digits of the hash, use MAX_HAMMING_BITS
+EARTH_RADIUS_KM  = 6378.137
+REQUEST_TIMEOUT  = 0.1
+HASH_DECODE_SIZE = 256  # min width/height of the reduced JPEG decode used to identify maps
+GRID_CELL_KM     = 2.0  # cell size of the spatial index over map objects
+GRID_MARGIN      = 0.01 # fraction added to spatial query ranges to cover the map projection's distortion
+GATE_KM          = 2.0  # max distance in km an object can move between samples and keep its ID
+
+CATEGORY_AIRFIELD        = 1 << 0
+CATEGORY_BOMBING_POINT   = 1 << 1
+CATEGORY_HEAVY_TANK      = 1 << 2
+CATEGORY_MEDIUM_TANK     = 1 << 3
+CATEGORY_LIGHT_TANK      = 1 << 4
+CATEGORY_SPG             = 1 << 5
+CATEGORY_SPAA            = 1 << 6
+CATEGORY_WHEELED         = 1 << 7  # AI only
+CATEGORY_TRACKED         = 1 << 8  # AI only
+CATEGORY_AAA             = 1 << 9
+CATEGORY_BOMBER          = 1 << 10 # Also helicopter (thanks Gayjin, very cool)
+CATEGORY_HEAVY_FIGHTER   = 1 << 11
+CATEGORY_FIGHTER         = 1 << 12
+CATEGORY_SHIP            = 1 << 13
+CATEGORY_TORPEDO_BOAT    = 1 << 14
+CATEGORY_TANK_RESPAWN    = 1 << 15
+CATEGORY_BOMBER_RESPAWN  = 1 << 16
+CATEGORY_FIGHTER_RESPAWN = 1 << 17
+CATEGORY_CAPTURE_ZONE    = 1 << 18
+CATEGORY_DEFEND_POINT    = 1 << 19
+
+# category and forced faction (True: always friendly, False: always enemy,
+# None: from the object's color) of each (lower case) map object icon - see
+# register_icon()
+ICON_CLASSES = {'bombing_point':        (CATEGORY_BOMBING_POINT,   False),
+                'heavytank':            (CATEGORY_HEAVY_TANK,      None),
+                'mediumtank':           (CATEGORY_MEDIUM_TANK,     None),
+                'lighttank':            (CATEGORY_LIGHT_TANK,      None),
+                'tankdestroyer':        (CATEGORY_SPG,             None),
+                'spaa':                 (CATEGORY_SPAA,            None),
+                'wheeled':              (CATEGORY_WHEELED,         None),
+                'tracked':              (CATEGORY_TRACKED,         None),
+                'airdefence':           (CATEGORY_AAA,             None),
+                'bomber':               (CATEGORY_BOMBER,          None),
+                'assault':              (CATEGORY_HEAVY_FIGHTER,   None),
+                'fighter':              (CATEGORY_FIGHTER,         None),
+                'ship':                 (CATEGORY_SHIP,            None),
+                'torpedoboat':          (CATEGORY_TORPEDO_BOAT,    None),
+                'respawn_base_tank':    (CATEGORY_TANK_RESPAWN,    None),
+                'respawn_base_bomber':  (CATEGORY_BOMBER_RESPAWN,  None),
+                'respawn_base_fighter': (CATEGORY_FIGHTER_RESPAWN, None),
+                'capture_zone':         (CATEGORY_CAPTURE_ZONE,    None),
+                'defending_point':      (CATEGORY_DEFEND_POINT,    True)}
+
+# category and forced faction of each (lower case) map object type - see
+# register_type()
+TYPE_CLASSES = {'airfield': (CATEGORY_AIRFIELD, None)}
+
+NO_CLASS = (0, None)
+
+# per-row columns of a MapObjectTable (see MapObjectTable.copy_rows())
+TABLE_COLUMNS = ['type_code', 'icon_code', 'color_code', 'category', 'friendly', 'pos', 'delta', 'hdg', 'lat', 'lon',
+                 'runway', 'south_end', 'east_end', 'south_end_ll', 'east_end_ll', 'runway_dir', 'obj_id']
+
+# map_obj boolean attribute of each category
+CATEGORY_ATTRS = {'airfield':        CATEGORY_AIRFIELD,
+                  'bombing_point':   CATEGORY_BOMBING_POINT,
+                  'heavy_tank':      CATEGORY_HEAVY_TANK,
+                  'medium_tank':     CATEGORY_MEDIUM_TANK,
+                  'light_tank':      CATEGORY_LIGHT_TANK,
+                  'spg':             CATEGORY_SPG,
+                  'spaa':            CATEGORY_SPAA,
+                  'wheeled':         CATEGORY_WHEELED,
+                  'tracked':         CATEGORY_TRACKED,
+                  'aaa':             CATEGORY_AAA,
+                  'bomber':          CATEGORY_BOMBER,
+                  'heavy_fighter':   CATEGORY_HEAVY_FIGHTER,
+                  'fighter':         CATEGORY_FIGHTER,
+                  'ship':            CATEGORY_SHIP,
+                  'torpedo_boat':    CATEGORY_TORPEDO_BOAT,
+                  'tank_respawn':    CATEGORY_TANK_RESPAWN,
+                  'bomber_respawn':  CATEGORY_BOMBER_RESPAWN,
+                  'fighter_respawn': CATEGORY_FIGHTER_RESPAWN,
+                  'capture_zone':    CATEGORY_CAPTURE_ZONE,
+                  'defend_point':    CATEGORY_DEFEND_POINT}
+
+
+def hypotenuse(a: float, b: float) -> float:
+    '''
+    Find the length of the hypotenuse side of a right triangle
+    
+    Args:
+        a:
+            One side of the right triange
+        b:
+            Other side of the right triange
+    
+    Returns:
+            Length of the hypotenuse
+    '''
+    
+    return sqrt((a ** 2) + (b ** 2))
+
+def coord_bearing(lat_1: float, lon_1: float, lat_2: float, lon_2: float) -> float:
+    '''
+    Find the bearing (in degrees) between two lat/lon coordinates (dd)
+    
+    Args:
+        lat_1:
+            First point's latitude (dd)
+        lon_1:
+            First point's longitude (dd)
+        lat_2:
+            Second point's latitude (dd)
+        lon_2:
+            Second point's longitude (dd)
+    
+    Returns:
+            Bearing in degrees between point 1 and 2
+    '''
+    
+    deltaLon_r = radians(lon_2 - lon_1)
+    lat_1_r = radians(lat_1)
+    lat_2_r = radians(lat_2)
+
+    x = cos(lat_2_r) * sin(deltaLon_r)
+    y = cos(lat_1_r) * sin(lat_2_r) - sin(lat_1_r) * cos(lat_2_r) * cos(deltaLon_r)
+
+    return (degrees(atan2(x, y)) + 360) % 360
+
+def coord_dist(lat_1: float, lon_1: float, lat_2: float, lon_2: float) -> float:
+    '''
+    Find the total distance (in km) between two lat/lon coordinates (dd)
+    
+    Args:
+        lat_1:
+            First point's latitude (dd)
+        lon_1:
+            First point's longitude (dd)
+        lat_2:
+            Second point's latitude (dd)
+        lon_2:
+            Second point's longitude (dd)
+    
+    Returns:
+            Distance in km between point 1 and 2
+    '''
+    
+    lat_1_rad = radians(lat_1)
+    lon_1_rad = radians(lon_1)
+    lat_2_rad = radians(lat_2)
+    lon_2_rad = radians(lon_2)
+    
+    d_lat = lat_2_rad - lat_1_rad
+    d_lon = lon_2_rad - lon_1_rad
+    
+    a = (sin(d_lat / 2) ** 2) + cos(lat_1_rad) * cos(lat_2_rad) * (sin(d_lon / 2) ** 2)
+    
+    return 2 * EARTH_RADIUS_KM * atan2(sqrt(a), sqrt(1 - a))
+
+def coord_coord(lat: float, lon: float, dist: float, bearing: float) -> list:
+    '''
+    Finds the lat/lon coordinates "dist" km away from the given "lat" and "lon"
+    coordinate along the given compass "bearing"
+    
+    Args:
+        lat:
+            First point's latitude (dd)
+        lon:
+            First point's longitude (dd)
+        dist:
+            Distance in km the second point should be from the first point
+        bearing:
+            Bearing in degrees from the first point to the second
+    
+    Returns:
+            Latitude and longitude in DD of the second point
+    '''
+    
+    brng  = radians(bearing)
+    lat_1 = radians(lat)
+    lon_1 = radians(lon)
+    
+    lat_2 = asin(sin(lat_1) * cos(dist / EARTH_RADIUS_KM) + cos(lat_1) * sin(dist / EARTH_RADIUS_KM) * cos(brng))
+    lon_2 = lon_1 + atan2(sin(brng) * sin(dist / EARTH_RADIUS_KM) * cos(lat_1), cos(dist / EARTH_RADIUS_KM) - sin(lat_1) * sin(lat_2))
+    
+    return [degrees(lat_2), degrees(lon_2)]
+
+def coord_coord_array(lat, lon, dist, bearing) -> tuple:
+    '''
+    Vectorised version of coord_coord() - finds the lat/lon coordinates of
+    many points at once. All arguments can be NumPy arrays (or scalars) and
+    are broadcast against each other
+    
+    Args:
+        lat:
+            First points' latitudes (dd)
+        lon:
+            First points' longitudes (dd)
+        dist:
+            Distances in km the second points should be from the first points
+        bearing:
+            Bearings in degrees from the first points to the second
+    
+    Returns:
+            Tuple of NumPy arrays of the latitudes and longitudes in DD of the
+            second points
+    '''
+    
+    brng  = np.radians(bearing)
+    lat_1 = np.radians(lat)
+    lon_1 = np.radians(lon)
+    ang   = np.asarray(dist, dtype=float) / EARTH_RADIUS_KM
+    
+    lat_2 = np.arcsin(np.sin(lat_1) * np.cos(ang) + np.cos(lat_1) * np.sin(ang) * np.cos(brng))
+    lon_2 = lon_1 + np.arctan2(np.sin(brng) * np.sin(ang) * np.cos(lat_1), np.cos(ang) - np.sin(lat_1) * np.sin(lat_2))
+    
+    return np.degrees(lat_2), np.degrees(lon_2)
+
+def hamming_dist(hash_1: int, hash_2: int) -> int:
+    '''
+    Find the number of differing bits between two integer hashes
+    
+    Args:
+        hash_1:
+            First hash
+        hash_2:
+            Second hash
+    
+    Returns:
+            Number of differing bits
+    '''
+    
+    return bin(hash_1 ^ hash_2).count('1')
+
+
+class MapCatalogue(object):
+    '''
+    Catalogue of map metadata keyed by the maps' average hashes. The hashes
+    are stored as integers in a BK-tree, so the closest map to a hash is
+    found by comparing bits (popcount) against only a small part of the
+    catalogue. Extend it with add_map(), add_maps() or load()
+    '''
+    
+    def __init__(self, catalogue: dict = None):
+        '''
+        Args:
+            catalogue:
+                Dictionary of map metadata keyed by hex hash string (see
+                maps.py) - maps.maps if not given
+        '''
+        
+        self.tree = None # nodes are [hash, metadata, {distance: child node}]
+        self.size = 0
+        
+        self.add_maps(maps if catalogue is None else catalogue)
+    
+    def __len__(self):
+        return self.size
+    
+    def add_map(self, map_hash, map_info: dict):
+        '''
+        Add a map to the catalogue (replacing the metadata of an identical
+        hash)
+        
+        Args:
+            map_hash:
+                Average hash of the map's image as hex string or integer
+            map_info:
+                Map metadata. Example - 
+                    {'name': 'Kursk',
+                     'ULHC_lat': 51.16278580067218,
+                     'ULHC_lon': 36.906235369488115,
+                     'size_km' : 65}
+        '''
+        
+        if isinstance(map_hash, str):
+            map_hash = int(map_hash, 16)
+        
+        if self.tree is None:
+            self.tree = [map_hash, map_info, {}]
+            self.size = 1
+            return
+        
+        node = self.tree
+        
+        while True:
+            dist = hamming_dist(map_hash, node[0])
+            
+            if dist == 0:
+                node[1] = map_info
+                return
+            
+            child = node[2].get(dist)
+            
+            if child is None:
+                node[2][dist] = [map_hash, map_info, {}]
+                self.size += 1
+                return
+            
+            node = child
+    
+    def add_maps(self, catalogue: dict):
+        '''
+        Add many maps to the catalogue
+        
+        Args:
+            catalogue:
+                Dictionary of map metadata keyed by hex hash string (see
+                maps.py)
+        '''
+        
+        for map_hash, map_info in catalogue.items():
+            self.add_map(map_hash, map_info)
+    
+    def load(self, file_name: str):
+        '''
+        Add the maps of a JSON file (same structure as maps.maps) to the
+        catalogue
+        
+        Args:
+            file_name:
+                Full filepath or filename of JSON file to load
+        '''
+        
+        with open(file_name, 'r') as catalogue_file:
+            self.add_maps(json.load(catalogue_file))
+    
+    def find(self, map_hash, max_dist: int = MAX_HAMMING_BITS) -> tuple:
+        '''
+        Find the closest map to the given hash
+        
+        Args:
+            map_hash:
+                Average hash of the map's image as hex string or integer
+            max_dist:
+                Max number of differing bits
+        
+        Returns:
+                Tuple of the number of differing bits and the map metadata of
+                the closest map (None if no map is within max_dist)
+        '''
+        
+        if isinstance(map_hash, str):
+            map_hash = int(map_hash, 16)
+        
+        best  = None
+        limit = max_dist
+        nodes = [self.tree] if self.tree is not None else []
+        
+        while nodes:
+            node = nodes.pop()
+            dist = hamming_dist(map_hash, node[0])
+            
+            if dist <= limit:
+                best  = (dist, node[1])
+                limit = dist
+            
+            # Only subtrees at a distance within the limit of this node can
+            # hold a closer map (triangle inequality)
+            for child_dist, child in node[2].items():
+                if abs(child_dist - dist) <= limit:
+                    nodes.append(child)
+        
+        return best
+
+
+MAP_CATALOGUE = MapCatalogue()
+
+
+def open_map_img(map_img: bytes, size: int = None) -> Image:
+    '''
+    Open the map's JPEG from memory. If a size is given, the JPEG is decoded
+    in draft mode (greyscale and scaled down by up to 8x while decoding),
+    which is much cheaper than a full decode when only a thumbnail is needed
+    
+    Args:
+        map_img:
+            Raw JPEG bytes of the map (i.e. contents of
+            http://localhost:8111/map.img)
+        size:
+            Min width/height of the decoded image (full resolution if not
+            given)
+    
+    Returns:
+            Decoded PIL.Image object
+    '''
+    
+    img = Image.open(io.BytesIO(map_img))
+    
+    if size is not None:
+        img.draft('L', (size, size))
+    
+    img.load()
+    
+    return img
+
+
+def get_grid_info(map_img, catalogue: MapCatalogue = None) -> dict:
+    '''
+    Compare map from browser interface to pre-calculated map hash to provide
+    location info.
+    
+    Args:
+        map_img:
+            PIL.Image object of the current map's JPEG or its raw bytes (only
+            decoded at HASH_DECODE_SIZE)
+        catalogue:
+            MapCatalogue to look the map up in - MAP_CATALOGUE if not given
+    
+    Returns:
+            Dictionary with map metadata. Example - 
+                {'name': 'Kursk',
+                 'ULHC_lat': 51.16278580067218,
+                 'ULHC_lon': 36.906235369488115,
+                 'size_km' : 65},
+    '''
+    
+    if catalogue is None:
+        catalogue = MAP_CATALOGUE
+    
+    if isinstance(map_img, bytes):
+        map_img = open_map_img(map_img, HASH_DECODE_SIZE)
+    
+    match = catalogue.find(int(str(imagehash.average_hash(map_img)), 16))
+    
+    if match is not None:
+        return match[1]
+    
+    return {'name': 'UNKNOWN',
+            'ULHC_lat': 0.0,
+            'ULHC_lon': 0.0,
+            'size_km' : 65}
+
+
+def coord_bearing_array(lat_1, lon_1, lat_2, lon_2) -> np.ndarray:
+    '''
+    Vectorised version of coord_bearing() - finds the bearings (in degrees)
+    between many pairs of lat/lon coordinates (dd) at once. All arguments
+    can be NumPy arrays (or scalars) and are broadcast against each other
+    
+    Args:
+        lat_1:
+            First points' latitudes (dd)
+        lon_1:
+            First points' longitudes (dd)
+        lat_2:
+            Second points' latitudes (dd)
+        lon_2:
+            Second points' longitudes (dd)
+    
+    Returns:
+            NumPy array of the bearings in degrees between points 1 and 2
+    '''
+    
+    deltaLon_r = np.radians(np.subtract(lon_2, lon_1))
+    lat_1_r    = np.radians(lat_1)
+    lat_2_r    = np.radians(lat_2)
+    
+    x = np.cos(lat_2_r) * np.sin(deltaLon_r)
+    y = np.cos(lat_1_r) * np.sin(lat_2_r) - np.sin(lat_1_r) * np.cos(lat_2_r) * np.cos(deltaLon_r)
+    
+    return (np.degrees(np.arctan2(x, y)) + 360) % 360
+
+def coord_dist_array(lat_1, lon_1, lat_2, lon_2) -> np.ndarray:
+    '''
+    Vectorised version of coord_dist() - finds the distances (in km)
+    between many pairs of lat/lon coordinates (dd) at once. All arguments
+    can be NumPy arrays (or scalars) and are broadcast against each other
+    
+    Args:
+        lat_1:
+            First points' latitudes (dd)
+        lon_1:
+            First points' longitudes (dd)
+        lat_2:
+            Second points' latitudes (dd)
+        lon_2:
+            Second points' longitudes (dd)
+    
+    Returns:
+            NumPy array of the distances in km between points 1 and 2
+    '''
+    
+    lat_1_rad = np.radians(lat_1)
+    lat_2_rad = np.radians(lat_2)
+    
+    d_lat = lat_2_rad - lat_1_rad
+    d_lon = np.radians(np.subtract(lon_2, lon_1))
+    
+    a = (np.sin(d_lat / 2) ** 2) + np.cos(lat_1_rad) * np.cos(lat_2_rad) * (np.sin(d_lon / 2) ** 2)
+    
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def coord_dist_matrix(lat, lon) -> np.ndarray:
+    '''
+    Find the distances (in km) between every pair of the given lat/lon
+    coordinates (dd) in one call
+    
+    Args:
+        lat:
+            Array of the points' latitudes (dd)
+        lon:
+            Array of the points' longitudes (dd)
+    
+    Returns:
+            NxN NumPy array - element [i, j] is the distance in km from point
+            i to point j
+    '''
+    
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    
+    return coord_dist_array(lat[:, np.newaxis], lon[:, np.newaxis], lat[np.newaxis, :], lon[np.newaxis, :])
+
+def coord_bearing_matrix(lat, lon) -> np.ndarray:
+    '''
+    Find the bearings (in degrees) between every pair of the given lat/lon
+    coordinates (dd) in one call
+    
+    Args:
+        lat:
+            Array of the points' latitudes (dd)
+        lon:
+            Array of the points' longitudes (dd)
+    
+    Returns:
+            NxN NumPy array - element [i, j] is the bearing in degrees from
+            point i to point j
+    '''
+    
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    
+    return coord_bearing_array(lat[:, np.newaxis], lon[:, np.newaxis], lat[np.newaxis, :], lon[np.newaxis, :])
+
+def find_obj_coords(x: float, y: float, map_size: float, ULHC_lat: float, ULHC_lon: float) -> list:
+    '''
+    Convert the provided object's x/y coordinate to lat/lon
+    
+    Args:
+        x:
+            The distance of the object from the upper left hand corner of the
+            map in the horizontal direction. x=0 means the object is on the
+            left border of the map and x=1 means the object is on the right
+            border
+        y:
+            The distance of the object from the upper left hand corner of the
+            map in the vertical direction. y=0 means the object is on the top
+            border of the map and y=1 means the object is on the bottom border
+        map_size:
+            The length/width of the map in km (all maps are square)
+        ULHC_lat:
+            The true world estimated latidude of the map's upper left hand
+            corner point
+        ULHC_lon:
+            The true world estimated longitude of the map's upper left hand
+            corner point
+    
+    Returns:
+            Estimated latitude and longitude of the object's position
+    '''
+    
+    dist_x  = x * map_size
+    dist_y  = y * map_size
+    dist    = hypotenuse(dist_x, dist_y)
+    bearing = degrees(atan2(y, x)) + 90
+    
+    if bearing < 0:
+        bearing += 360
+    
+    return coord_coord(ULHC_lat, ULHC_lon, dist, bearing)
+
+def find_map_coords(lat: float, lon: float, map_size: float, ULHC_lat: float, ULHC_lon: float) -> list:
+    '''
+    Convert the provided lat/lon to the map's x/y coordinate system (inverse
+    of find_obj_coords())
+    
+    Args:
+        lat:
+            Latitude of the point (dd)
+        lon:
+            Longitude of the point (dd)
+        map_size:
+            The length/width of the map in km (all maps are square)
+        ULHC_lat:
+            The true world estimated latidude of the map's upper left hand
+            corner point
+        ULHC_lon:
+            The true world estimated longitude of the map's upper left hand
+            corner point
+    
+    Returns:
+            x/y coordinate of the point (0 to 1 on the map)
+    '''
+    
+    dist    = coord_dist(ULHC_lat, ULHC_lon, lat, lon)
+    bearing = radians(coord_bearing(ULHC_lat, ULHC_lon, lat, lon))
+    
+    return [dist * sin(bearing) / map_size,
+            -dist * cos(bearing) / map_size]
+
+def find_obj_coords_array(x, y, map_size: float, ULHC_lat: float, ULHC_lon: float) -> tuple:
+    '''
+    Vectorised version of find_obj_coords() - converts the x/y coordinates
+    of many objects to lat/lon in a single call
+    
+    Args:
+        x:
+            Array of the objects' horizontal distances from the upper left
+            hand corner of the map (0 to 1)
+        y:
+            Array of the objects' vertical distances from the upper left hand
+            corner of the map (0 to 1)
+        map_size:
+            The length/width of the map in km (all maps are square)
+        ULHC_lat:
+            The true world estimated latidude of the map's upper left hand
+            corner point
+        ULHC_lon:
+            The true world estimated longitude of the map's upper left hand
+            corner point
+    
+    Returns:
+            Tuple of NumPy arrays of the estimated latitudes and longitudes of
+            the objects' positions
+    '''
+    
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    
+    dist    = np.hypot(x, y) * map_size
+    bearing = np.degrees(np.arctan2(y, x)) + 90
+    
+    return coord_coord_array(ULHC_lat, ULHC_lon, dist, bearing)
+
+
+def associate_objs(prev_keys, prev_xy, keys, xy, gate_km: float = GATE_KM) -> np.ndarray:
+    '''
+    Match the objects of a sample to the objects of an earlier sample -
+    closest pairs of the same kind within the gate are matched first, each
+    object is matched at most once. The earlier objects are hashed into
+    cells the size of the gate (sorted by kind and cell) so that every
+    candidate within gate_km of an object is found in one of the 9 cells
+    surrounding it with a binary search
+    
+    Args:
+        prev_keys:
+            Integer code of each earlier object's kind (i.e. its (type, icon,
+            friendly)) that a matching object must share
+        prev_xy:
+            x-y location in km of each earlier object
+        keys:
+            Integer code of the kind of each object of the sample
+        xy:
+            x-y location in km of each object of the sample
+        gate_km:
+            Max distance in km between matching objects
+    
+    Returns:
+            NumPy array of the index of the matching earlier object for every
+            object of the sample (-1 if unmatched)
+    '''
+    
+    prev_keys = np.asarray(prev_keys, dtype=np.int64)
+    prev_xy   = np.asarray(prev_xy, dtype=float).reshape(-1, 2)
+    keys      = np.asarray(keys, dtype=np.int64)
+    xy        = np.asarray(xy, dtype=float).reshape(-1, 2)
+    matches   = np.full(len(keys), -1, dtype=np.int64)
+    
+    if not (len(keys) and len(prev_keys)):
+        return matches
+    
+    prev_cells = np.floor(prev_xy / gate_km).astype(np.int64)
+    cells      = np.floor(xy / gate_km).astype(np.int64)
+    origin     = np.minimum(prev_cells.min(axis=0), cells.min(axis=0)) - 1
+    prev_cells = prev_cells - origin
+    cells      = cells - origin
+    span       = int(max(prev_cells.max(), cells.max())) + 2 # cells (and their neighbours) fit in [0, span)
+    
+    prev_hash   = ((prev_keys * span) + prev_cells[:, 0]) * span + prev_cells[:, 1]
+    prev_order  = np.argsort(prev_hash, kind='stable')
+    sorted_hash = prev_hash[prev_order]
+    hash_       = ((keys * span) + cells[:, 0]) * span + cells[:, 1]
+    order       = np.argsort(hash_, kind='stable') # sorted queries make the binary searches much faster
+    hash_       = hash_[order]
+    
+    pairs_i = []
+    pairs_j = []
+    
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            neighbour = hash_ + (dx * span) + dy
+            starts    = np.searchsorted(sorted_hash, neighbour, 'left')
+            counts    = np.searchsorted(sorted_hash, neighbour, 'right') - starts
+            total     = int(counts.sum())
+            
+            if not total:
+                continue
+            
+            # Expand each object's run of candidates into (object, candidate) pairs
+            firsts = np.cumsum(counts) - counts
+            
+            pairs_i.append(np.repeat(order, counts))
+            pairs_j.append(prev_order[np.repeat(starts - firsts, counts) + np.arange(total)])
+    
+    if not pairs_i:
+        return matches
+    
+    i    = np.concatenate(pairs_i)
+    j    = np.concatenate(pairs_j)
+    dist = np.hypot(xy[i, 0] - prev_xy[j, 0], xy[i, 1] - prev_xy[j, 1])
+    keep = dist <= gate_km
+    
+    i    = i[keep]
+    j    = j[keep]
+    dist = dist[keep]
+    
+    order = np.lexsort((j, i, dist))
+    i     = i[order]
+    j     = j[order]
+    taken = np.zeros(len(prev_keys), dtype=bool)
+    
+    # Greedy matching in order of distance: a pair that is the closest
+    # remaining pair of both its objects is matched - repeat until no pairs
+    # are left
+    while len(i):
+        first_i = np.zeros(len(i), dtype=bool)
+        first_j = np.zeros(len(j), dtype=bool)
+        
+        first_i[np.unique(i, return_index=True)[1]] = True
+        first_j[np.unique(j, return_index=True)[1]] = True
+        
+        chosen = first_i & first_j
+        
+        matches[i[chosen]] = j[chosen]
+        taken[j[chosen]]   = True
+        
+        keep = (matches[i] < 0) & ~taken[j]
+        i    = i[keep]
+        j    = j[keep]
+    
+    return matches
+
+
+def register_icon(icon: str, category: int, friendly: bool = None):
+    '''
+    Add (or change) the classification of a map object icon - i.e. for icons
+    added to the game after this package
+    
+    Args:
+        icon:
+            Icon as reported by http://localhost:8111/map_obj.json (case
+            insensitive)
+        category:
+            Bitmask of CATEGORY_* flags (or any new bit above them) of objects
+            with the icon
+        friendly:
+            Force objects with the icon to be friendly (True) or enemy
+            (False) - None to decide by the object's color
+    '''
+    
+    ICON_CLASSES[icon.lower()] = (category, friendly)
+
+
+def register_type(type_: str, category: int, friendly: bool = None):
+    '''
+    Add (or change) the classification of a map object type
+    
+    Args:
+        type_:
+            Type as reported by http://localhost:8111/map_obj.json (case
+            insensitive)
+        category:
+            Bitmask of CATEGORY_* flags (or any new bit above them) of objects
+            of the type
+        friendly:
+            Force objects of the type to be friendly (True) or enemy (False) -
+            None to decide by the object's color (or icon)
+    '''
+    
+    TYPE_CLASSES[type_.lower()] = (category, friendly)
+
+
+def find_obj_class(type_: str, icon: str) -> tuple:
+    '''
+    Classify a map object by its type and icon
+    
+    Args:
+        type_:
+            Type of the object (i.e. "airfield")
+        icon:
+            Icon of the object (i.e. "Fighter")
+    
+    Returns:
+            Tuple of the bitmask of CATEGORY_* flags of the object and its
+            forced faction (None if decided by the object's color)
+    '''
+    
+    type_category, type_friendly = TYPE_CLASSES.get(type_.lower(), NO_CLASS)
+    icon_category, icon_friendly = ICON_CLASSES.get(icon.lower(), NO_CLASS)
+    
+    return (type_category | icon_category,
+            icon_friendly if icon_friendly is not None else type_friendly)
+
+
+def category_property(flag: int) -> property:
+    '''
+    Create a boolean map_obj attribute backed by one bit of map_obj.category
+    
+    Args:
+        flag:
+            CATEGORY_* flag of the attribute
+    
+    Returns:
+            Property reading/writing the flag
+    '''
+    
+    def getter(self) -> bool:
+        return bool(self.category & flag)
+    
+    def setter(self, value: bool):
+        if value:
+            self.category |= flag
+        else:
+            self.category &= ~flag
+    
+    return property(getter, setter)
+
+
+class map_obj(object):
+    '''
+    One object/vehicle shown on the map. Instances have no __dict__ (see
+    __slots__) and the geodesic attributes (position_ll, hdg, south_end_ll,
+    east_end_ll and runway_dir) are only computed on first access unless
+    they were given precomputed
+    '''
+    
+    __slots__ = ['type',
+                 'icon',
+                 'hex_color',
+                 'friendly',
+                 'obj_id',
+                 'category',
+                 'position',
+                 'position_delta',
+                 'south_end',
+                 'east_end',
+                 'map_context',         # (map_size, ULHC_lat, ULHC_lon) the geodesic attributes are computed with
+                 'cached_position_ll',  # None until computed
+                 'cached_hdg',
+                 'cached_south_end_ll',
+                 'cached_east_end_ll',
+                 'cached_runway_dir']
+    
+    airfield        = category_property(CATEGORY_AIRFIELD)
+    heavy_tank      = category_property(CATEGORY_HEAVY_TANK)
+    medium_tank     = category_property(CATEGORY_MEDIUM_TANK)
+    light_tank      = category_property(CATEGORY_LIGHT_TANK)
+    spg             = category_property(CATEGORY_SPG)
+    spaa            = category_property(CATEGORY_SPAA)
+    wheeled         = category_property(CATEGORY_WHEELED)
+    tracked         = category_property(CATEGORY_TRACKED)
+    aaa             = category_property(CATEGORY_AAA)
+    bomber          = category_property(CATEGORY_BOMBER)
+    heavy_fighter   = category_property(CATEGORY_HEAVY_FIGHTER)
+    fighter         = category_property(CATEGORY_FIGHTER)
+    ship            = category_property(CATEGORY_SHIP)
+    torpedo_boat    = category_property(CATEGORY_TORPEDO_BOAT)
+    tank_respawn    = category_property(CATEGORY_TANK_RESPAWN)
+    bomber_respawn  = category_property(CATEGORY_BOMBER_RESPAWN)
+    fighter_respawn = category_property(CATEGORY_FIGHTER_RESPAWN)
+    capture_zone    = category_property(CATEGORY_CAPTURE_ZONE)
+    defend_point    = category_property(CATEGORY_DEFEND_POINT)
+    bombing_point   = category_property(CATEGORY_BOMBING_POINT)
+    
+    def __init__(self,
+                 map_obj_entry: dict  = {},
+                 map_size:      float = 65,
+                 ULHC_lat:      float = 0,
+                 ULHC_lon:      float = 0,
+                 position_ll:   list  = None,
+                 south_end_ll:  list  = None,
+                 east_end_ll:   list  = None):
+        '''
+        Args:
+            map_obj_entry:
+                A single object/vehicle entry from the JSON scraped from
+                http://localhost:8111/map_obj.json
+            map_size:
+                The length/width of the map in km (all maps are square)
+            ULHC_lat:
+                The true world estimated latidude of the map's upper left hand
+                corner point
+            ULHC_lon:
+                The true world estimated longitude of the map's upper left hand
+                corner point
+            position_ll:
+                Optional precomputed lat/lon of the object's position (see
+                find_obj_coords_array())
+            south_end_ll:
+                Optional precomputed lat/lon of the runway's south end
+            east_end_ll:
+                Optional precomputed lat/lon of the runway's east end
+        '''
+        
+        self.type      = ''
+        self.icon      = ''
+        self.hex_color = ''
+        self.friendly  = True
+        self.obj_id    = None # stable across samples (MapInfo incremental mode only)
+        
+        self.position       = [0, 0] # NOT for airfield
+        self.position_delta = [0, 0] 
+        self.south_end      = [0, 0] # ONLY for airfield
+        self.east_end       = [0, 0] # ONLY for airfield
+        
+        self.position_ll   = [0, 0] # NOT for airfield
+        self.south_end_ll  = [0, 0] # ONLY for airfield
+        self.east_end_ll   = [0, 0] # ONLY for airfield
+        self.runway_dir    = 0      # ONLY for airfield
+        self.category      = 0      # bitmask of CATEGORY_* flags (see self.airfield, self.fighter, ...)
+        self.map_context   = (map_size, ULHC_lat, ULHC_lon)
+        
+        self.hdg = 0
+        
+        if map_obj_entry:
+            self.update(map_obj_entry, map_size, ULHC_lat, ULHC_lon, position_ll, south_end_ll, east_end_ll)
+    
+    def update(self,
+               map_obj_entry: dict,
+               map_size:      float,
+               ULHC_lat:      float,
+               ULHC_lon:      float,
+               position_ll:   list = None,
+               south_end_ll:  list = None,
+               east_end_ll:   list = None):
+        '''
+        Description:
+        ------------
+        Update object attributes based on the provided map context. Such attributes
+        include:
+            
+            self.type
+            self.icon
+            self.hex_color
+            self.position       (x-y coordinate)
+            self.position_ll    (estimated latitude and longitude)
+            self.position_delta (x-y difference)
+            self.hdg
+            self.south_end    (x-y coordinate)
+            self.south_end_ll (estimated latitude and longitude)
+            self.east_end     (x-y coordinate)
+            self.east_end_ll  (estimated latitude and longitude)
+            self.runway_dir
+            
+        plus the category bitmask that denotes the object's vehicle type (i.e.
+        self.ship or self.fighter)
+        
+        The estimated latitudes/longitudes, heading and runway direction are
+        only computed on first access (unless given precomputed)
+        
+        Args:
+            map_obj_entry:
+                A single object/vehicle entry from the JSON scraped from
+                http://localhost:8111/map_obj.json
+            map_size:
+                The length/width of the map in km (all maps are square)
+            ULHC_lat:
+                The true world estimated latidude of the map's upper left hand
+                corner point
+            ULHC_lon:
+                The true world estimated longitude of the map's upper left hand
+                corner point
+            position_ll:
+                Optional precomputed lat/lon of the object's position (see
+                find_obj_coords_array())
+            south_end_ll:
+                Optional precomputed lat/lon of the runway's south end
+            east_end_ll:
+                Optional precomputed lat/lon of the runway's east end
+        '''
+        
+        self.type        = map_obj_entry['type']
+        self.icon        = map_obj_entry['icon']
+        self.hex_color   = map_obj_entry['color']
+        self.map_context = (map_size, ULHC_lat, ULHC_lon)
+        
+        self.category, friendly = find_obj_class(self.type, self.icon)
+        
+        if friendly is not None:
+            self.friendly = friendly
+        elif (self.hex_color in ENEMY_HEX_COLORS) or map_obj_entry['blink']:
+            self.friendly = False
+        else:
+            self.friendly = True
+        
+        try:
+            self.position = [map_obj_entry['x'], map_obj_entry['y']]
+        except KeyError:
+            self.position = [0, 0]
+        
+        try:
+            self.position_delta = [map_obj_entry['dx'], map_obj_entry['dy']]
+            self.cached_hdg     = None
+        except KeyError:
+            self.position_delta = [0, 0]
+            self.cached_hdg     = 0
+        
+        try:
+            self.south_end = [map_obj_entry['sx'], map_obj_entry['sy']]
+            self.east_end  = [map_obj_entry['ex'], map_obj_entry['ey']]
+            
+            self.cached_south_end_ll = south_end_ll
+            self.cached_east_end_ll  = east_end_ll
+            self.cached_runway_dir   = None
+        except KeyError:
+            self.south_end = [0, 0]
+            self.east_end  = [0, 0]
+            
+            self.cached_south_end_ll = [0, 0]
+            self.cached_east_end_ll  = [0, 0]
+            self.cached_runway_dir   = 0
+        
+        self.cached_position_ll = position_ll
+    
+    @property
+    def position_ll(self) -> list:
+        '''
+        Estimated latitude and longitude of self.position (NOT for airfield)
+        '''
+        
+        if self.cached_position_ll is None:
+            self.cached_position_ll = find_obj_coords(*self.position, *self.map_context)
+        
+        return self.cached_position_ll
+    
+    @position_ll.setter
+    def position_ll(self, position_ll: list):
+        self.cached_position_ll = position_ll
+    
+    @property
+    def hdg(self) -> float:
+        '''
+        Heading in degrees (from self.position_delta)
+        '''
+        
+        if self.cached_hdg is None:
+            hdg = degrees(atan2(*self.position_delta)) + 90
+            
+            if hdg < 0:
+                hdg += 360
+            
+            self.cached_hdg = hdg
+        
+        return self.cached_hdg
+    
+    @hdg.setter
+    def hdg(self, hdg: float):
+        self.cached_hdg = hdg
+    
+    @property
+    def south_end_ll(self) -> list:
+        '''
+        Estimated latitude and longitude of self.south_end (ONLY for airfield)
+        '''
+        
+        if self.cached_south_end_ll is None:
+            self.cached_south_end_ll = find_obj_coords(*self.south_end, *self.map_context)
+        
+        return self.cached_south_end_ll
+    
+    @south_end_ll.setter
+    def south_end_ll(self, south_end_ll: list):
+        self.cached_south_end_ll = south_end_ll
+    
+    @property
+    def east_end_ll(self) -> list:
+        '''
+        Estimated latitude and longitude of self.east_end (ONLY for airfield)
+        '''
+        
+        if self.cached_east_end_ll is None:
+            self.cached_east_end_ll = find_obj_coords(*self.east_end, *self.map_context)
+        
+        return self.cached_east_end_ll
+    
+    @east_end_ll.setter
+    def east_end_ll(self, east_end_ll: list):
+        self.cached_east_end_ll = east_end_ll
+    
+    @property
+    def runway_dir(self) -> float:
+        '''
+        Runway bearing in degrees (ONLY for airfield)
+        '''
+        
+        if self.cached_runway_dir is None:
+            self.cached_runway_dir = coord_bearing(*self.south_end_ll, *self.east_end_ll)
+        
+        return self.cached_runway_dir
+    
+    @runway_dir.setter
+    def runway_dir(self, runway_dir: float):
+        self.cached_runway_dir = runway_dir
+
+
+class MapObjectTable(object):
+    '''
+    Columnar store of all objects of one map_obj.json sample. Every column
+    is a NumPy array with one row per object (in the order of the JSON) and
+    the underlying buffers are reused from sample to sample. Columns -
+        
+        type_code:    index into self.type_names
+        icon_code:    index into self.icon_names
+        color_code:   index into self.color_names
+        category:     bitmask of CATEGORY_* flags
+        friendly:     whether or not the object is friendly
+        pos:          x-y coordinate (NOT for airfield)
+        delta:        x-y difference
+        hdg:          heading in degrees
+        lat:          estimated latitude of pos
+        lon:          estimated longitude of pos
+        runway:       whether or not the object has runway ends
+        south_end:    x-y coordinate (ONLY for airfield)
+        east_end:     x-y coordinate (ONLY for airfield)
+        south_end_ll: estimated latitude and longitude (ONLY for airfield)
+        east_end_ll:  estimated latitude and longitude (ONLY for airfield)
+        runway_dir:   runway bearing in degrees (ONLY for airfield)
+        obj_id:       ID of the object, stable from sample to sample (-1
+                      unless loaded incrementally)
+    
+    map_obj instances are only created on demand (see view() and objects())
+    
+    When loaded incrementally (see load()), each object is matched to the
+    object it continues in the previous sample's table. Matched objects keep
+    their ID, unmoved objects copy their lat/lon and runway geometry instead
+    of converting it again and unchanged objects keep their map_obj. The IDs
+    of the objects added, removed and moved since the previous sample are
+    kept in self.added, self.removed and self.moved. A sample identical to
+    the previous one is copied outright, but matching a sample whose objects
+    moved costs more than a plain load - incremental loading trades some
+    speed for the stable IDs
+    '''
+    
+    def __init__(self, capacity: int = 64):
+        '''
+        Args:
+            capacity:
+                Number of objects to allocate buffers for up front (buffers
+                grow as needed)
+        '''
+        
+        self.size     = 0
+        self.capacity = 0
+        self.entries  = []
+        self.views    = []
+        self.index    = {} # rows of each (category bitmask, friendly) pair
+        self.grid     = None # spatial index (see build_grid())
+        self.kinds    = None # kind of each row found by diff() (see find_kinds())
+        self.loc_km   = None # x-y location in km of each row found by diff()
+        self.next_id  = 0  # ID of the next new object (incremental mode)
+        self.added    = set() # IDs of objects new in this sample
+        self.removed  = set() # IDs of previous sample's objects gone in this sample
+        self.moved    = set() # IDs of objects whose location changed since the previous sample
+        
+        self.published = False # handed out by MapInfo - never refilled once set
+        
+        self.type_names  = []
+        self.type_codes  = {}
+        self.icon_names  = []
+        self.icon_codes  = {}
+        self.color_names = []
+        self.color_codes = {}
+        
+        self.type_classes = [] # TYPE_CLASSES entry of each of self.type_names when loaded
+        self.icon_classes = [] # ICON_CLASSES entry of each of self.icon_names when loaded
+        
+        self.map_size = 65
+        self.ULHC_lat = 0
+        self.ULHC_lon = 0
+        
+        self.allocate(capacity)
+    
+    def __len__(self):
+        return self.size
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.view(j) for j in range(*i.indices(self.size))]
+        
+        if i < 0:
+            i += self.size
+        
+        if not 0 <= i < self.size:
+            raise IndexError('map object index out of range')
+        
+        return self.view(i)
+    
+    def __iter__(self):
+        for i in range(self.size):
+            yield self.view(i)
+    
+    def allocate(self, capacity: int):
+        '''
+        (Re)allocate the column buffers
+        
+        Args:
+            capacity:
+                Number of objects the buffers can hold
+        '''
+        
+        self.capacity         = capacity
+        self.type_code_buf    = np.zeros(capacity, dtype=np.int16)
+        self.icon_code_buf    = np.zeros(capacity, dtype=np.int16)
+        self.color_code_buf   = np.zeros(capacity, dtype=np.int16)
+        self.category_buf     = np.zeros(capacity, dtype=np.uint32)
+        self.friendly_buf     = np.zeros(capacity, dtype=bool)
+        self.pos_buf          = np.zeros((capacity, 2))
+        self.delta_buf        = np.zeros((capacity, 2))
+        self.hdg_buf          = np.zeros(capacity)
+        self.lat_buf          = np.zeros(capacity)
+        self.lon_buf          = np.zeros(capacity)
+        self.runway_buf       = np.zeros(capacity, dtype=bool)
+        self.south_end_buf    = np.zeros((capacity, 2))
+        self.east_end_buf     = np.zeros((capacity, 2))
+        self.south_end_ll_buf = np.zeros((capacity, 2))
+        self.east_end_ll_buf  = np.zeros((capacity, 2))
+        self.runway_dir_buf   = np.zeros(capacity)
+        self.obj_id_buf       = np.full(capacity, -1, dtype=np.int64)
+        
+        self.slice_columns()
+    
+    def slice_columns(self):
+        '''
+        Point every column at the first self.size rows of its buffer
+        '''
+        
+        n = self.size
+        
+        self.type_code    = self.type_code_buf[:n]
+        self.icon_code    = self.icon_code_buf[:n]
+        self.color_code   = self.color_code_buf[:n]
+        self.category     = self.category_buf[:n]
+        self.friendly     = self.friendly_buf[:n]
+        self.pos          = self.pos_buf[:n]
+        self.delta        = self.delta_buf[:n]
+        self.hdg          = self.hdg_buf[:n]
+        self.lat          = self.lat_buf[:n]
+        self.lon          = self.lon_buf[:n]
+        self.runway       = self.runway_buf[:n]
+        self.south_end    = self.south_end_buf[:n]
+        self.east_end     = self.east_end_buf[:n]
+        self.south_end_ll = self.south_end_ll_buf[:n]
+        self.east_end_ll  = self.east_end_ll_buf[:n]
+        self.runway_dir   = self.runway_dir_buf[:n]
+        self.obj_id       = self.obj_id_buf[:n]
+    
+    def find_codes(self, names: list, codes: dict, name_list: list) -> list:
+        '''
+        Convert strings to small integer codes, assigning new codes to
+        strings never seen before
+        
+        Args:
+            names:
+                Strings to convert
+            codes:
+                Code of each known string (updated in place)
+            name_list:
+                Known strings ordered by code (updated in place)
+        
+        Returns:
+                List of codes
+        '''
+        
+        result = []
+        
+        for name in names:
+            code = codes.get(name)
+            
+            if code is None:
+                code        = len(name_list)
+                codes[name] = code
+                name_list.append(name)
+            
+            result.append(code)
+        
+        return result
+    
+    def clear(self, prev: 'MapObjectTable' = None):
+        '''
+        Empty the table (buffers are kept)
+        
+        Args:
+            prev:
+                Table of the previous sample (incremental mode) - all of its
+                objects are reported as removed
+        '''
+        
+        self.size    = 0
+        self.entries = []
+        self.views   = []
+        self.index   = {}
+        self.grid    = None
+        self.kinds   = None
+        self.loc_km  = None
+        self.added   = set()
+        self.moved   = set()
+        self.removed = set()
+        
+        if prev is not None:
+            self.next_id = prev.next_id
+            self.removed = set(prev.obj_id.tolist())
+        
+        self.slice_columns()
+    
+    def find_kinds(self, table: 'MapObjectTable' = None) -> np.ndarray:
+        '''
+        Find the integer code of the (type, icon, friendly) of every row -
+        the identity an object keeps from sample to sample
+        
+        Args:
+            table:
+                Table to find the codes of in terms of this table's type/icon
+                codes (this table if not given). Rows with a type or icon
+                unknown to this table get -1
+        
+        Returns:
+                NumPy array of codes
+        '''
+        
+        if (table is None) or (table is self):
+            return ((self.type_code.astype(np.int64) * (len(self.icon_names) + 1)) + self.icon_code) * 2 + self.friendly
+        
+        type_codes = np.array([self.type_codes.get(name, -1) for name in table.type_names] + [-1], dtype=np.int64)
+        icon_codes = np.array([self.icon_codes.get(name, -1) for name in table.icon_names] + [-1], dtype=np.int64)
+        type_code  = type_codes[table.type_code]
+        icon_code  = icon_codes[table.icon_code]
+        kinds      = ((type_code * (len(self.icon_names) + 1)) + icon_code) * 2 + table.friendly
+        
+        kinds[(type_code < 0) | (icon_code < 0)] = -1
+        
+        return kinds
+    
+    def find_loc_km(self) -> np.ndarray:
+        '''
+        Locate every object on the map (airfields are located at the middle of
+        their runway)
+        
+        Returns:
+                NumPy array of the x-y locations in km from the map's upper
+                left hand corner
+        '''
+        
+        runway = self.runway
+        loc    = self.pos * self.map_size
+        
+        if runway.any():
+            loc[runway] = (self.south_end[runway] + self.east_end[runway]) * (self.map_size / 2)
+        
+        return loc
+    
+    def find_locations(self) -> tuple:
+        '''
+        Locate every object (airfields are located at the middle of their
+        runway)
+        
+        Returns:
+                Tuple of NumPy arrays of the x-y locations in km from the
+                map's upper left hand corner and the lat/lon of the locations
+        '''
+        
+        runway = self.runway
+        loc    = self.pos.copy()
+        loc_ll = np.column_stack([self.lat, self.lon])
+        
+        loc[runway]    = (self.south_end[runway] + self.east_end[runway]) / 2
+        loc_ll[runway] = (self.south_end_ll[runway] + self.east_end_ll[runway]) / 2
+        
+        return loc * self.map_size, loc_ll
+    
+    def load(self, entries: list, map_size: float, ULHC_lat: float, ULHC_lon: float, prev: 'MapObjectTable' = None, gate_km: float = GATE_KM):
+        '''
+        Fill the table from a map_obj.json sample
+        
+        Args:
+            entries:
+                Object/vehicle entries from the JSON scraped from
+                http://localhost:8111/map_obj.json
+            map_size:
+                The length/width of the map in km (all maps are square)
+            ULHC_lat:
+                The true world estimated latidude of the map's upper left hand
+                corner point
+            ULHC_lon:
+                The true world estimated longitude of the map's upper left hand
+                corner point
+            prev:
+                Table of the previous sample to load incrementally against
+                (must not be this table) - see the class description
+            gate_km:
+                Max distance in km an object can move between samples and
+                keep its ID (incremental mode)
+        '''
+        
+        n = len(entries)
+        
+        if n > self.capacity:
+            self.allocate(max(n, 2 * self.capacity))
+        
+        self.size     = n
+        self.entries  = entries
+        self.views    = [None] * n
+        self.grid     = None
+        self.kinds    = None
+        self.loc_km   = None
+        self.map_size = map_size
+        self.ULHC_lat = ULHC_lat
+        self.ULHC_lon = ULHC_lon
+        
+        self.slice_columns()
+        
+        if not n:
+            self.clear(prev)
+            return
+        
+        # Nothing changed since the previous sample (the game updates
+        # map_obj.json less often than it can be polled) - copy its rows
+        if (prev is not None) and self.unchanged(prev):
+            self.copy_rows(prev)
+            return
+        
+        self.type_code[:]  = self.find_codes([entry['type'] for entry in entries], self.type_codes, self.type_names)
+        self.icon_code[:]  = self.find_codes([entry['icon'] for entry in entries], self.icon_codes, self.icon_names)
+        self.color_code[:] = self.find_codes([entry['color'] for entry in entries], self.color_codes, self.color_names)
+        
+        # Classify each distinct type/icon once (the lookups are redone every
+        # sample so that register_icon()/register_type() apply immediately)
+        type_classes = [TYPE_CLASSES.get(name.lower(), NO_CLASS) for name in self.type_names]
+        icon_classes = [ICON_CLASSES.get(name.lower(), NO_CLASS) for name in self.icon_names]
+        
+        self.type_classes = type_classes
+        self.icon_classes = icon_classes
+        
+        category = np.array([cls[0] for cls in type_classes], dtype=np.uint32)[self.type_code]
+        category |= np.array([cls[0] for cls in icon_classes], dtype=np.uint32)[self.icon_code]
+        
+        self.category[:] = category
+        
+        # Forced faction: 1 friendly, 0 enemy, -1 decided by color
+        type_forced = np.array([-1 if cls[1] is None else int(cls[1]) for cls in type_classes], dtype=np.int8)[self.type_code]
+        icon_forced = np.array([-1 if cls[1] is None else int(cls[1]) for cls in icon_classes], dtype=np.int8)[self.icon_code]
+        forced      = np.where(icon_forced >= 0, icon_forced, type_forced)
+        
+        enemy = np.array([name in ENEMY_HEX_COLORS for name in self.color_names], dtype=bool)[self.color_code]
+        blink = np.array([bool(entry['blink']) for entry in entries])
+        
+        self.friendly[:] = np.where(forced >= 0, forced == 1, ~(enemy | blink))
+        
+        self.pos[:, 0] = [entry.get('x', 0) for entry in entries]
+        self.pos[:, 1] = [entry.get('y', 0) for entry in entries]
+        
+        self.delta[:, 0] = [entry.get('dx', 0) for entry in entries]
+        self.delta[:, 1] = [entry.get('dy', 0) for entry in entries]
+        
+        hdg = np.degrees(np.arctan2(self.delta[:, 0], self.delta[:, 1])) + 90
+        hdg[hdg < 0] += 360
+        hdg[[('dx' not in entry) for entry in entries]] = 0
+        
+        self.hdg[:] = hdg
+        
+        self.runway[:] = [('sx' in entry) for entry in entries]
+        runways        = np.flatnonzero(self.runway)
+        
+        self.south_end[:]    = 0
+        self.east_end[:]     = 0
+        self.south_end_ll[:] = 0
+        self.east_end_ll[:]  = 0
+        self.runway_dir[:]   = 0
+        
+        for i in runways:
+            entry = entries[i]
+            
+            self.south_end[i] = [entry['sx'], entry['sy']]
+            self.east_end[i]  = [entry['ex'], entry['ey']]
+        
+        self.obj_id[:] = -1
+        self.added     = set()
+        self.moved     = set()
+        self.removed   = set()
+        
+        if prev is not None:
+            convert = self.diff(prev, gate_km)
+            runways = runways[convert[runways]]
+            convert = np.flatnonzero(convert)
+        else:
+            convert = slice(None)
+        
+        # Convert every (changed) position and runway end in one vectorised
+        # call
+        x = np.concatenate([self.pos[convert, 0], self.south_end[runways, 0], self.east_end[runways, 0]])
+        y = np.concatenate([self.pos[convert, 1], self.south_end[runways, 1], self.east_end[runways, 1]])
+        
+        lat, lon = find_obj_coords_array(x, y, map_size, ULHC_lat, ULHC_lon)
+        m        = len(runways)
+        k        = len(x) - 2 * m # number of positions converted
+        
+        self.lat[convert] = lat[:k]
+        self.lon[convert] = lon[:k]
+        
+        if m:
+            self.south_end_ll[runways, 0] = lat[k:k + m]
+            self.south_end_ll[runways, 1] = lon[k:k + m]
+            self.east_end_ll[runways, 0]  = lat[k + m:]
+            self.east_end_ll[runways, 1]  = lon[k + m:]
+            
+            self.runway_dir[runways] = coord_bearing_array(self.south_end_ll[runways, 0],
+                                                           self.south_end_ll[runways, 1],
+                                                           self.east_end_ll[runways, 0],
+                                                           self.east_end_ll[runways, 1])
+        
+        self.build_index()
+    
+    def unchanged(self, prev: 'MapObjectTable') -> bool:
+        '''
+        Check if the freshly started (but not yet filled) table holds the
+        same sample as the previous sample's table
+        
+        Args:
+            prev:
+                Table of the previous sample
+        
+        Returns:
+                Whether or not the entries, map geometry and classification
+                of the objects are all unchanged
+        '''
+        
+        if prev.size != self.size:
+            return False
+        
+        if (prev.map_size, prev.ULHC_lat, prev.ULHC_lon) != (self.map_size, self.ULHC_lat, self.ULHC_lon):
+            return False
+        
+        if (prev.entries is not self.entries) and (prev.entries != self.entries):
+            return False
+        
+        # register_icon()/register_type() apply to the very next sample
+        type_classes = [TYPE_CLASSES.get(name.lower(), NO_CLASS) for name in prev.type_names]
+        icon_classes = [ICON_CLASSES.get(name.lower(), NO_CLASS) for name in prev.icon_names]
+        
+        return (type_classes == prev.type_classes) and (icon_classes == prev.icon_classes)
+    
+    def copy_rows(self, prev: 'MapObjectTable'):
+        '''
+        Fill the table with the rows of the previous sample's table (same
+        size) - every object keeps its ID and map_obj and nothing is reported
+        as added, removed or moved
+        
+        Args:
+            prev:
+                Table of the previous sample
+        '''
+        
+        for column in TABLE_COLUMNS:
+            getattr(self, column)[:] = getattr(prev, column)
+        
+        self.type_names   = list(prev.type_names)
+        self.type_codes   = dict(prev.type_codes)
+        self.icon_names   = list(prev.icon_names)
+        self.icon_codes   = dict(prev.icon_codes)
+        self.color_names  = list(prev.color_names)
+        self.color_codes  = dict(prev.color_codes)
+        self.type_classes = prev.type_classes
+        self.icon_classes = prev.icon_classes
+        
+        self.views   = list(prev.views)
+        self.index   = prev.index # never modified once built
+        self.grid    = prev.grid
+        self.kinds   = prev.kinds
+        self.loc_km  = prev.loc_km
+        self.next_id = prev.next_id
+        self.added   = set()
+        self.moved   = set()
+        self.removed = set()
+    
+    def diff(self, prev: 'MapObjectTable', gate_km: float = GATE_KM) -> np.ndarray:
+        '''
+        Match the freshly filled (but not yet converted) rows to the rows of
+        the previous sample's table: give every row its ID, copy the
+        geometry of unmoved rows and the map_obj of unchanged rows and find
+        the IDs of the added, removed and moved objects
+        
+        Args:
+            prev:
+                Table of the previous sample
+            gate_km:
+                Max distance in km an object can move between samples and
+                keep its ID
+        
+        Returns:
+                Boolean array of the rows whose geometry still has to be
+                converted to lat/lon
+        '''
+        
+        n       = self.size
+        convert = np.ones(n, dtype=bool)
+        
+        if (prev.map_size, prev.ULHC_lat, prev.ULHC_lon) == (self.map_size, self.ULHC_lat, self.ULHC_lon):
+            self.kinds  = self.find_kinds()
+            self.loc_km = self.find_loc_km()
+            
+            kinds = self.kinds
+            loc   = self.loc_km
+            
+            # The previous sample's kinds/locations are reused if it was
+            # diffed too (kinds only if both tables use the same codes)
+            if (prev.kinds is not None) and (prev.type_names == self.type_names) and (prev.icon_names == self.icon_names):
+                prev_kinds = prev.kinds
+            else:
+                prev_kinds = self.find_kinds(prev)
+            
+            if prev.loc_km is not None:
+                prev_loc = prev.loc_km
+            else:
+                prev_loc = prev.find_loc_km()
+            
+            # Objects keep their place in the JSON until one is added or
+            # removed - if every row still lines up with the same row of the
+            # previous sample, pair them by index without the gated search
+            if (n == prev.size) and np.all((kinds == prev_kinds) &
+                                           (np.hypot(loc[:, 0] - prev_loc[:, 0], loc[:, 1] - prev_loc[:, 1]) <= gate_km)):
+                matches = np.arange(n)
+            else:
+                matches = associate_objs(prev_kinds, prev_loc, kinds, loc, gate_km)
+        else:
+            matches = np.full(n, -1, dtype=np.int64)
+        
+        rows      = np.flatnonzero(matches >= 0)
+        prev_rows = matches[rows]
+        
+        self.next_id = prev.next_id
+        self.added   = set(range(self.next_id, self.next_id + n - len(rows)))
+        self.removed = set(prev.obj_id.tolist())
+        
+        new_rows = np.ones(n, dtype=bool)
+        new_rows[rows] = False
+        
+        self.obj_id[new_rows] = np.arange(self.next_id, self.next_id + n - len(rows))
+        self.next_id         += n - len(rows)
+        
+        if not len(rows):
+            return convert
+        
+        ids = prev.obj_id[prev_rows]
+        
+        self.obj_id[rows] = ids
+        self.removed.difference_update(ids.tolist())
+        
+        unmoved = (self.pos[rows] == prev.pos[prev_rows]).all(axis=1)
+        ends    = np.flatnonzero(self.runway[rows])
+        
+        if len(ends):
+            unmoved[ends] &= (self.south_end[rows[ends]] == prev.south_end[prev_rows[ends]]).all(axis=1)
+            unmoved[ends] &= (self.east_end[rows[ends]] == prev.east_end[prev_rows[ends]]).all(axis=1)
+        
+        self.moved = set(ids[~unmoved].tolist())
+        
+        # Static objects (airfields, respawns, capture zones, ...) never move,
+        # so their geometry is converted once and then carried along
+        rows      = rows[unmoved]
+        prev_rows = prev_rows[unmoved]
+        
+        self.lat[rows]          = prev.lat[prev_rows]
+        self.lon[rows]          = prev.lon[prev_rows]
+        self.south_end_ll[rows] = prev.south_end_ll[prev_rows]
+        self.east_end_ll[rows]  = prev.east_end_ll[prev_rows]
+        self.runway_dir[rows]   = prev.runway_dir[prev_rows]
+        convert[rows]           = False
+        
+        entries      = self.entries
+        prev_entries = prev.entries
+        prev_views   = prev.views
+        
+        for i, j in zip(rows.tolist(), prev_rows.tolist()):
+            if (prev_views[j] is not None) and (entries[i] == prev_entries[j]):
+                self.views[i] = prev_views[j]
+        
+        return convert
+    
+    def build_index(self):
+        '''
+        Group the rows by category bitmask and faction so that queries only
+        touch the rows they return (rows stay in JSON order within a group)
+        '''
+        
+        key          = (self.category.astype(np.int64) << 1) | self.friendly
+        order        = np.argsort(key, kind='stable')
+        keys, starts = np.unique(key[order], return_index=True)
+        bounds       = starts.tolist() + [self.size]
+        index        = {}
+        
+        for k, start, end in zip(keys.tolist(), bounds, bounds[1:]):
+            index[(k >> 1, bool(k & 1))] = order[start:end]
+        
+        self.index = index
+    
+    def find_rows(self, categories: int, friendly: bool = None) -> np.ndarray:
+        '''
+        Find the rows of all objects in any of the given categories
+        
+        Args:
+            categories:
+                Bitmask of CATEGORY_* flags to look for
+            friendly:
+                Only find friendly (True) or enemy (False) objects - both if
+                None
+        
+        Returns:
+                Array of rows in JSON order
+        '''
+        
+        groups = [rows for (category, is_friendly), rows in self.index.items()
+                  if (category & categories) and ((friendly is None) or (is_friendly == friendly))]
+        
+        if not groups:
+            return np.empty(0, dtype=np.int64)
+        
+        if len(groups) == 1:
+            return groups[0]
+        
+        return np.sort(np.concatenate(groups))
+    
+    def find(self, categories: int, friendly: bool = None) -> list:
+        '''
+        Find the map_objs of all objects in any of the given categories
+        
+        Args:
+            categories:
+                Bitmask of CATEGORY_* flags to look for
+            friendly:
+                Only find friendly (True) or enemy (False) objects - both if
+                None
+        
+        Returns:
+                List of map_objs in JSON order
+        '''
+        
+        return [self.view(i) for i in self.find_rows(categories, friendly).tolist()]
+    
+    def filter_rows(self, rows: np.ndarray, categories: int = None, friendly: bool = None) -> np.ndarray:
+        '''
+        Keep only the rows of objects in the given categories/faction
+        
+        Args:
+            rows:
+                Array of rows to filter
+            categories:
+                Bitmask of CATEGORY_* flags to keep - all categories if None
+            friendly:
+                Only keep friendly (True) or enemy (False) objects - both if
+                None
+        
+        Returns:
+                Filtered array of rows
+        '''
+        
+        if categories is not None:
+            rows = rows[(self.category[rows] & categories) != 0]
+        
+        if friendly is not None:
+            rows = rows[self.friendly[rows] == friendly]
+        
+        return rows
+    
+    def build_grid(self, cell_km: float = GRID_CELL_KM):
+        '''
+        Build the spatial index: every object is hashed into a square cell
+        of the map's x/y plane (in km) and the rows are sorted by cell so
+        that the objects of a run of cells are one slice. Airfields are
+        located at the middle of their runway. Built on the first spatial
+        query of each sample
+        
+        Args:
+            cell_km:
+                Length/width of a cell in km
+        '''
+        
+        loc, loc_ll = self.find_locations()
+        
+        num_cells = int(ceil(self.map_size / cell_km)) + 1
+        cells     = np.clip(np.floor(loc / cell_km), 0, num_cells - 1).astype(np.int64)
+        keys      = (cells[:, 0] * num_cells) + cells[:, 1]
+        order     = np.argsort(keys, kind='stable')
+        
+        self.grid = {'cell_km':   cell_km,
+                     'num_cells': num_cells,
+                     'keys':      keys[order],
+                     'rows':      order,
+                     'loc_km':    loc,
+                     'lat':       np.ascontiguousarray(loc_ll[:, 0]),
+                     'lon':       np.ascontiguousarray(loc_ll[:, 1])}
+    
+    def grid_rows(self, x_min: float, x_max: float, y_min: float, y_max: float) -> np.ndarray:
+        '''
+        Find the rows of all objects in the cells overlapping the given
+        x/y range (in km from the map's upper left hand corner)
+        
+        Args:
+            x_min:
+                Left edge of the range
+            x_max:
+                Right edge of the range
+            y_min:
+                Top edge of the range
+            y_max:
+                Bottom edge of the range
+        
+        Returns:
+                Array of candidate rows
+        '''
+        
+        if self.grid is None:
+            self.build_grid()
+        
+        cell_km   = self.grid['cell_km']
+        num_cells = self.grid['num_cells']
+        
+        cx_min = min(max(floor(x_min / cell_km), 0), num_cells - 1)
+        cx_max = min(max(floor(x_max / cell_km), 0), num_cells - 1)
+        cy_min = min(max(floor(y_min / cell_km), 0), num_cells - 1)
+        cy_max = min(max(floor(y_max / cell_km), 0), num_cells - 1)
+        
+        # Each column of cells is one contiguous run of keys
+        columns = np.arange(cx_min, cx_max + 1) * num_cells
+        starts  = np.searchsorted(self.grid['keys'], columns + cy_min, 'left')
+        ends    = np.searchsorted(self.grid['keys'], columns + cy_max, 'right')
+        rows    = self.grid['rows']
+        
+        return np.concatenate([rows[start:end] for start, end in zip(starts.tolist(), ends.tolist())] + [rows[:0]])
+    
+    def within(self, lat: float, lon: float, radius_km: float, categories: int = None, friendly: bool = None) -> tuple:
+        '''
+        Find all objects within the given distance of a point
+        
+        Args:
+            lat:
+                Latitude of the point (dd)
+            lon:
+                Longitude of the point (dd)
+            radius_km:
+                Search radius in km
+            categories:
+                Bitmask of CATEGORY_* flags to look for - all categories if
+                None
+            friendly:
+                Only find friendly (True) or enemy (False) objects - both if
+                None
+        
+        Returns:
+                Tuple of the arrays of rows and their distances in km
+                (nearest first)
+        '''
+        
+        x, y   = find_map_coords(lat, lon, self.map_size, self.ULHC_lat, self.ULHC_lon)
+        x     *= self.map_size
+        y     *= self.map_size
+        margin = radius_km * (1 + GRID_MARGIN)
+        
+        rows = self.grid_rows(x - margin, x + margin, y - margin, y + margin)
+        rows = self.filter_rows(rows, categories, friendly)
+        
+        # Exact great circle check of the candidates
+        dists = coord_dist_array(lat, lon, self.grid['lat'][rows], self.grid['lon'][rows])
+        keep  = dists <= radius_km
+        rows  = rows[keep]
+        dists = dists[keep]
+        order = np.argsort(dists, kind='stable')
+        
+        return rows[order], dists[order]
+    
+    def nearest(self, lat: float, lon: float, k: int = 1, categories: int = None, friendly: bool = None) -> tuple:
+        '''
+        Find the k objects nearest to a point by searching a growing radius
+        
+        Args:
+            lat:
+                Latitude of the point (dd)
+            lon:
+                Longitude of the point (dd)
+            k:
+                Number of objects to find
+            categories:
+                Bitmask of CATEGORY_* flags to look for - all categories if
+                None
+            friendly:
+                Only find friendly (True) or enemy (False) objects - both if
+                None
+        
+        Returns:
+                Tuple of the arrays of (up to k) rows and their distances in
+                km (nearest first)
+        '''
+        
+        if self.grid is None:
+            self.build_grid()
+        
+        x, y   = find_map_coords(lat, lon, self.map_size, self.ULHC_lat, self.ULHC_lon)
+        x     *= self.map_size
+        y     *= self.map_size
+        extent = self.grid['num_cells'] * self.grid['cell_km']
+        reach  = max(hypot(x - corner_x, y - corner_y) for corner_x in (0, extent) for corner_y in (0, extent))
+        radius = self.grid['cell_km']
+        
+        while True:
+            rows, dists = self.within(lat, lon, radius, categories, friendly)
+            
+            # Every object within the radius was found, so the k nearest
+            # are known once there are k of them (or the whole map was searched)
+            if (len(rows) >= k) or (radius > reach * (1 + GRID_MARGIN)):
+                return rows[:k], dists[:k]
+            
+            radius *= 2
+    
+    def in_box(self, lat_1: float, lon_1: float, lat_2: float, lon_2: float, categories: int = None, friendly: bool = None) -> np.ndarray:
+        '''
+        Find all objects inside a lat/lon bounding box
+        
+        Args:
+            lat_1:
+                Latitude of one corner of the box (dd)
+            lon_1:
+                Longitude of one corner of the box (dd)
+            lat_2:
+                Latitude of the opposite corner of the box (dd)
+            lon_2:
+                Longitude of the opposite corner of the box (dd)
+            categories:
+                Bitmask of CATEGORY_* flags to look for - all categories if
+                None
+            friendly:
+                Only find friendly (True) or enemy (False) objects - both if
+                None
+        
+        Returns:
+                Array of rows in JSON order
+        '''
+        
+        lat_min, lat_max = min(lat_1, lat_2), max(lat_1, lat_2)
+        lon_min, lon_max = min(lon_1, lon_2), max(lon_1, lon_2)
+        
+        corners = [find_map_coords(lat, lon, self.map_size, self.ULHC_lat, self.ULHC_lon)
+                   for lat in (lat_min, lat_max) for lon in (lon_min, lon_max)]
+        x       = [corner[0] * self.map_size for corner in corners]
+        y       = [corner[1] * self.map_size for corner in corners]
+        margin  = GRID_MARGIN * self.map_size
+        
+        rows = self.grid_rows(min(x) - margin, max(x) + margin, min(y) - margin, max(y) + margin)
+        rows = self.filter_rows(np.sort(rows), categories, friendly)
+        
+        lat  = self.grid['lat'][rows]
+        lon  = self.grid['lon'][rows]
+        keep = (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+        
+        return rows[keep]
+    
+    def find_icon(self, icon: str):
+        '''
+        Find the first object with the given icon
+        
+        Args:
+            icon:
+                Icon to look for (i.e. "Player")
+        
+        Returns:
+                Row of the object (None if not found)
+        '''
+        
+        code = self.icon_codes.get(icon)
+        
+        if code is None:
+            return None
+        
+        rows = np.flatnonzero(self.icon_code == code)
+        
+        if not len(rows):
+            return None
+        
+        return int(rows[0])
+    
+    def view(self, i: int) -> 'map_obj':
+        '''
+        Get the map_obj of the given row (created on first access)
+        
+        Args:
+            i:
+                Row of the object
+        
+        Returns:
+                map_obj of the row
+        '''
+        
+        obj = self.views[i]
+        
+        if obj is None:
+            # Fill in every attribute directly - map_obj's defaults would all
+            # be overwritten anyway
+            obj = map_obj.__new__(map_obj)
+            
+            obj.category  = int(self.category[i])
+            obj.type      = self.type_names[self.type_code[i]]
+            obj.icon      = self.icon_names[self.icon_code[i]]
+            obj.hex_color = self.color_names[self.color_code[i]]
+            obj.friendly  = bool(self.friendly[i])
+            
+            obj.position       = self.pos[i].tolist()
+            obj.position_delta = self.delta[i].tolist()
+            obj.south_end      = self.south_end[i].tolist()
+            obj.east_end       = self.east_end[i].tolist()
+            obj.map_context    = (self.map_size, self.ULHC_lat, self.ULHC_lon)
+            obj.obj_id         = int(self.obj_id[i]) if self.obj_id[i] >= 0 else None
+            
+            # The table already converted everything in one vectorised call
+            obj.cached_position_ll  = [float(self.lat[i]), float(self.lon[i])]
+            obj.cached_south_end_ll = self.south_end_ll[i].tolist()
+            obj.cached_east_end_ll  = self.east_end_ll[i].tolist()
+            obj.cached_runway_dir   = float(self.runway_dir[i])
+            obj.cached_hdg          = float(self.hdg[i])
+            
+            self.views[i] = obj
+        
+        return obj
+    
+    def objects(self) -> list:
+        '''
+        Returns:
+                List of the map_obj of every row
+        '''
+        
+        return [self.view(i) for i in range(self.size)]
+
+
+class MapInfo(object):
+    def __init__(self, session=None, timeout: float = REQUEST_TIMEOUT, incremental: bool = False, gate_km: float = GATE_KM):
+        '''
+        Args:
+            session:
+                requests.Session used to query the localhost server. Pass
+                the session of another interface to share its pool of
+                keep-alive connections - a new pooled session is created if
+                not given
+            timeout:
+                Timeout in seconds for each request to the localhost server
+            incremental:
+                Whether or not to match every sample's objects to the
+                previous sample's objects - gives each object a stable
+                obj_id, reuses the map_objs and geometry of unchanged
+                objects and reports the objects added, removed and moved by
+                each sample (see added_objs(), removed_ids() and
+                moved_objs()). Samples that changed are processed slower
+                than without it
+            gate_km:
+                Max distance in km an object can move between samples and
+                keep its ID (incremental mode)
+        '''
+        
+        self.session        = session
+        self.timeout        = timeout
+        self.incremental    = incremental
+        self.gate_km        = gate_km
+        self.map_valid      = False
+        self.table          = MapObjectTable() # objects of the latest sample
+        self.back_table     = MapObjectTable() # buffers filled by the next sample
+        self.map_objs_cache = None # (table, map_objs) of the latest sample (see self.map_objs)
+        self.map_bytes      = None # raw JPEG of the last identified map.img
+        self.map_full_img   = None # full resolution decode (see self.map_img)
+        self.map_full_draw  = None
+        self.grid_info      = None
+        self.map_digest     = None # digest of the last identified map.img
+        self.map_generation = None # map_generation of the last decoded map.img
+        
+        if self.session is None:
+            self.session = self.create_session()
+    
+    def create_session(self):
+        '''
+        Create the pooled session used to query the localhost server if none
+        was given to the constructor
+        
+        Returns:
+                New requests.Session
+        '''
+        
+        return create_session()
+    
+    def download_files(self, futures: list = None) -> bool:
+        '''
+        Sample information about the map and the "seen" objects in the match
+        from the localhost
+        
+        The map can't change during a match, so /map.img is only downloaded
+        (and self.grid_info only rebuilt) when map_info.json reports a new
+        map_generation or no map has been identified yet. Even then, the image
+        is only decoded and hashed again if its contents differ from the last
+        identified image. The image is kept in memory and never written to
+        disk
+        
+        Example self.info - 
+        {'grid_steps': [8192.0, 8192.0],
+         'grid_zero': [-28672.0, 28672.0],
+         'map_generation': 12,
+         'map_max': [32768.0, 32768.0],
+         'map_min': [-32768.0, -32768.0]}
+        
+        Example self.obj - 
+        [{'type': 'airfield',
+          'color': '#185AFF',
+          'color[]': [24, 90, 255],
+          'blink': 0,
+          'icon': 'none',
+          'icon_bg': 'none',
+          'sx': 0.338597,
+          'sy': 0.720108,
+          'ex': 0.357913,
+          'ey': 0.692523},
+         {'type': 'aircraft',
+          'color': '#fa3200',
+          'color[]': [250, 50, 0],
+          'blink': 0,
+          'icon': 'Fighter',
+          'icon_bg': 'none',
+          'x': 0.48744,
+          'y': 0.542793,
+          'dx': -0.640827,
+          'dy': 0.767686},
+         ...]
+        
+        Args:
+            futures:
+                Optional list of futures returned by submit_files(). If given,
+                the map data is taken from the (concurrent) downloads instead
+                of being requested here one file after another
+        
+        Returns:
+                Whether or not the map data was successfully retrieved
+        '''
+        
+        self.map_valid = False
+        
+        try:
+            if futures is None:
+                map_img = None
+                info    = self.fetch_info()
+                obj     = self.fetch_obj()
+            else:
+                map_img, info, obj = [future.result() if future is not None else None for future in futures]
+            
+            if (map_img is None) and self.map_changed(info):
+                map_img = self.fetch_map_img()
+            
+            self.load_files(map_img, info, obj)
+            
+        except ReadTimeout:
+            print('ERROR: ReadTimeout')
+            
+        except ConnectTimeout:
+            print('ERROR: ConnectTimeout')
+                
+        except ConnectionError:
+            print('ERROR: could not download map.jpg')
+            self.map_generation = None # the game may have restarted
+    
+        except (OSError, JSONDecodeError, simpleJSONDecodeError):
+            print('Waiting to join a match')
+            self.map_generation = None
+            sleep(1)
+        
+        self.parse_meta()
+            
+        return self.map_valid
+    
+    def submit_files(self, executor) -> list:
+        '''
+        Schedule the downloads of /map_info.json and /map_obj.json (and
+        /map.img if no map has been identified yet) on the given executor so
+        they run at the same time as each other (and anything else submitted
+        to the executor). Pass the returned futures to download_files() to
+        finish processing the map data
+        
+        Args:
+            executor:
+                concurrent.futures.Executor used to run the downloads
+        
+        Returns:
+                List of futures for the map image (None if not requested), map
+                info and map object downloads (in that order)
+        '''
+        
+        map_img_future = None
+        
+        if self.map_digest is None:
+            map_img_future = executor.submit(self.fetch_map_img)
+        
+        return [map_img_future,
+                executor.submit(self.fetch_info),
+                executor.submit(self.fetch_obj)]
+    
+    def map_changed(self, info: dict) -> bool:
+        '''
+        Check whether the map image needs to be downloaded (again)
+        
+        Args:
+            info:
+                Parsed JSON of http://localhost:8111/map_info.json
+        
+        Returns:
+                Whether or not no map was identified yet or the map info
+                reports a different map generation than the last decoded map
+        '''
+        
+        return (self.map_digest is None) or (info.get('map_generation') != self.map_generation)
+    
+    def fetch_map_img(self) -> bytes:
+        '''
+        Download the raw JPEG bytes of the current map
+        
+        Returns:
+                Contents of http://localhost:8111/map.img
+        '''
+        
+        return self.session.get(URL_MAP_IMG, timeout=self.timeout).content
+    
+    def fetch_info(self) -> dict:
+        '''
+        Download the current map's metadata
+        
+        Returns:
+                Parsed JSON of http://localhost:8111/map_info.json
+        '''
+        
+        return self.session.get(URL_MAP_INFO, timeout=self.timeout).json()
+    
+    def fetch_obj(self) -> list:
+        '''
+        Download the list of objects currently shown on the map
+        
+        Returns:
+                Parsed JSON of http://localhost:8111/map_obj.json
+        '''
+        
+        return self.session.get(URL_MAP_OBJ, timeout=self.timeout).json()
+    
+    def load_files(self, map_img: bytes, info: dict, obj: list):
+        '''
+        Process freshly downloaded map data: identify the map from a reduced
+        decode of its image and store the map info/objects. The map image is
+        only decoded and identified if its contents changed since the last
+        identified image (the full resolution image is decoded on first
+        access of self.map_img)
+        
+        Args:
+            map_img:
+                Raw JPEG bytes of the current map (None to keep the current
+                map)
+            info:
+                Parsed JSON of http://localhost:8111/map_info.json
+            obj:
+                Parsed JSON of http://localhost:8111/map_obj.json
+        '''
+        
+        self.info = info
+        self.obj  = obj
+        
+        if map_img is not None:
+            digest = hashlib.sha1(map_img).hexdigest()
+            
+            if digest != self.map_digest:
+                self.grid_info     = get_grid_info(map_img)
+                self.map_bytes     = map_img
+                self.map_full_img  = None
+                self.map_full_draw = None
+                self.map_digest    = digest
+            
+            self.map_generation = info.get('map_generation')
+        
+        self.map_valid = True
+    
+    def parse_meta(self):
+        '''
+        Calculate values that might be useful for extra processing. Also fill
+        the table of War Thunder objects (self.table, viewed as map_objs
+        through self.map_objs) present in the match to keep track of
+        '''
+        
+        table = self.back_table
+        self.player_found = False
+        
+        # Only refill the spare table's buffers if it was never handed out
+        # (i.e. through snapshot() to a telemetry.TelemSample) - otherwise
+        # start a new one so that held tables never change
+        if table.published:
+            table = MapObjectTable(table.capacity)
+        
+        prev = self.table if self.incremental else None
+        
+        if self.map_valid:
+            table.load(self.obj,
+                       self.grid_info['size_km'],
+                       self.grid_info['ULHC_lat'],
+                       self.grid_info['ULHC_lon'],
+                       prev,
+                       self.gate_km)
+            
+            player = table.find_icon('Player')
+            
+            if player is not None:
+                self.player_found = True
+                
+                self.player_lat = float(table.lat[player])
+                self.player_lon = float(table.lon[player])
+                self.player_x   = float(table.pos[player, 0])
+                self.player_y   = float(table.pos[player, 1])
+        else:
+            table.clear(prev)
+        
+        # Swap in the finished table in one go so that other threads never see
+        # it half built (its buffers are refilled by the sample after next)
+        self.table, self.back_table = table, self.table
+        self.map_objs_cache         = None
+    
+    @property
+    def map_img(self) -> Image:
+        '''
+        PIL.Image object of the current map (decoded at full resolution on
+        first access, None if no map was downloaded yet)
+        '''
+        
+        if (self.map_full_img is None) and (self.map_bytes is not None):
+            self.map_full_img = open_map_img(self.map_bytes)
+        
+        return self.map_full_img
+    
+    @property
+    def map_draw(self) -> ImageDraw.ImageDraw:
+        '''
+        ImageDraw.Draw object to draw on self.map_img (None if no map was
+        downloaded yet)
+        '''
+        
+        if (self.map_full_draw is None) and (self.map_img is not None):
+            self.map_full_draw = ImageDraw.Draw(self.map_img)
+        
+        return self.map_full_draw
+    
+    @property
+    def map_objs(self) -> list:
+        '''
+        List of map_objs of all War Thunder objects present in the match
+        (created on first access after each sample). The list may be modified
+        or replaced until the next sample, but find_objs() and the other
+        queries always answer from the sampled objects
+        '''
+        
+        # The list is cached together with the table it belongs to, so a
+        # list built from the previous table while parse_meta() swaps in a
+        # new one is never returned for the new table
+        table  = self.table
+        cached = self.map_objs_cache
+        
+        if (cached is None) or (cached[0] is not table):
+            cached              = (table, table.objects())
+            self.map_objs_cache = cached
+        
+        return cached[1]
+    
+    @map_objs.setter
+    def map_objs(self, map_objs: list):
+        self.map_objs_cache = (self.table, map_objs)
+    
+    def snapshot(self) -> MapObjectTable:
+        '''
+        Get the objects of the latest sample without creating their map_objs.
+        The table acts as a read-only sequence of map_objs (created on first
+        access) and is never refilled by later samples while it is held
+        
+        Returns:
+                Table of the latest sample's objects
+        '''
+        
+        table           = self.table
+        table.published = True
+        
+        return table
+    
+    @property
+    def obj_lat(self) -> np.ndarray:
+        '''
+        Latitude of each map object's position
+        '''
+        
+        self.table.published = True
+        
+        return self.table.lat
+    
+    @property
+    def obj_lon(self) -> np.ndarray:
+        '''
+        Longitude of each map object's position
+        '''
+        
+        self.table.published = True
+        
+        return self.table.lon
+    
+    def find_objs(self, categories: int, friendly: bool = None) -> list:
+        '''
+        Return a list of map_objs of all objects currently in the match that
+        belong to any of the given categories (served from the category
+        index built by parse_meta())
+        
+        Args:
+            categories:
+                Bitmask of CATEGORY_* flags to look for (i.e.
+                CATEGORY_FIGHTER | CATEGORY_BOMBER)
+            friendly:
+                Only return friendly (True) or enemy (False) objects - both
+                if None
+        
+        Returns:
+                List of map_objs of found objects
+        '''
+        
+        return self.table.find(categories, friendly)
+    
+    def added_objs(self) -> list:
+        '''
+        Return a list of map_objs of all objects that are new in the latest
+        sample (incremental mode only)
+        
+        Returns:
+                List of map_objs
+        '''
+        
+        table = self.table
+        rows  = np.flatnonzero(np.isin(table.obj_id, list(table.added)))
+        
+        return [table.view(i) for i in rows.tolist()]
+    
+    def removed_ids(self) -> set:
+        '''
+        Return the obj_ids of all objects of the previous sample that are gone
+        in the latest sample (incremental mode only)
+        
+        Returns:
+                Set of obj_ids
+        '''
+        
+        return self.table.removed
+    
+    def moved_objs(self) -> list:
+        '''
+        Return a list of map_objs of all objects that changed location since
+        the previous sample (incremental mode only)
+        
+        Returns:
+                List of map_objs
+        '''
+        
+        table = self.table
+        rows  = np.flatnonzero(np.isin(table.obj_id, list(table.moved)))
+        
+        return [table.view(i) for i in rows.tolist()]
+    
+    def objs_within(self, lat: float, lon: float, radius_km: float, categories: int = None, friendly: bool = None) -> list:
+        '''
+        Return a list of map_objs of all objects currently in the match within
+        the given distance of a point (i.e. all enemy planes within 5 km of
+        the player), served from a spatial index instead of checking every
+        object
+        
+        Args:
+            lat:
+                Latitude of the point (dd)
+            lon:
+                Longitude of the point (dd)
+            radius_km:
+                Search radius in km
+            categories:
+                Bitmask of CATEGORY_* flags to look for - all categories if
+                None
+            friendly:
+                Only return friendly (True) or enemy (False) objects - both
+                if None
+        
+        Returns:
+                List of map_objs of found objects (nearest first)
+        '''
+        
+        rows, _ = self.table.within(lat, lon, radius_km, categories, friendly)
+        
+        return [self.table.view(i) for i in rows.tolist()]
+    
+    def nearest_objs(self, lat: float, lon: float, k: int = 1, categories: int = None, friendly: bool = None) -> list:
+        '''
+        Return a list of map_objs of the k objects currently in the match
+        nearest to a point (i.e. the nearest friendly airfield)
+        
+        Args:
+            lat:
+                Latitude of the point (dd)
+            lon:
+                Longitude of the point (dd)
+            k:
+                Number of objects to return
+            categories:
+                Bitmask of CATEGORY_* flags to look for - all categories if
+                None
+            friendly:
+                Only return friendly (True) or enemy (False) objects - both
+                if None
+        
+        Returns:
+                List of (up to k) map_objs of found objects (nearest first)
+        '''
+        
+        rows, _ = self.table.nearest(lat, lon, k, categories, friendly)
+        
+        return [self.table.view(i) for i in rows.tolist()]
+    
+    def objs_in_box(self, lat_1: float, lon_1: float, lat_2: float, lon_2: float, categories: int = None, friendly: bool = None) -> list:
+        '''
+        Return a list of map_objs of all objects currently in the match inside
+        a lat/lon bounding box
+        
+        Args:
+            lat_1:
+                Latitude of one corner of the box (dd)
+            lon_1:
+                Longitude of one corner of the box (dd)
+            lat_2:
+                Latitude of the opposite corner of the box (dd)
+            lon_2:
+                Longitude of the opposite corner of the box (dd)
+            categories:
+                Bitmask of CATEGORY_* flags to look for - all categories if
+                None
+            friendly:
+                Only return friendly (True) or enemy (False) objects - both
+                if None
+        
+        Returns:
+                List of map_objs of found objects
+        '''
+        
+        rows = self.table.in_box(lat_1, lon_1, lat_2, lon_2, categories, friendly)
+        
+        return [self.table.view(i) for i in rows.tolist()]
+    
+    def airfields(self) -> list:
+        '''
+        Return a list of map_objs that includes all airfields currently in the match
+        
+        Returns:
+                List of map_objs of found airfields
+        '''
+        
+        return self.find_objs(CATEGORY_AIRFIELD)
+    
+    def bombing_points(self) -> list:
+        '''
+        Return a list of map_objs that includes all bomb points currently in the match
+        
+        Returns:
+                List of map_objs of found bombing points 
+        '''
+        
+        return self.find_objs(CATEGORY_BOMBING_POINT)
+    
+    def heavy_tanks(self) -> list:
+        '''
+        Return a list of map_objs that includes all heavy tanks currently in the match
+        
+        Returns:
+                List of map_objs of found heavy tanks
+        '''
+        
+        return self.find_objs(CATEGORY_HEAVY_TANK)
+    
+    def medium_tanks(self) -> list:
+        '''
+        Return a list of map_objs that includes all medium tanks currently in the match
+        
+        Returns:
+                List of map_objs of found medium tanks
+        '''
+        
+        return self.find_objs(CATEGORY_MEDIUM_TANK)
+    
+    def light_tanks(self) -> list:
+        '''
+        Return a list of map_objs that includes all light tanks currently in the match
+        
+        Returns:
+                List of map_objs of found light tanks
+        '''
+        
+        return self.find_objs(CATEGORY_LIGHT_TANK)
+    
+    def SPGs(self) -> list:
+        '''
+        Return a list of map_objs that includes all spgs currently in the match
+        
+        Returns:
+                List of map_objs of found spgs
+        '''
+        
+        return self.find_objs(CATEGORY_SPG)
+    
+    def SPAAs(self) -> list:
+        '''
+        Return a list of map_objs that includes all spaas currently in the match
+        
+        Returns:
+                List of map_objs of found spaas
+        '''
+        
+        return self.find_objs(CATEGORY_SPAA)
+    
+    def tanks(self) -> list:
+        '''
+        Return a list of map_objs that includes all tanks currently in the match
+        
+        Returns:
+                List of map_objs of found tanks
+        '''
+        
+        # One lookup for all categories - the category flags ascend in the old
+        # grouping order (heavy, medium, light, SPG, SPAA), so a stable sort restores it
+        output = self.find_objs(CATEGORY_HEAVY_TANK | CATEGORY_MEDIUM_TANK | CATEGORY_LIGHT_TANK | CATEGORY_SPG | CATEGORY_SPAA)
+        output.sort(key=lambda obj: obj.category)
+        
+        return output
+    
+    def wheeled_AIs(self) -> list:
+        '''
+        Return a list of map_objs that includes all wheeled AIs currently in the match
+        
+        Returns:
+                List of map_objs of found wheeled AIs
+        '''
+        
+        return self.find_objs(CATEGORY_WHEELED)
+    
+    def tracked_AIs(self) -> list:
+        '''
+        Return a list of map_objs that includes all tracked AIs currently in the match
+        
+        Returns:
+                List of map_objs of found tracked AIs
+        '''
+        
+        return self.find_objs(CATEGORY_TRACKED)
+    
+    def AAAs(self) -> list:
+        '''
+        Return a list of map_objs that includes all AAAs currently in the match
+        
+        Returns:
+                List of map_objs of found AAAs
+        '''
+        
+        return self.find_objs(CATEGORY_AAA)
+    
+    def bombers(self) -> list:
+        '''
+        Return a list of map_objs that includes all bombers (and helicopters) currently in the match
+        
+        Returns:
+                List of map_objs of found bombers/helicopters
+        '''
+        
+        return self.find_objs(CATEGORY_BOMBER)
+    
+    def heavy_fighters(self) -> list:
+        '''
+        Return a list of map_objs that includes all heavy fighters currently in the match
+        
+        Returns:
+                List of map_objs of found heavy fighters
+        '''
+        
+        return self.find_objs(CATEGORY_HEAVY_FIGHTER)
+    
+    def fighters(self) -> list:
+        '''
+        Return a list of map_objs that includes all fighters currently in the match
+        
+        Returns:
+                List of map_objs of found fighters
+        '''
+        
+        return self.find_objs(CATEGORY_FIGHTER)
+    
+    def ships(self) -> list:
+        '''
+        Return a list of map_objs that includes all shis currently in the match
+        
+        Returns:
+                List of map_objs of found ships
+        '''
+        
+        return self.find_objs(CATEGORY_SHIP | CATEGORY_TORPEDO_BOAT)
+    
+    def planes(self) -> list:
+        '''
+        Return a list of map_objs that includes all planes currently in the match
+        
+        Returns:
+                List of map_objs of found planes
+        '''
+        
+        # Same ordering trick as tanks()
+        output = self.find_objs(CATEGORY_BOMBER | CATEGORY_HEAVY_FIGHTER | CATEGORY_FIGHTER)
+        output.sort(key=lambda obj: obj.category)
+        
+        return output
+    
+    def tank_respawns(self) -> list:
+        '''
+        Return a list of map_objs that includes all tank respawns currently in the match
+        
+        Returns:
+                List of map_objs of found tank respawns
+        '''
+        
+        return self.find_objs(CATEGORY_TANK_RESPAWN)
+    
+    def bomber_respawns(self) -> list:
+        '''
+        Return a list of map_objs that includes all bomber respawns currently in the match
+        
+        Returns:
+                List of map_objs of found bomber respawns
+        '''
+        
+        return self.find_objs(CATEGORY_BOMBER_RESPAWN)
+    
+    def fighter_respawns(self) -> list:
+        '''
+        Return a list of map_objs that includes all fighter respawns currently in the match
+        
+        Returns:
+                List of map_objs of found fighter respawns
+        '''
+        
+        return self.find_objs(CATEGORY_FIGHTER_RESPAWN)
+    
+    def plane_respawns(self) -> list:
+        '''
+        Return a list of map_objs that includes all plane respawns currently in the match
+        
+        Returns:
+                List of map_objs of found plane respawns
+        '''
+        
+        # Same ordering trick as tanks()
+        output = self.find_objs(CATEGORY_BOMBER_RESPAWN | CATEGORY_FIGHTER_RESPAWN)
+        output.sort(key=lambda obj: obj.category)
+        
+        return output
+    
+    def capture_zones(self) -> list:
+        '''
+        Return a list of map_objs that includes all capture zones currently in the match
+        
+        Returns:
+                List of map_objs of found capture zones
+        '''
+        
+        return self.find_objs(CATEGORY_CAPTURE_ZONE)
+    
+    def defend_points(self) -> list:
+        '''
+        Return a list of map_objs that includes all defend points currently in the match
+        
+        Returns:
+                List of map_objs of found defend points
+        '''
+        
+        return self.find_objs(CATEGORY_DEFEND_POINT)
+    
+    
+
@@ -0,0 +1,279 @@
+'''
+Module to automatically record every object shown on the War Thunder map as
+a Tacview entity (see acmi.py)
+'''
+
+
+from WarThunder import acmi, mapinfo
+
+
+GATE_KM    = mapinfo.GATE_KM # max distance an object can move between samples and keep its track
+MAX_MISSES = 3   # number of samples a track can go unseen before it is removed
+COLOR_FRIENDLY = 'Blue'
+COLOR_ENEMY    = 'Red'
+
+
+def find_acmi_type(obj: mapinfo.map_obj) -> str:
+    '''
+    Find the Tacview object type tags best describing the given map object
+    
+    Args:
+        obj:
+            Map object to describe
+    
+    Returns:
+            Tacview "Type" property value
+    '''
+    
+    if obj.airfield:
+        return 'Ground+Static+Aerodrome'
+    elif obj.icon == 'Player' or obj.bomber or obj.heavy_fighter or obj.fighter:
+        return 'Air+FixedWing'
+    elif obj.heavy_tank or obj.medium_tank or obj.light_tank or obj.spg:
+        return 'Ground+Heavy+Armor+Vehicle+Tank'
+    elif obj.spaa or obj.aaa:
+        return 'Ground+AntiAircraft'
+    elif obj.tracked:
+        return 'Ground+Heavy+Armor+Vehicle'
+    elif obj.wheeled:
+        return 'Ground+Light+Vehicle'
+    elif obj.ship or obj.torpedo_boat:
+        return 'Sea+Watercraft'
+    elif obj.tank_respawn or obj.bomber_respawn or obj.fighter_respawn or \
+         obj.capture_zone or obj.defend_point or obj.bombing_point:
+        return 'Navaid+Static+Waypoint'
+    
+    return 'Misc'
+
+def find_obj_xy(obj: mapinfo.map_obj, map_size: float) -> list:
+    '''
+    Find the x-y location of a map object in km from the map's upper left hand
+    corner (airfields are located at the middle of their runway)
+    
+    Args:
+        obj:
+            Map object to locate
+        map_size:
+            The length/width of the map in km (all maps are square)
+    
+    Returns:
+            x-y location in km
+    '''
+    
+    if obj.airfield:
+        return [(obj.south_end[0] + obj.east_end[0]) / 2 * map_size,
+                (obj.south_end[1] + obj.east_end[1]) / 2 * map_size]
+    
+    return [obj.position[0] * map_size,
+            obj.position[1] * map_size]
+
+def find_obj_ll(obj: mapinfo.map_obj) -> list:
+    '''
+    Find the estimated latitude and longitude of a map object (airfields are
+    located at the middle of their runway)
+    
+    Args:
+        obj:
+            Map object to locate
+    
+    Returns:
+            Latitude and longitude in degrees
+    '''
+    
+    if obj.airfield:
+        return [(obj.south_end_ll[0] + obj.east_end_ll[0]) / 2,
+                (obj.south_end_ll[1] + obj.east_end_ll[1]) / 2]
+    
+    return obj.position_ll
+
+
+class track(object):
+    def __init__(self, obj_num: int, obj: mapinfo.map_obj, x: float, y: float):
+        '''
+        Args:
+            obj_num:
+                ACMI object number the track is recorded as
+            obj:
+                Map object the track was started from
+            x:
+                x location of the object in km
+            y:
+                y location of the object in km
+        '''
+        
+        self.obj_num  = obj_num
+        self.icon     = obj.icon
+        self.type     = obj.type
+        self.friendly = obj.friendly
+        self.obj      = obj
+        self.x        = x
+        self.y        = y
+        self.misses   = 0
+    
+    def key(self) -> tuple:
+        '''
+        Returns:
+                Identity that a map object must share to continue this track
+        '''
+        
+        return (self.type, self.icon, self.friendly)
+
+
+class MatchRecorder(object):
+    '''
+    Ties a MapInfo object to an ACMI file: every sample, each map object is
+    matched to the nearest existing track of the same kind (see
+    mapinfo.associate_objs()). Unmatched objects start new Tacview objects
+    and tracks that go unseen for too long are removed from the recording.
+    Example -
+        
+        telem = telemetry.TelemInterface()
+        
+        with acmi.ACMI(num_objs=0) as log:
+            log.create('match.acmi', buffered=True)
+            recorder = MatchRecorder(log)
+            
+            while True:
+                telem.get_telemetry()
+                recorder.update(telem.map_info)
+    '''
+    
+    def __init__(self, acmi_obj: acmi.ACMI, gate_km: float = GATE_KM, max_misses: int = MAX_MISSES):
+        '''
+        Args:
+            acmi_obj:
+                ACMI object (with its file already created) to record to
+            gate_km:
+                Max distance in km an object can move between samples and
+                still be matched to its track
+            max_misses:
+                Number of samples a track can go unseen before it is removed
+                from the recording
+        '''
+        
+        self.acmi       = acmi_obj
+        self.gate_km    = gate_km
+        self.max_misses = max_misses
+        self.tracks     = {} # keyed by ACMI object number
+    
+    def associate(self, objs: list, map_size: float) -> list:
+        '''
+        Match map objects to existing tracks - closest pairs within the gate
+        are matched first, each track and object is matched at most once
+        
+        Args:
+            objs:
+                List of map objects in the current sample
+            map_size:
+                The length/width of the map in km (all maps are square)
+        
+        Returns:
+                List of [track (None if unmatched), map object, x, y] for
+                every map object
+        '''
+        
+        tracks  = list(self.tracks.values())
+        matches = [[None, obj, *find_obj_xy(obj, map_size)] for obj in objs]
+        kinds   = {} # integer code of each (type, icon, friendly)
+        found   = mapinfo.associate_objs([kinds.setdefault(trk.key(), len(kinds)) for trk in tracks],
+                                         [[trk.x, trk.y] for trk in tracks],
+                                         [kinds.setdefault((obj.type, obj.icon, obj.friendly), len(kinds)) for obj in objs],
+                                         [match[2:] for match in matches],
+                                         self.gate_km)
+        
+        for match, j in zip(matches, found.tolist()):
+            if j >= 0:
+                match[0] = tracks[j]
+        
+        return matches
+    
+    def update(self, map_info: mapinfo.MapInfo, timestamp=None, telemetry: dict = None) -> bool:
+        '''
+        Match the current map objects to their tracks and log one batched
+        frame of all tracks to the ACMI file, adding and removing Tacview
+        objects as contacts appear and disappear
+        
+        Args:
+            map_info:
+                MapInfo object holding the latest map sample
+            timestamp:
+                Time of the sample - see acmi.ACMI.insert_frame()
+            telemetry:
+                Optional basic telemetry dictionary of the player (see
+                telemetry.TelemInterface.basic_telemetry) used to add the
+                player's altitude and attitude
+        
+        Returns:
+                Whether or not the frame was successfully written
+        '''
+        
+        if map_info.map_valid and map_info.grid_info:
+            objs     = map_info.map_objs
+            map_size = map_info.grid_info['size_km']
+        else:
+            objs     = []
+            map_size = 0
+        
+        frame = {}
+        
+        for trk, obj, x, y in self.associate(objs, map_size):
+            data = {}
+            
+            if trk is None:
+                obj_num = self.acmi.next_obj_num
+                self.acmi.add_object(obj_num)
+                
+                trk = track(obj_num, obj, x, y)
+                self.tracks[obj_num] = trk
+                
+                data['Name']  = obj.type if obj.icon == 'none' else obj.icon
+                data['Type']  = find_acmi_type(obj)
+                data['Color'] = COLOR_FRIENDLY if obj.friendly else COLOR_ENEMY
+            
+            trk.obj    = obj
+            trk.x      = x
+            trk.y      = y
+            trk.misses = -1 # counted back to 0 below
+            
+            lat, lon = find_obj_ll(obj)
+            
+            if (obj.icon == 'Player') and telemetry:
+                data['T'] = '{:0.7f}|{:0.7f}|{}|{}|{}|{}'.format(lon,
+                                                                 lat,
+                                                                 telemetry.get('altitude', ''),
+                                                                 telemetry.get('roll', ''),
+                                                                 telemetry.get('pitch', ''),
+                                                                 telemetry.get('heading', obj.hdg))
+                
+                if ('Name' in data) and telemetry.get('airframe'):
+                    data['Name'] = telemetry['airframe']
+            elif obj.airfield:
+                data['T'] = '{:0.7f}|{:0.7f}||||{:0.1f}'.format(lon, lat, obj.runway_dir)
+            else:
+                data['T'] = '{:0.7f}|{:0.7f}||||{:0.1f}'.format(lon, lat, obj.hdg)
+            
+            frame[trk.obj_num] = data
+        
+        removed = []
+        
+        for obj_num, trk in list(self.tracks.items()):
+            trk.misses += 1
+            
+            if trk.misses > self.max_misses:
+                removed.append(obj_num)
+                del self.tracks[obj_num]
+        
+        return self.acmi.insert_frame(timestamp, frame, removed)
+    
+    def clear(self) -> bool:
+        '''
+        Remove every track from the recording (i.e. at the end of a match)
+        
+        Returns:
+                Whether or not the removal was successfully written
+        '''
+        
+        removed     = list(self.tracks)
+        self.tracks = {}
+        
+        return self.acmi.insert_frame(None, {}, removed)
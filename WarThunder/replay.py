@@ -0,0 +1,352 @@
+'''
+Module to record the raw responses of War Thunder's localhost server and
+replay them later without the game running (i.e. for reproducible offline
+benchmarks of the full telemetry pipeline). Both session classes can be
+passed to telemetry.TelemInterface(session=...) or mapinfo.MapInfo(session=...)
+'''
+
+
+import gzip
+import json
+import base64
+import hashlib
+import threading
+from time import monotonic, sleep
+from urllib.parse import urlsplit
+import requests
+from WarThunder.connection import create_session
+
+
+REPLAY_FINISHED = 'Failed to establish a new connection: end of replay'
+
+
+def find_path(url: str) -> str:
+    '''
+    Find the page of the localhost server a URL points to (so that
+    recordings do not depend on the host's IP address or query strings)
+    
+    Args:
+        url:
+            Full URL of the request
+    
+    Returns:
+            Path of the URL (i.e. "/indicators")
+    '''
+    
+    return urlsplit(url).path
+
+
+class RecordingSession(object):
+    '''
+    Wraps a requests session and logs every response it receives (with the
+    time since recording started and the request's latency) to a gzipped
+    JSON lines file. Binary responses (map.img) are stored base64 encoded
+    and only once per unique image. Example -
+        
+        with RecordingSession('match.jsonl.gz') as session:
+            telem = telemetry.TelemInterface(session=session)
+            
+            while True:
+                telem.get_telemetry(comments=True, events=True)
+    '''
+    
+    def __init__(self, file_name: str, session=None):
+        '''
+        Args:
+            file_name:
+                Full filepath or filename of the recording to create
+            session:
+                requests.Session used to query the localhost server. A new
+                pooled session is created if not given
+        '''
+        
+        self.file_name  = file_name
+        self.session    = session if session is not None else create_session()
+        self.log        = gzip.open(file_name, 'wt', encoding='utf-8')
+        self.lock       = threading.Lock()
+        self.digests    = set()
+        self.start_time = monotonic()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        '''
+        Query the given page through the wrapped session and record the
+        response (or the connection error raised)
+        
+        Args:
+            url:
+                Page to query
+            kwargs:
+                Passed on to requests.Session.get()
+        
+        Returns:
+                Response of the page
+        '''
+        
+        start_time = monotonic()
+        entry      = {'t': round(start_time - self.start_time, 6),
+                      'p': find_path(url)}
+        
+        try:
+            response = self.session.get(url, **kwargs)
+        
+        except requests.exceptions.RequestException as e:
+            entry['l'] = round(monotonic() - start_time, 6)
+            entry['e'] = type(e).__name__
+            entry['m'] = str(e)
+            self.record(entry)
+            raise
+        
+        entry['l'] = round(monotonic() - start_time, 6)
+        entry['s'] = response.status_code
+        
+        try:
+            entry['b'] = response.content.decode('utf-8')
+            self.record(entry)
+        
+        except UnicodeDecodeError:
+            entry['d'] = hashlib.sha1(response.content).hexdigest()
+            self.record(entry, response.content)
+        
+        return response
+    
+    def record(self, entry: dict, blob: bytes = None):
+        '''
+        Append one response to the recording
+        
+        Args:
+            entry:
+                Response entry
+            blob:
+                Binary contents of the response (written once per digest)
+        '''
+        
+        with self.lock:
+            if self.log is None:
+                return
+            
+            if (blob is not None) and (entry['d'] not in self.digests):
+                self.digests.add(entry['d'])
+                self.log.write(json.dumps({'d': entry['d'],
+                                           'z': base64.b64encode(blob).decode('ascii')}) + '\n')
+            
+            self.log.write(json.dumps(entry, separators=(',', ':')) + '\n')
+    
+    def close(self):
+        '''
+        Finish the recording and close the wrapped session
+        '''
+        
+        with self.lock:
+            if self.log is not None:
+                self.log.close()
+                self.log = None
+        
+        self.session.close()
+
+
+class ReplayResponse(object):
+    '''
+    Minimal stand-in for requests.Response holding a recorded response
+    '''
+    
+    def __init__(self, url: str, status_code: int, content: bytes):
+        '''
+        Args:
+            url:
+                URL that was requested
+            status_code:
+                Recorded HTTP status code
+            content:
+                Recorded body of the response
+        '''
+        
+        self.url         = url
+        self.status_code = status_code
+        self.content     = content
+    
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8')
+    
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+    
+    def json(self):
+        '''
+        Returns:
+                Parsed JSON of the response
+        '''
+        
+        return json.loads(self.text)
+    
+    def raise_for_status(self):
+        '''
+        Raise requests.exceptions.HTTPError if the recorded status is an error
+        '''
+        
+        if not self.ok:
+            raise requests.exceptions.HTTPError('{} Error for url: {}'.format(self.status_code, self.url))
+
+
+class ReplaySession(object):
+    '''
+    Session-like object that answers get() requests with the responses of a
+    recording made with RecordingSession instead of querying the localhost
+    server
+    
+    With realtime=True, each page returns the latest response recorded at
+    or before the time since the replay started (like the live server would)
+    after the recorded latency. Otherwise every page returns its recorded
+    responses in order as fast as possible. Once the recording runs out,
+    requests fail like they would with War Thunder closed (unless loop=True)
+    '''
+    
+    def __init__(self, file_name: str, realtime: bool = True, loop: bool = False):
+        '''
+        Args:
+            file_name:
+                Full filepath or filename of the recording to replay
+            realtime:
+                Whether to replay at the original speed (including request
+                latency) or as fast as possible
+            loop:
+                Whether or not to start over once the recording runs out
+        '''
+        
+        self.file_name  = file_name
+        self.realtime   = realtime
+        self.loop       = loop
+        self.lock       = threading.Lock()
+        self.responses  = {} # recorded entries of each page keyed by path
+        self.positions  = {} # index of each page's next entry keyed by path
+        self.duration   = 0
+        self.start_time = None
+        
+        self.load()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def load(self):
+        '''
+        Read the whole recording into memory (binary responses are only held
+        once per unique image)
+        '''
+        
+        blobs = {}
+        
+        with gzip.open(self.file_name, 'rt', encoding='utf-8') as log:
+            for line in log:
+                entry = json.loads(line)
+                
+                if 'z' in entry:
+                    blobs[entry['d']] = base64.b64decode(entry['z'])
+                    continue
+                
+                if 'b' in entry:
+                    entry['b'] = entry['b'].encode('utf-8')
+                elif 'd' in entry:
+                    entry['b'] = blobs[entry['d']]
+                
+                self.responses.setdefault(entry['p'], []).append(entry)
+                self.duration = max(self.duration, entry['t'])
+        
+        self.rewind()
+    
+    def rewind(self):
+        '''
+        Start the replay over from the beginning of the recording
+        '''
+        
+        self.positions  = dict.fromkeys(self.responses, 0)
+        self.start_time = None
+    
+    def find_entry(self, path: str) -> dict:
+        '''
+        Find the recorded entry to answer the next request for a page with
+        
+        Args:
+            path:
+                Page requested
+        
+        Returns:
+                Recorded entry (None if the recording ran out)
+        '''
+        
+        entries = self.responses.get(path)
+        
+        if not entries:
+            return None
+        
+        if self.start_time is None:
+            self.start_time = monotonic()
+        
+        i = self.positions[path]
+        
+        if self.realtime:
+            elapsed = monotonic() - self.start_time
+            
+            if elapsed > self.duration:
+                return None
+            
+            while (i + 1 < len(entries)) and (entries[i + 1]['t'] <= elapsed):
+                i += 1
+        
+        elif i >= len(entries):
+            return None
+        
+        self.positions[path] = i if self.realtime else i + 1
+        
+        return entries[i]
+    
+    def get(self, url: str, **kwargs) -> ReplayResponse:
+        '''
+        Answer a request with the recorded response of the page
+        
+        Args:
+            url:
+                Page to query
+            kwargs:
+                Ignored (accepted for compatibility with requests.Session.get())
+        
+        Returns:
+                Recorded response of the page
+        '''
+        
+        path = find_path(url)
+        
+        with self.lock:
+            entry = self.find_entry(path)
+            
+            if (entry is None) and self.loop and self.responses.get(path):
+                self.rewind()
+                entry = self.find_entry(path)
+        
+        if entry is None:
+            raise requests.exceptions.ConnectionError(REPLAY_FINISHED)
+        
+        if self.realtime:
+            sleep(entry['l'])
+        
+        if 'e' in entry:
+            error = getattr(requests.exceptions, entry['e'], requests.exceptions.ConnectionError)
+            raise error(entry['m'])
+        
+        return ReplayResponse(url, entry['s'], entry['b'])
+    
+    def close(self):
+        '''
+        Nothing to close - accepted for compatibility with requests.Session
+        '''
+        
+        pass
@@ -1,243 +1,732 @@
-'''
-Module to query and access telemetry data during War Thunder matches
-'''
-
-
-import socket
-import requests
-from WarThunder import mapinfo
-
-
-IP_ADDRESS     = socket.gethostbyname(socket.gethostname())
-URL_INDICATORS = 'http://{}:8111/indicators'.format(IP_ADDRESS)
-URL_STATE      = 'http://{}:8111/state'.format(IP_ADDRESS)
-URL_COMMENTS   = 'http://{}:8111/gamechat?lastId={}'
-URL_EVENTS     = 'http://{}:8111/hudmsg?lastEvt=-1&lastDmg={}'
-FT_TO_M        = 0.3048
-IN_FLIGHT      = 0
-IN_MENU        = -1
-NO_MISSION     = -2
-WT_NOT_RUNNING = -3
-OTHER_ERROR    = -4
-METRICS_PLANES = ['p-', 'f-', 'f2', 'f3', 'f4', 'f6', 'f7', 'f8', 'f9', 'os',
-                  'sb', 'tb', 'a-', 'pb', 'am', 'ad', 'fj', 'b-', 'b_', 'xp',
-                  'bt', 'xa', 'xf', 'sp', 'hu', 'ty', 'fi', 'gl', 'ni', 'fu',
-                  'fu', 'se', 'bl', 'be', 'su', 'te', 'st', 'mo', 'we', 'ha']
-
-
-def combine_dicts(to_dict: dict, from_dict: dict) -> dict:
-    '''
-    Merges all contents of "from_dict" into "to_dict"
-    
-    Args:
-        to_dict:
-            One dictionary to be merged
-        from_dict:
-            Other dictionary to be merged
-    
-    Returns:
-            Dictionary with the merged contents of the original to_dict and
-            from_dict
-    '''
-    
-    if (type(to_dict) == dict) and (type(from_dict) == dict):
-        for key in from_dict.keys():
-            to_dict[key] = from_dict[key]
-
-        return to_dict
-    else:
-        return {}
-
-
-class TelemInterface(object):
-    def __init__(self):
-        self.connected       = False
-        self.full_telemetry  = {}
-        self.basic_telemetry = {}
-        self.indicators      = {}
-        self.state           = {}
-        self.map_info        = mapinfo.MapInfo()
-        self.last_event_ID   = -1
-        self.last_comment_ID = -1
-        self.comments        = []
-        self.events          = {}
-        self.status          = WT_NOT_RUNNING
-    
-    def get_comments(self) -> list:
-        '''
-        Query http://localhost:8111/gamechat?lastId=-1 to get a list of all
-        comments (in JSON format) made in the current match
-        
-        Returns:
-                List of comments
-        '''
-        
-        comments_response = requests.get(URL_COMMENTS.format(IP_ADDRESS, self.last_comment_ID))
-        self.comments.extend(comments_response.json())
-        if self.comments:
-            self.last_comment_ID = max([comment['id'] for comment in self.comments])
-        return self.comments
-    
-    def get_events(self) -> dict:
-        '''
-        Query http://localhost:8111/hudmsg?lastEvt=-1&lastDmg=-1 to get
-        information on all events (i.e. when someone is damaged or destroyed)
-        in the current match
-        
-        Returns:
-                Events log dictionary
-        '''
-        
-        events_response    = requests.get(URL_EVENTS.format(IP_ADDRESS, self.last_event_ID))
-        self.events        = combine_dicts(self.events, events_response.json())
-        
-        try:
-            self.last_event_ID = max([event['id'] for event in self.events['damage']])
-        except ValueError:
-            self.last_event_ID = -1
-        
-        return self.events
-    
-    def find_altitude(self) -> float:
-        '''
-        Finds and standardizes reported alittude to meters for all planes
-        
-        Returns:
-                Altitude in meters
-        '''
-        
-        name = self.indicators['type']
-        
-        # account for freedom units in US and UK planes
-        if name[:2] in METRICS_PLANES:
-            if 'altitude_10k' in self.indicators.keys():
-                return self.indicators['altitude_10k'] * FT_TO_M
-            elif 'altitude_hour' in self.indicators.keys():
-                return self.indicators['altitude_hour'] * FT_TO_M
-            elif 'altitude_min' in self.indicators.keys():
-                return self.indicators['altitude_min'] * FT_TO_M
-            else:
-                return 0
-        else:
-            if 'altitude_10k' in self.indicators.keys():
-                return self.indicators['altitude_10k']
-            elif 'altitude_hour' in self.indicators.keys():
-                return self.indicators['altitude_hour']
-            elif 'altitude_min' in self.indicators.keys():
-                return self.indicators['altitude_min']
-            else:
-                return 0
-
-    def get_telemetry(self, comments: bool = False, events: bool = False) -> bool:
-        '''
-        Ping http://localhost:8111/indicators and http://localhost:8111/state
-        to sample telemetry data. Each one of the URL requests returns a
-        respective JSON string. These two JSON strings are converted into
-        dictionaries (self.indicators and self.state). From these dictionaries,
-        two more dictionaries are created: self.full_telemetry and
-        self.basic_telemetry.
-        
-        Dictionary self.full_telemetry holds a combination of all telemetry
-        values returned from http://localhost:8111/indicators and
-        http://localhost:8111/state. Dictionary self.basic_telemetry holds
-        the minimal amount of telmetry needed for navigation and control (see
-        file docstring for more info)
-        
-        Args:
-            comments:
-                Whether or not to query for match comment data
-            events:
-                Whether or not to query for match event data
-        
-        Returns:
-                Whether or not player is in a match
-        '''
-        
-        self.connected       = False
-        self.full_telemetry  = {}
-        self.basic_telemetry = {}
-
-        try:
-            self.map_info.download_files()
-            self.map_info.parse_meta()
-            
-            indicator_response = requests.get(URL_INDICATORS)
-            self.indicators    = indicator_response.json()
-
-            state_response = requests.get(URL_STATE)
-            self.state     = state_response.json()
-            
-            if comments:
-                self.get_comments()
-            else:
-                self.comments = []
-            
-            if events:
-                self.get_events()
-            else:
-                self.events = {}
-
-            if self.indicators['valid'] and self.state['valid']:
-                try:
-                    # fix odd WT sign conventions
-                    try:
-                        self.indicators['aviahorizon_pitch'] = -self.indicators['aviahorizon_pitch']
-                    except KeyError:
-                        self.indicators['aviahorizon_pitch'] = 0
-                    
-                    try:
-                        self.indicators['aviahorizon_roll']  = -self.indicators['aviahorizon_roll']
-                    except KeyError:
-                        self.indicators['aviahorizon_roll']  = 0
-                    
-                    self.indicators['alt_m'] = self.find_altitude()
-                    
-                    self.full_telemetry = combine_dicts(self.full_telemetry, self.indicators)
-                    self.full_telemetry = combine_dicts(self.full_telemetry, self.state)
-                    
-                    self.basic_telemetry['airframe'] = self.indicators['type']
-                    self.basic_telemetry['roll']     = self.indicators['aviahorizon_roll']
-                    self.basic_telemetry['pitch']    = self.indicators['aviahorizon_pitch']
-                    self.basic_telemetry['heading']  = self.indicators['compass']
-                    self.basic_telemetry['altitude'] = self.indicators['alt_m']
-                
-                    self.basic_telemetry['lat'] = self.map_info.player_lat
-                    self.full_telemetry['lat']  = self.map_info.player_lat
-                    self.basic_telemetry['lon'] = self.map_info.player_lon
-                    self.full_telemetry['lon']  = self.map_info.player_lon
-                    
-                    try: 
-                        self.basic_telemetry['IAS'] = self.state['TAS, km/h']
-                    except KeyError:
-                        self.basic_telemetry['IAS'] = None
-                    
-                    try: 
-                        self.basic_telemetry['flapState'] = self.state['flaps, %']
-                    except KeyError:
-                        self.basic_telemetry['flapState'] = None
-                    
-                    try: 
-                        self.basic_telemetry['gearState'] = self.state['gear, %']
-                    except KeyError:
-                        self.basic_telemetry['gearState'] = None
-                    
-                    self.connected = True
-                    self.status    = IN_FLIGHT
-                    
-                except (KeyError, AttributeError):
-                    self.status = IN_MENU
-            else:
-                self.status = NO_MISSION
-
-        except Exception as e:
-            if 'Failed to establish a new connection' in str(e):
-                self.status = WT_NOT_RUNNING
-            else:
-                import traceback
-                traceback.print_exc()
-                self.status = OTHER_ERROR
-        
-        return self.connected
-
-
-
+'''
+Module to query and access telemetry data during War Thunder matches
+'''
+
+
+import socket
+import threading
+from time import time, monotonic
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from WarThunder import mapinfo
+from WarThunder.connection import create_session, POOL_SIZE
+
+
+IP_ADDRESS     = socket.gethostbyname(socket.gethostname())
+URL_INDICATORS = 'http://{}:8111/indicators'.format(IP_ADDRESS)
+URL_STATE      = 'http://{}:8111/state'.format(IP_ADDRESS)
+URL_COMMENTS   = 'http://{}:8111/gamechat?lastId={}'
+URL_EVENTS     = 'http://{}:8111/hudmsg?lastEvt=-1&lastDmg={}'
+FT_TO_M        = 0.3048
+IN_FLIGHT      = 0
+IN_MENU        = -1
+NO_MISSION     = -2
+WT_NOT_RUNNING = -3
+OTHER_ERROR    = -4
+MAX_WORKERS    = 7
+TELEM_GROUP    = 'telemetry' # /indicators and /state
+MAP_GROUP      = 'map'       # /map.img, /map_info.json and /map_obj.json
+CHAT_GROUP     = 'chat'      # /gamechat and /hudmsg
+METRICS_PLANES = ['p-', 'f-', 'f2', 'f3', 'f4', 'f6', 'f7', 'f8', 'f9', 'os',
+                  'sb', 'tb', 'a-', 'pb', 'am', 'ad', 'fj', 'b-', 'b_', 'xp',
+                  'bt', 'xa', 'xf', 'sp', 'hu', 'ty', 'fi', 'gl', 'ni', 'fu',
+                  'fu', 'se', 'bl', 'be', 'su', 'te', 'st', 'mo', 'we', 'ha']
+
+
+# Immutable snapshot of one complete telemetry sample (see
+# TelemInterface.sample) - map_objs is a mapinfo.MapObjectTable, a read-only
+# sequence of map_objs
+TelemSample = namedtuple('TelemSample', ['timestamp',
+                                         'connected',
+                                         'status',
+                                         'basic_telemetry',
+                                         'full_telemetry',
+                                         'map_objs',
+                                         'comments',
+                                         'events'])
+
+
+def combine_dicts(to_dict: dict, from_dict: dict) -> dict:
+    '''
+    Merges all contents of "from_dict" into "to_dict"
+    
+    Args:
+        to_dict:
+            One dictionary to be merged
+        from_dict:
+            Other dictionary to be merged
+    
+    Returns:
+            Dictionary with the merged contents of the original to_dict and
+            from_dict
+    '''
+    
+    if (type(to_dict) == dict) and (type(from_dict) == dict):
+        for key in from_dict.keys():
+            to_dict[key] = from_dict[key]
+
+        return to_dict
+    else:
+        return {}
+
+
+class TelemInterface(object):
+    def __init__(self,
+                 concurrent:  bool  = False,
+                 max_workers: int   = MAX_WORKERS,
+                 session            = None,
+                 pool_size:   int   = POOL_SIZE,
+                 timeout:     float = None,
+                 map_timeout: float = mapinfo.REQUEST_TIMEOUT,
+                 telem_hz:    float = None,
+                 map_hz:      float = None,
+                 chat_hz:     float = None):
+        '''
+        Args:
+            concurrent:
+                Whether or not to request all localhost pages at the same time
+                (using a thread pool) when sampling telemetry instead of one
+                after another
+            max_workers:
+                Number of threads used to request localhost pages if
+                concurrent is True
+            session:
+                requests.Session used to query the localhost server. It is
+                shared with self.map_info so that all pages reuse the same
+                pool of keep-alive connections. A new pooled session is
+                created if not given
+            pool_size:
+                Maximum number of connections kept open to the localhost
+                server (only used if session is not given)
+            timeout:
+                Timeout in seconds for the telemetry, comment and event
+                requests (None waits indefinitely)
+            map_timeout:
+                Timeout in seconds for the map requests
+            telem_hz:
+                Maximum rate (in Hz) at which get_telemetry() requests
+                /indicators and /state (None requests them on every call)
+            map_hz:
+                Maximum rate (in Hz) at which get_telemetry() requests the map
+                image, info and objects (None requests them on every call)
+            chat_hz:
+                Maximum rate (in Hz) at which get_telemetry() requests the
+                comments and events (None requests them on every call)
+        '''
+        
+        self.pool_size       = pool_size
+        self.session         = session
+        self.timeout         = timeout
+        self.concurrent      = concurrent
+        self.executor        = None
+        self.map_executor    = None # single worker thread refreshing the map (see get_telemetry())
+        self.map_future      = None # map refresh running on self.map_executor
+        self.map_ready       = False # whether the last finished map refresh got valid map data
+        self.connected       = False
+        self.full_telemetry  = {}
+        self.basic_telemetry = {}
+        self.indicators      = {}
+        self.state           = {}
+        self.last_event_ID   = -1
+        self.last_comment_ID = -1
+        self.comments        = []
+        self.events          = {}
+        self.status          = WT_NOT_RUNNING
+        self.refresh_periods = {TELEM_GROUP: 1 / telem_hz if telem_hz else 0,
+                                MAP_GROUP:   1 / map_hz   if map_hz   else 0,
+                                CHAT_GROUP:  1 / chat_hz  if chat_hz  else 0}
+        self.last_refresh    = {TELEM_GROUP: None,
+                                MAP_GROUP:   None,
+                                CHAT_GROUP:  None}
+        self.sample          = TelemSample(time(), False, WT_NOT_RUNNING, {}, {}, [], [], {})
+        self.sampler_thread  = None
+        self.sampler_stop    = threading.Event()
+        self.sampler_stats   = {}
+        
+        if self.session is None:
+            self.session = self.create_session()
+        
+        self.map_info = self.create_map_info(map_timeout)
+        
+        if self.concurrent:
+            self.executor = ThreadPoolExecutor(max_workers=max_workers)
+    
+    def create_session(self):
+        '''
+        Create the pooled session used to query the localhost server if none
+        was given to the constructor
+        
+        Returns:
+                New requests.Session
+        '''
+        
+        return create_session(self.pool_size)
+    
+    def create_map_info(self, timeout: float) -> mapinfo.MapInfo:
+        '''
+        Create the MapInfo object used to sample map data. It shares this
+        interface's session (and therefore its connection pool)
+        
+        Args:
+            timeout:
+                Timeout in seconds for the map requests
+        
+        Returns:
+                New MapInfo object
+        '''
+        
+        return mapinfo.MapInfo(self.session, timeout)
+    
+    def close(self):
+        '''
+        Shut down the thread pool used for concurrent requests (if any) and
+        close all pooled connections to the localhost server. Also stops the
+        background sampler (if running)
+        '''
+        
+        self.stop_sampler()
+        
+        if self.map_executor is not None:
+            self.map_executor.shutdown(wait=True)
+            self.map_executor = None
+            self.map_future   = None
+        
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        
+        self.session.close()
+    
+    def get_comments(self) -> list:
+        '''
+        Query http://localhost:8111/gamechat?lastId=-1 to get a list of all
+        comments (in JSON format) made in the current match
+        
+        Returns:
+                List of comments
+        '''
+        
+        comments_response = self.session.get(URL_COMMENTS.format(IP_ADDRESS, self.last_comment_ID),
+                                             timeout=self.timeout)
+        return self.update_comments(comments_response.json())
+    
+    def update_comments(self, new_comments: list) -> list:
+        '''
+        Add newly queried comments to the comment log and keep track of the
+        latest comment ID
+        
+        Args:
+            new_comments:
+                Parsed JSON of http://localhost:8111/gamechat
+        
+        Returns:
+                List of comments
+        '''
+        
+        self.comments.extend(new_comments)
+        if self.comments:
+            self.last_comment_ID = max([comment['id'] for comment in self.comments])
+        return self.comments
+    
+    def get_events(self) -> dict:
+        '''
+        Query http://localhost:8111/hudmsg?lastEvt=-1&lastDmg=-1 to get
+        information on all events (i.e. when someone is damaged or destroyed)
+        in the current match
+        
+        Returns:
+                Events log dictionary
+        '''
+        
+        events_response = self.session.get(URL_EVENTS.format(IP_ADDRESS, self.last_event_ID),
+                                           timeout=self.timeout)
+        return self.update_events(events_response.json())
+    
+    def update_events(self, new_events: dict) -> dict:
+        '''
+        Merge newly queried events into the events log and keep track of the
+        latest damage event ID
+        
+        Args:
+            new_events:
+                Parsed JSON of http://localhost:8111/hudmsg
+        
+        Returns:
+                Events log dictionary
+        '''
+        
+        self.events        = combine_dicts(self.events, new_events)
+        
+        try:
+            self.last_event_ID = max([event['id'] for event in self.events['damage']])
+        except ValueError:
+            self.last_event_ID = -1
+        
+        return self.events
+    
+    def find_altitude(self) -> float:
+        '''
+        Finds and standardizes reported alittude to meters for all planes
+        
+        Returns:
+                Altitude in meters
+        '''
+        
+        name = self.indicators['type']
+        
+        # account for freedom units in US and UK planes
+        if name[:2] in METRICS_PLANES:
+            if 'altitude_10k' in self.indicators.keys():
+                return self.indicators['altitude_10k'] * FT_TO_M
+            elif 'altitude_hour' in self.indicators.keys():
+                return self.indicators['altitude_hour'] * FT_TO_M
+            elif 'altitude_min' in self.indicators.keys():
+                return self.indicators['altitude_min'] * FT_TO_M
+            else:
+                return 0
+        else:
+            if 'altitude_10k' in self.indicators.keys():
+                return self.indicators['altitude_10k']
+            elif 'altitude_hour' in self.indicators.keys():
+                return self.indicators['altitude_hour']
+            elif 'altitude_min' in self.indicators.keys():
+                return self.indicators['altitude_min']
+            else:
+                return 0
+
+    def refresh_due(self, group: str, now: float) -> bool:
+        '''
+        Check whether the pages of the given group need to be requested again
+        (and if so, mark the group as refreshed)
+        
+        Args:
+            group:
+                TELEM_GROUP, MAP_GROUP or CHAT_GROUP
+            now:
+                Current time.monotonic() value
+        
+        Returns:
+                Whether or not the group's pages should be requested
+        '''
+        
+        last_refresh = self.last_refresh[group]
+        
+        if (last_refresh is None) or ((now - last_refresh) >= self.refresh_periods[group]):
+            self.last_refresh[group] = now
+            return True
+        
+        return False
+    
+    def fetch_concurrent(self,
+                         comments:   bool = False,
+                         events:     bool = False,
+                         map_data:   bool = True,
+                         indicators: bool = True):
+        '''
+        Request the map files, http://localhost:8111/indicators,
+        http://localhost:8111/state and the comments and events pages (each
+        optional) all at the same time. The method returns once every request
+        has finished so that all data belongs to the same sample
+        
+        Args:
+            comments:
+                Whether or not to query for match comment data
+            events:
+                Whether or not to query for match event data
+            map_data:
+                Whether or not to query for map data
+            indicators:
+                Whether or not to query /indicators and /state
+        '''
+        
+        futures = []
+        
+        if map_data:
+            map_futures = self.map_info.submit_files(self.executor)
+            futures.extend([future for future in map_futures if future is not None])
+        
+        if indicators:
+            indicator_future = self.executor.submit(self.session.get, URL_INDICATORS, timeout=self.timeout)
+            state_future     = self.executor.submit(self.session.get, URL_STATE, timeout=self.timeout)
+            futures.extend([indicator_future, state_future])
+        
+        chat_futures = []
+        
+        if comments:
+            chat_futures.append(self.executor.submit(self.get_comments))
+        
+        if events:
+            chat_futures.append(self.executor.submit(self.get_events))
+        
+        # Let every request finish before touching any results so that a
+        # failed request can't leave others still running in the background
+        wait(futures + chat_futures)
+        
+        for future in chat_futures:
+            future.result()
+        
+        if map_data:
+            self.map_info.download_files(map_futures)
+        
+        if indicators:
+            self.indicators = indicator_future.result().json()
+            self.state      = state_future.result().json()
+    
+    def refresh_map(self):
+        '''
+        Download and process the map data on the map worker thread (see
+        get_telemetry()) - the map files are requested at the same time if
+        the interface is concurrent
+        '''
+        
+        if self.executor is not None:
+            self.map_ready = self.map_info.download_files(self.map_info.submit_files(self.executor))
+        else:
+            self.map_ready = self.map_info.download_files()
+    
+    def finish_map(self):
+        '''
+        Wait for the map refresh running on the map worker thread (if any) so
+        that the map can be refreshed in the calling thread
+        '''
+        
+        if self.map_future is not None:
+            future, self.map_future = self.map_future, None
+            future.result() # raise any error of the finished refresh
+    
+    def submit_map(self):
+        '''
+        Start refreshing the map data on the map worker thread unless the
+        previous refresh is still running. Never waits for the map data
+        '''
+        
+        if self.map_future is not None:
+            if not self.map_future.done():
+                # try again on the next call instead of waiting
+                self.last_refresh[MAP_GROUP] = None
+                return
+            
+            future, self.map_future = self.map_future, None
+            future.result() # raise any error of the finished refresh
+        
+        if self.map_executor is None:
+            self.map_executor = ThreadPoolExecutor(max_workers=1)
+        
+        self.map_future = self.map_executor.submit(self.refresh_map)
+    
+    def parse_telemetry(self, new_indicators: bool = True):
+        '''
+        Build self.full_telemetry and self.basic_telemetry from the latest
+        self.indicators, self.state and map data. Also updates self.connected
+        and self.status
+        
+        Args:
+            new_indicators:
+                Whether or not self.indicators was just requested and still
+                needs its sign conventions/altitude fixed (False if it is the
+                already fixed snapshot of a previous sample)
+        '''
+        
+        connected       = False
+        full_telemetry  = {}
+        basic_telemetry = {}
+        
+        if self.indicators['valid'] and self.state['valid']:
+            try:
+                if new_indicators:
+                    # fix odd WT sign conventions
+                    try:
+                        self.indicators['aviahorizon_pitch'] = -self.indicators['aviahorizon_pitch']
+                    except KeyError:
+                        self.indicators['aviahorizon_pitch'] = 0
+                    
+                    try:
+                        self.indicators['aviahorizon_roll']  = -self.indicators['aviahorizon_roll']
+                    except KeyError:
+                        self.indicators['aviahorizon_roll']  = 0
+                    
+                    self.indicators['alt_m'] = self.find_altitude()
+                    
+                full_telemetry = combine_dicts(full_telemetry, self.indicators)
+                full_telemetry = combine_dicts(full_telemetry, self.state)
+                    
+                basic_telemetry['airframe'] = self.indicators['type']
+                basic_telemetry['roll']     = self.indicators['aviahorizon_roll']
+                basic_telemetry['pitch']    = self.indicators['aviahorizon_pitch']
+                basic_telemetry['heading']  = self.indicators['compass']
+                basic_telemetry['altitude'] = self.indicators['alt_m']
+                
+                # None until the player was found on the map (i.e. while the
+                # first map refresh is still running)
+                basic_telemetry['lat'] = getattr(self.map_info, 'player_lat', None)
+                full_telemetry['lat']  = basic_telemetry['lat']
+                basic_telemetry['lon'] = getattr(self.map_info, 'player_lon', None)
+                full_telemetry['lon']  = basic_telemetry['lon']
+                    
+                try: 
+                    basic_telemetry['IAS'] = self.state['TAS, km/h']
+                except KeyError:
+                    basic_telemetry['IAS'] = None
+                    
+                try: 
+                    basic_telemetry['flapState'] = self.state['flaps, %']
+                except KeyError:
+                    basic_telemetry['flapState'] = None
+                    
+                try: 
+                    basic_telemetry['gearState'] = self.state['gear, %']
+                except KeyError:
+                    basic_telemetry['gearState'] = None
+                    
+                connected   = True
+                self.status = IN_FLIGHT
+                    
+            except (KeyError, AttributeError):
+                full_telemetry  = {}
+                basic_telemetry = {}
+                self.status     = IN_MENU
+        else:
+            self.status = NO_MISSION
+        
+        # Swap in the finished dictionaries in one go so that other threads
+        # never see them empty or half filled
+        self.full_telemetry  = full_telemetry
+        self.basic_telemetry = basic_telemetry
+        self.connected       = connected
+    
+    def publish_sample(self):
+        '''
+        Replace self.sample with a snapshot of the latest telemetry. The
+        snapshot is swapped in with a single assignment, so any thread can
+        read self.sample at any time (without locking) and always gets a
+        complete, consistent sample
+        '''
+        
+        self.sample = TelemSample(time(),
+                                  self.connected,
+                                  self.status,
+                                  self.basic_telemetry,
+                                  self.full_telemetry,
+                                  self.map_info.snapshot(),
+                                  list(self.comments),
+                                  dict(self.events))
+    
+    def start_sampler(self, hz: float = 10, comments: bool = False, events: bool = False):
+        '''
+        Start a background thread that calls get_telemetry() at a fixed rate
+        (the map data is refreshed on a worker thread of its own so that
+        slow map downloads never delay a sample). Read the most recent
+        sample via self.sample and the sampler's
+        performance via self.sampler_stats:
+            
+            samples          (number of samples taken)
+            rate_hz          (achieved sample rate)
+            jitter_s         (standard deviation of the sample period)
+            max_jitter_s     (largest deviation from the target period)
+            missed_deadlines (samples that took longer than the period)
+        
+        Args:
+            hz:
+                Target sample rate in samples per second
+            comments:
+                Whether or not to query for match comment data
+            events:
+                Whether or not to query for match event data
+        '''
+        
+        if (self.sampler_thread is not None) and self.sampler_thread.is_alive():
+            return
+        
+        self.sampler_stop.clear()
+        self.sampler_thread = threading.Thread(target=self.run_sampler,
+                                               args=(hz, comments, events),
+                                               daemon=True)
+        self.sampler_thread.start()
+    
+    def stop_sampler(self, timeout: float = None):
+        '''
+        Stop the background sampler (if running) and wait for it to finish
+        its current sample
+        
+        Args:
+            timeout:
+                Maximum time in seconds to wait for the sampler thread
+        '''
+        
+        self.sampler_stop.set()
+        
+        if self.sampler_thread is not None:
+            self.sampler_thread.join(timeout)
+            self.sampler_thread = None
+    
+    def run_sampler(self, hz: float, comments: bool, events: bool):
+        '''
+        Background sampler loop (see start_sampler())
+        
+        Args:
+            hz:
+                Target sample rate in samples per second
+            comments:
+                Whether or not to query for match comment data
+            events:
+                Whether or not to query for match event data
+        '''
+        
+        period     = 1 / hz
+        next_time  = monotonic()
+        last_time  = None
+        samples    = 0
+        missed     = 0
+        mean       = 0.0
+        sum_sq     = 0.0
+        max_jitter = 0.0
+        
+        while not self.sampler_stop.is_set():
+            sample_time = monotonic()
+            
+            self.get_telemetry(comments, events, wait_map=False)
+            samples += 1
+            
+            if last_time is not None:
+                # running mean/variance (Welford) of the sample period
+                interval    = sample_time - last_time
+                delta       = interval - mean
+                mean       += delta / (samples - 1)
+                sum_sq     += delta * (interval - mean)
+                max_jitter  = max(max_jitter, abs(interval - period))
+            
+            last_time = sample_time
+            next_time += period
+            delay      = next_time - monotonic()
+            
+            if delay < 0:
+                # don't try to catch up with a burst of samples
+                missed   += 1
+                next_time = monotonic()
+                delay     = 0
+            
+            self.sampler_stats = {'samples':          samples,
+                                  'rate_hz':          1 / mean if mean else 0.0,
+                                  'jitter_s':         (sum_sq / (samples - 1)) ** 0.5 if samples > 1 else 0.0,
+                                  'max_jitter_s':     max_jitter,
+                                  'missed_deadlines': missed}
+            
+            self.sampler_stop.wait(delay)
+    
+    def get_telemetry(self, comments: bool = False, events: bool = False, wait_map: bool = None) -> bool:
+        '''
+        Ping http://localhost:8111/indicators and http://localhost:8111/state
+        to sample telemetry data. Each one of the URL requests returns a
+        respective JSON string. These two JSON strings are converted into
+        dictionaries (self.indicators and self.state). From these dictionaries,
+        two more dictionaries are created: self.full_telemetry and
+        self.basic_telemetry.
+        
+        Dictionary self.full_telemetry holds a combination of all telemetry
+        values returned from http://localhost:8111/indicators and
+        http://localhost:8111/state. Dictionary self.basic_telemetry holds
+        the minimal amount of telmetry needed for navigation and control (see
+        file docstring for more info)
+        
+        If the interface was created with concurrent=True, all localhost
+        pages are requested at the same time instead of one after another
+        
+        If refresh rates were given to the constructor (telem_hz, map_hz and
+        chat_hz), each group of pages is only requested once its period has
+        elapsed - in between, the latest snapshot of that group is reused so
+        that e.g. slow map updates never hold up fast attitude sampling
+        
+        Unless waiting for the map data (see wait_map), the map is refreshed
+        on a worker thread of its own and every sample uses the latest map
+        data that finished processing - a new refresh is only started once
+        the previous one is done, so map data may lag behind (and is missing
+        from the very first samples)
+        
+        The finished sample is also published as self.sample (see
+        publish_sample())
+        
+        Args:
+            comments:
+                Whether or not to query for match comment data
+            events:
+                Whether or not to query for match event data
+            wait_map:
+                Whether or not to wait for the map data to be refreshed
+                (None waits unless the interface is concurrent and valid map
+                data was already loaded, so that the first sample is complete)
+        
+        Returns:
+                Whether or not player is in a match
+        '''
+        
+        if wait_map is None:
+            wait_map = (self.executor is None) or (not self.map_ready)
+        
+        now           = monotonic()
+        refresh_telem = self.refresh_due(TELEM_GROUP, now)
+        refresh_map   = self.refresh_due(MAP_GROUP, now)
+        refresh_chat  = self.refresh_due(CHAT_GROUP, now)
+        
+        if not (refresh_telem or refresh_map or refresh_chat):
+            return self.connected
+
+        try:
+            if refresh_map and not wait_map:
+                self.submit_map()
+            elif refresh_map:
+                self.finish_map()
+            
+            if self.executor is not None:
+                self.fetch_concurrent(comments and refresh_chat,
+                                      events and refresh_chat,
+                                      refresh_map and wait_map,
+                                      refresh_telem)
+            else:
+                if refresh_map and wait_map:
+                    self.map_info.download_files()
+                
+                if refresh_telem:
+                    indicator_response = self.session.get(URL_INDICATORS, timeout=self.timeout)
+                    self.indicators    = indicator_response.json()
+                    
+                    state_response = self.session.get(URL_STATE, timeout=self.timeout)
+                    self.state     = state_response.json()
+                
+                if comments and refresh_chat:
+                    self.get_comments()
+                
+                if events and refresh_chat:
+                    self.get_events()
+            
+            if refresh_map and wait_map:
+                self.map_ready = self.map_info.map_valid
+            
+            if not comments:
+                self.comments = []
+            
+            if not events:
+                self.events = {}
+
+            self.parse_telemetry(refresh_telem)
+
+        except Exception as e:
+            # request every group again on the next call so a half finished
+            # sample is never reused as a snapshot
+            self.last_refresh    = dict.fromkeys(self.last_refresh)
+            self.full_telemetry  = {}
+            self.basic_telemetry = {}
+            self.connected       = False
+            
+            if 'Failed to establish a new connection' in str(e):
+                self.status = WT_NOT_RUNNING
+            else:
+                import traceback
+                traceback.print_exc()
+                self.status = OTHER_ERROR
+        
+        self.publish_sample()
+        
+        return self.connected
+
+
+
@@ -1,20 +1,21 @@
-from setuptools import setup
-
-with open("README.md", "r") as fh:
-    long_description = fh.read()
-
-setup(
-    name             = 'WarThunder',
-    packages         = ['WarThunder'],
-    version          = '2.3.4',
-    description      = 'Python package used to access air vehicle telemetry while in War Thunder air battles',
-    long_description = long_description,
-    long_description_content_type = "text/markdown",
-    author           = 'Power_Broker',
-    author_email     = 'gitstuff2@gmail.com',
-    url              = 'https://github.com/PowerBroker2/WarThunder',
-    download_url     = 'https://github.com/PowerBroker2/WarThunder/archive/2.3.4.tar.gz',
-    keywords         = ['War Thunder'],
-    classifiers      = [],
-    install_requires = ['imagehash', 'requests', 'Pillow', 'simplejson']
-)
+from setuptools import setup
+
+with open("README.md", "r") as fh:
+    long_description = fh.read()
+
+setup(
+    name             = 'WarThunder',
+    packages         = ['WarThunder'],
+    version          = '2.3.4',
+    description      = 'Python package used to access air vehicle telemetry while in War Thunder air battles',
+    long_description = long_description,
+    long_description_content_type = "text/markdown",
+    author           = 'Power_Broker',
+    author_email     = 'gitstuff2@gmail.com',
+    url              = 'https://github.com/PowerBroker2/WarThunder',
+    download_url     = 'https://github.com/PowerBroker2/WarThunder/archive/2.3.4.tar.gz',
+    keywords         = ['War Thunder'],
+    classifiers      = [],
+    install_requires = ['imagehash', 'numpy', 'requests', 'Pillow', 'simplejson'],
+    extras_require   = {'async': ['aiohttp']}
+)
@@ -0,0 +1,178 @@
+'''
+Round trip tests of WarThunder.acmi: files written by ACMI (plain, buffered
+and zipped) are read back with ACMIReader
+'''
+
+
+import os
+import pytest
+from WarThunder import acmi
+
+
+NUM_FRAMES = 50
+
+
+def write_match(file_name: str, **create_kwargs) -> tuple:
+    '''
+    Write a short recording: object 0 flies the whole match, object 1 is
+    removed halfway and object 2 only appears in the second half
+    
+    Args:
+        file_name:
+            Full filepath of the ACMI file to create
+        create_kwargs:
+            Passed on to acmi.ACMI.create()
+    
+    Returns:
+            Tuple of the file name actually written and a list of
+            (time, hex ID, properties) of every line written
+    '''
+    
+    written = []
+    
+    with acmi.ACMI(num_objs=0) as log:
+        log.create(file_name, **create_kwargs)
+        log.insert_user_header({'Title': 'Kursk, 1943', 'Author': 'tests'})
+        
+        for obj_num in range(2):
+            log.add_object(obj_num)
+        
+        for frame_num in range(NUM_FRAMES):
+            time    = frame_num * 0.5
+            frame   = {}
+            removed = []
+            
+            if frame_num == NUM_FRAMES // 2:
+                log.add_object(2)
+            
+            for obj_num in sorted(log.obj_ids, key=int):
+                frame[obj_num] = {'T':    '{}|{}|{}'.format(frame_num, obj_num, 1000 + frame_num),
+                                  'Name': 'Plane {}, {}'.format(obj_num, frame_num)}
+            
+            if frame_num == NUM_FRAMES // 2 - 1:
+                removed.append('1')
+            
+            for obj_num, data in frame.items():
+                written.append((time, log.obj_ids[obj_num], data))
+            
+            for obj_num in removed:
+                written.append((time, log.obj_ids[obj_num], None))
+            
+            assert log.insert_frame(time, frame, removed)
+        
+        return log.file_name, written
+
+
+@pytest.fixture(params=['plain', 'buffered', 'zip'])
+def recording(request, tmp_path):
+    if request.param == 'plain':
+        return write_match(str(tmp_path / 'match.acmi'))
+    elif request.param == 'buffered':
+        return write_match(str(tmp_path / 'match.acmi'), buffered=True, flush_size=256)
+    
+    return write_match(str(tmp_path / 'match'), compress=True)
+
+
+def test_header(recording):
+    file_name, _ = recording
+    
+    with acmi.ACMIReader(file_name) as reader:
+        assert reader.header['FileType'] == 'text/acmi/tacview'
+        assert reader.header['FileVersion'] == '2.1'
+        assert reader.global_props['Title'] == 'Kursk, 1943'
+        assert reader.global_props['Author'] == 'tests'
+        assert reader.reference_time is not None
+
+
+def test_entries(recording):
+    file_name, written = recording
+    
+    with acmi.ACMIReader(file_name) as reader:
+        assert list(reader.entries()) == written
+
+
+def test_seek(recording):
+    file_name, written = recording
+    
+    with acmi.ACMIReader(file_name) as reader:
+        assert reader.seek(-1) == (0, reader.data_offset)
+        assert reader.seek(10.2)[0] == 10.0
+        assert reader.seek(1e6)[0] == (NUM_FRAMES - 1) * 0.5
+        
+        assert list(reader.entries(start=10.2, end=12)) == [entry for entry in written if 10 <= entry[0] <= 12]
+
+
+def test_track_and_removal(recording):
+    file_name, written = recording
+    
+    with acmi.ACMIReader(file_name) as reader:
+        for obj_id in {entry[1] for entry in written}:
+            expected = [(time, props) for time, entry_id, props in written if entry_id == obj_id]
+            
+            assert list(reader.track(obj_id)) == expected
+            assert list(reader.track(obj_id, start=5, end=20)) == [entry for entry in expected if 5 <= entry[0] <= 20]
+        
+        removed = [(time, obj_id) for time, obj_id, props in written if props is None]
+        
+        assert removed == [((NUM_FRAMES // 2 - 1) * 0.5, '2')]
+        # The removed object's ID is reused by object 2 after its removal
+        assert (removed[0][0], None) in list(reader.track('2'))
+
+
+def test_index_reused_and_bounded(recording, monkeypatch):
+    file_name, written = recording
+    
+    monkeypatch.setattr(acmi, 'INDEX_MAX_FRAMES', 8)
+    
+    with acmi.ACMIReader(file_name) as reader:
+        reader.load_index()
+        
+        assert len(reader.times) <= 8
+        assert os.path.exists(file_name + acmi.INDEX_EXTENSION)
+        
+        # Strided index - entries still start at the frame in effect
+        for start in [0, 3.2, 11.5, 17, 24.5]:
+            expected = [entry for entry in written if entry[0] >= int(start * 2) / 2]
+            
+            assert list(reader.entries(start=start)) == expected
+    
+    with acmi.ACMIReader(file_name) as reader:
+        reader.load_index()
+        
+        assert len(reader.times) <= 8
+        assert list(reader.track('1')) == [(time, props) for time, obj_id, props in written if obj_id == '1']
+
+
+def test_id_reused_only_after_removal_written(tmp_path):
+    with acmi.ACMI(num_objs=0) as log:
+        log.create(str(tmp_path / 'ids.acmi'), buffered=True)
+        
+        old_id = log.add_object(0)
+        log.remove_object(0)
+        
+        # The removal is not written yet - the ID must not be handed out
+        assert log.add_object(1) != old_id
+        assert log.insert_frame(0, {'1': {'T': '0|0|0'}})
+        assert log.add_object(2) == old_id
+        
+        file_name = log.file_name
+    
+    with acmi.ACMIReader(file_name) as reader:
+        assert list(reader.entries()) == [(0, '2', {'T': '0|0|0'}), (0, old_id, None)]
+
+
+@pytest.mark.parametrize('create_kwargs', [{}, {'buffered': True}, {'compress': True}])
+def test_write_after_close(tmp_path, create_kwargs):
+    log = acmi.ACMI(num_objs=1)
+    log.create(str(tmp_path / 'closed'), **create_kwargs)
+    
+    assert log.insert_frame(0, {'0': {'T': '0|0|0'}})
+    
+    log.close()
+    
+    # Writes after close() must fail instead of appending plain text to the
+    # (possibly zipped) file
+    assert not log.insert_frame(1, {'0': {'T': '1|1|1'}})
+    
+    with acmi.ACMIReader(log.file_name) as reader:
+        assert list(reader.entries()) == [(0, '1', {'T': '0|0|0'})]